@@ -1,8 +1,13 @@
 import sys
 import os
+import atexit
 import threading
 import time
-import random
+import base64
+import gzip
+import hashlib
+import json
+import zlib
 
 # Check Python version compatibility
 if sys.version_info < (3, 7):
@@ -15,65 +20,102 @@ elif sys.version_info >= (3, 8):
     print("This application is optimized for Python 3.7.0")
     print("Some features may not work as expected with newer versions")
 
-from flask import Flask, render_template, request, jsonify, session
-from flask_session import Session
+from flask import Flask, render_template, request, jsonify, session, make_response, Response, g
 from datetime import datetime, timedelta
 import bcrypt
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from sharepoint_sqlite_adapter import ProductionEntryManagerWorking as ProductionEntryManager
-from config import SECRET_KEY, DEBUG, HOST, PORT, SHAREPOINT_URL
+from request_metrics import RequestMetrics, SharedMetricsStore
+from login_guard import PasswordVerifier, LoginThrottle, LoginBusyError
+from session_store import SQLiteSessionInterface, IndexedFileSystemSessionInterface
+from sql_tracing import SQLTracer
+from config import SECRET_KEY, DEBUG, HOST, PORT, SHAREPOINT_URL, DB_POOL_SIZE, READ_CACHE_MAX_BYTES
+from config import READ_CACHE_PROBE_INTERVAL, SQL_TRACE_ENABLED, SQL_SLOW_QUERY_MS
+from config import SESSION_BACKEND, SESSION_DB_PATH, SESSION_SWEEP_INTERVAL, SESSION_SWEEP_BATCH_SIZE
+from config import LOGIN_BCRYPT_WORKERS, LOGIN_MAX_PENDING, LOGIN_RATE_LIMIT_ATTEMPTS, LOGIN_RATE_LIMIT_WINDOW
+from config import LOGIN_THROTTLE_DB_PATH, LOGIN_TRUSTED_PROXIES
+from config import COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL, BROTLI_QUALITY
+
+# Brotli is optional; without it responses are only gzip-compressed
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 
 # Enable CORS for credentials
 CORS(app, supports_credentials=True)
 
+# Behind reverse proxies remote_addr is the proxy's address; take the client from
+# X-Forwarded-For instead (only as many hops as there are trusted proxies)
+if LOGIN_TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=LOGIN_TRUSTED_PROXIES)
+
 # Configuration
 app.config['SECRET_KEY'] = SECRET_KEY
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['SESSION_FILE_DIR'] = './flask_session'  # Explicitly set session directory
+app.config['SESSION_FILE_DIR'] = './flask_session'  # Only used by SESSION_BACKEND = 'filesystem'
 app.config['SESSION_PERMANENT'] = False
 app.config['SESSION_USE_SIGNER'] = True
 app.config['SESSION_KEY_PREFIX'] = 'prodvision:'
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=2)
 
-# Initialize extensions
-Session(app)
+# Initialize extensions. Every backend expires sessions lazily when they are
+# read, so no request has to scan for expired sessions.
+session_store = None
+session_files = None
+if SESSION_BACKEND == 'sqlite':
+    session_store = SQLiteSessionInterface(SESSION_DB_PATH)
+    app.session_interface = session_store
+    atexit.register(session_store.close)
+elif SESSION_BACKEND == 'filesystem':
+    # Flask-Session file storage plus an in-memory expiry index of the session files
+    session_files = IndexedFileSystemSessionInterface(
+        app.config['SESSION_FILE_DIR'], app.config.get('SESSION_FILE_THRESHOLD', 500),
+        app.config.get('SESSION_FILE_MODE', 0o600), app.config['SESSION_KEY_PREFIX'],
+        use_signer=app.config['SESSION_USE_SIGNER'], permanent=app.config['SESSION_PERMANENT'],
+        lifetime_seconds=app.config['PERMANENT_SESSION_LIFETIME'].total_seconds()
+    )
+    app.session_interface = session_files
+# 'cookie' keeps Flask's built-in signed cookie sessions, which carry their own expiry
 
 # Initialize SharePoint SQLite database manager
-entry_manager = ProductionEntryManager(SHAREPOINT_URL)
+sql_tracer = SQLTracer(slow_query_ms=SQL_SLOW_QUERY_MS) if SQL_TRACE_ENABLED else None
+entry_manager = ProductionEntryManager(SHAREPOINT_URL, pool_size=DB_POOL_SIZE, cache_max_bytes=READ_CACHE_MAX_BYTES,
+                                       cache_probe_interval=READ_CACHE_PROBE_INTERVAL, sql_tracer=sql_tracer)
+atexit.register(entry_manager.close)
+
+# Password checks run in a bounded pool, and logins are throttled per client across all worker processes
+password_verifier = PasswordVerifier(max_workers=LOGIN_BCRYPT_WORKERS, max_pending=LOGIN_MAX_PENDING)
+login_throttle = LoginThrottle(LOGIN_THROTTLE_DB_PATH, max_attempts=LOGIN_RATE_LIMIT_ATTEMPTS,
+                               window_seconds=LOGIN_RATE_LIMIT_WINDOW)
+atexit.register(password_verifier.shutdown)
+atexit.register(login_throttle.close)
 
 # Session cleanup functions
+def cleanup_expired_sessions():
+    """Delete expired sessions for the configured backend; returns how many were removed.
+
+    Also forgets login attempts older than the throttle window.
+    """
+    login_throttle.sweep()
+    if session_store is not None:
+        deleted_count = session_store.sweep_expired(SESSION_SWEEP_BATCH_SIZE)
+        if deleted_count > 0:
+            print(f"Session cleanup completed: {deleted_count} expired sessions deleted")
+        return deleted_count
+    if session_files is not None:
+        return cleanup_expired_session_files()
+    return 0
+
 def cleanup_expired_session_files():
-    """Clean up expired and orphaned session files"""
+    """Delete expired session files; only files the expiry index says have expired are touched"""
     try:
-        session_dir = app.config['SESSION_FILE_DIR']
-        if not os.path.exists(session_dir):
-            return 0
-        
-        current_time = time.time()
-        session_lifetime_seconds = app.config['PERMANENT_SESSION_LIFETIME'].total_seconds()
-        deleted_count = 0
-        
-        for filename in os.listdir(session_dir):
-            file_path = os.path.join(session_dir, filename)
-            
-            # Skip directories
-            if not os.path.isfile(file_path):
-                continue
-            
-            # Get file modification time
-            file_mtime = os.path.getmtime(file_path)
-            file_age = current_time - file_mtime
-            
-            # Delete if file is older than session lifetime
-            if file_age > session_lifetime_seconds:
-                try:
-                    os.remove(file_path)
-                    deleted_count += 1
-                    print(f"Deleted expired session file: {filename}")
-                except OSError as e:
-                    print(f"Error deleting session file {filename}: {e}")
+        deleted = session_files.expiry_index.pop_expired()
+        for filename in deleted:
+            print(f"Deleted expired session file: {filename}")
+        deleted_count = len(deleted)
         
         if deleted_count > 0:
             print(f"Session cleanup completed: {deleted_count} files deleted")
@@ -86,87 +128,55 @@ def cleanup_expired_session_files():
 def delete_current_session_file():
     """Delete the current user's session file immediately"""
     try:
-        # Get the current session ID
-        session_id = session.get('_id')
-        if not session_id:
-            # Try to get session ID from Flask-Session's internal storage
-            session_id = getattr(session, '_id', None)
-        
-        if session_id:
-            # Remove the session key prefix if present
-            session_key = app.config['SESSION_KEY_PREFIX'] + session_id
-            session_file_path = os.path.join(app.config['SESSION_FILE_DIR'], session_key)
-            
-            if os.path.exists(session_file_path):
-                os.remove(session_file_path)
-                print(f"Immediately deleted session file: {session_key}")
-                return True
+        session_id = getattr(session, 'sid', None)
+        if session_id and session_files.delete_session(session_id):
+            print(f"Immediately deleted session file for session {session_id[:8]}...")
+            return True
         return False
     except Exception as e:
         print(f"Error deleting current session file: {e}")
         return False
 
-def check_and_cleanup_expired_sessions():
-    """Check for expired sessions and clean them immediately"""
-    try:
-        session_dir = app.config['SESSION_FILE_DIR']
-        if not os.path.exists(session_dir):
-            return 0
-        
-        current_time = time.time()
-        session_lifetime_seconds = app.config['PERMANENT_SESSION_LIFETIME'].total_seconds()
-        deleted_count = 0
-        
-        for filename in os.listdir(session_dir):
-            file_path = os.path.join(session_dir, filename)
-            
-            if not os.path.isfile(file_path):
-                continue
-            
-            # Check if file is expired
-            file_mtime = os.path.getmtime(file_path)
-            file_age = current_time - file_mtime
-            
-            if file_age > session_lifetime_seconds:
-                try:
-                    os.remove(file_path)
-                    deleted_count += 1
-                    print(f"Immediately deleted expired session file: {filename}")
-                except OSError as e:
-                    print(f"Error deleting expired session file {filename}: {e}")
-        
-        return deleted_count
-    except Exception as e:
-        print(f"Error in immediate session cleanup: {e}")
-        return 0
-
 def periodic_session_cleanup():
-    """Run session cleanup every 30 minutes"""
+    """Sweep expired sessions every SESSION_SWEEP_INTERVAL seconds"""
     while True:
-        time.sleep(1800)  # 30 minutes
-        cleanup_expired_session_files()
+        time.sleep(SESSION_SWEEP_INTERVAL)
+        cleanup_expired_sessions()
+
+def release_connections():
+    """Close idle SQLite connections before fork(); every process reopens its own on demand"""
+    entry_manager.release_connections()
+    login_throttle.release_connections()
+    if session_store is not None:
+        session_store.release_connections()
+
+def close_resources():
+    """Close database and session store connections and the password check pool.
+
+    Normally registered with atexit; a pre-forked worker leaves with
+    os._exit() and calls this itself.
+    """
+    password_verifier.shutdown()
+    login_throttle.close()
+    if session_store is not None:
+        session_store.close()
+    entry_manager.close()
 
 def get_session_stats():
-    """Get session file statistics"""
+    """Get session statistics for the configured backend"""
+    if session_store is not None:
+        try:
+            return dict(session_store.stats(), backend=SESSION_BACKEND)
+        except Exception as e:
+            print(f"Error getting session stats: {e}")
+            return {'backend': SESSION_BACKEND, 'active_sessions': 0, 'expired_sessions': 0}
+    if session_files is None:
+        # Cookie sessions live only in the browser
+        return {'backend': SESSION_BACKEND}
     try:
-        session_dir = app.config['SESSION_FILE_DIR']
-        if not os.path.exists(session_dir):
-            return {'total_files': 0, 'total_size': 0}
-        
-        total_files = 0
-        total_size = 0
-        
-        for filename in os.listdir(session_dir):
-            file_path = os.path.join(session_dir, filename)
-            if os.path.isfile(file_path):
-                total_files += 1
-                total_size += os.path.getsize(file_path)
-        
-        return {
-            'total_files': total_files,
-            'total_size': total_size,
-            'total_size_mb': round(total_size / (1024 * 1024), 2)
-        }
+        stats = session_files.expiry_index.stats()
+        stats['total_size_mb'] = round(stats['total_size'] / (1024 * 1024), 2)
+        return stats
     except Exception as e:
         print(f"Error getting session stats: {e}")
         return {'total_files': 0, 'total_size': 0}
@@ -257,11 +267,55 @@ def convert_date_string(date_str):
         return datetime.strptime(date_str, '%Y-%m-%d').date()
     return date_str
 
+def format_month_name(month_key):
+    """Format a YYYY-MM month key as e.g. 'January 2025'"""
+    return datetime.strptime(month_key, '%Y-%m').strftime('%B %Y')
+
+def get_selected_months(years, months, years_in_data):
+    """List the (month_key, month_name) pairs selected by the year/month chart filters"""
+    selected_months = set()
+    
+    if years and months:
+        # Both years and months are selected - use combinations
+        for year in years:
+            for month in months:
+                selected_months.add(f"{year}-{int(month):02d}")
+    elif years:
+        # Only years selected - include all months for those years
+        for year in years:
+            for month in range(1, 13):
+                selected_months.add(f"{year}-{month:02d}")
+    elif months:
+        # Only months selected - include those months for all years in the data
+        for year in years_in_data:
+            for month in months:
+                selected_months.add(f"{year}-{int(month):02d}")
+    
+    return [(month_key, format_month_name(month_key)) for month_key in selected_months]
+
+# Keyset pagination for /api/entries
+ENTRIES_PAGE_DEFAULT_LIMIT = 100
+ENTRIES_PAGE_MAX_LIMIT = 1000
+
+def encode_entries_cursor(entry):
+    """Encode an entry's (date, created_at, id) position as an opaque cursor"""
+    key = [entry.get('date'), entry.get('created_at'), entry.get('id')]
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+def decode_entries_cursor(cursor):
+    """Decode a cursor from encode_entries_cursor; raises ValueError if malformed"""
+    try:
+        entry_date, created_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (entry_date, created_at, int(entry_id))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+# Max entries accepted by one POST /api/entries/bulk request
+BULK_ENTRIES_MAX_ITEMS = 1000
+
 # Authentication helper functions
 def is_authenticated():
-    # Check for expired sessions and clean them immediately
-    check_and_cleanup_expired_sessions()
-    
+    # Expired sessions are never loaded, so no cleanup is needed here
     return 'authenticated' in session and session['authenticated'] == True
 
 def require_auth(f):
@@ -272,13 +326,196 @@ def require_auth(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
-# Before request handler for session cleanup
+# Conditional GET (ETag / 304) helpers
+API_CACHE_CONTROL = 'private, no-cache'  # browsers may store responses but must revalidate
+
+def build_etag(*parts):
+    """Strong ETag for the current path, normalized query parameters and version parts"""
+    normalized_args = sorted((key, sorted(request.args.getlist(key))) for key in request.args.keys())
+    digest = hashlib.sha1(json.dumps([request.path, normalized_args, parts]).encode('utf-8')).hexdigest()
+    return digest
+
+def conditional_get(version_func):
+    """Answer If-None-Match with 304 when the version from version_func is unchanged.
+
+    version_func receives the view's keyword arguments and returns a version
+    (or None to skip ETag handling). It runs before the view, so a 304 never
+    touches the entries table, and a body is always at least as new as its ETag.
+    """
+    def decorator(f):
+        def decorated_function(*args, **kwargs):
+            version = version_func(**kwargs)
+            if version is None:
+                return f(*args, **kwargs)
+            
+            etag = build_etag(version)
+            # Weak comparison: compressed responses carry the same ETag marked weak
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = API_CACHE_CONTROL
+            return response
+        decorated_function.__name__ = f.__name__
+        return decorated_function
+    return decorator
+
+def data_version(**kwargs):
+    """Collection version: database-wide counter bumped by every entry write"""
+    return entry_manager.get_data_version()
+
+def entry_version(entry_id, **kwargs):
+    """Single entry version: its updated_at timestamp"""
+    updated_at = entry_manager.get_entry_updated_at(entry_id)
+    return [entry_id, updated_at] if updated_at else None
+
+# Request metrics. Registered before compression so the after_request hook,
+# which Flask runs in reverse order, sees the final (compressed) body size.
+# They count this process's requests; serve.py calls share_request_metrics()
+# so that /api/admin/metrics merges the counters of all its workers.
+request_metrics = RequestMetrics()
+request_metrics_store = None
+
+def share_request_metrics(db_path):
+    """Have every process publish its request metrics to db_path (the server's previous run is forgotten)"""
+    global request_metrics_store
+    request_metrics_store = SharedMetricsStore(db_path)
+    request_metrics_store.clear()
+
+def publish_request_metrics():
+    """Publish this process's request metrics, if they are shared"""
+    if request_metrics_store is not None:
+        request_metrics_store.publish(request_metrics)
+
+def current_request_metrics():
+    """Metrics of every worker when they are shared, otherwise of this process"""
+    if request_metrics_store is None:
+        return request_metrics
+    publish_request_metrics()
+    return request_metrics_store.aggregate(request_metrics.buckets)
+
+def metrics_route():
+    """URL rule of the current request, so /api/entries/1 and /api/entries/2 share one series"""
+    return request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    request_metrics.request_started(request.method, metrics_route())
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('metrics_started')
+    if started is None:
+        return response
+    route = metrics_route()
+    if response.is_streamed:
+        response.response = request_metrics.count_stream(response.response, request.method, route)
+        response_bytes = 0
+    else:
+        response_bytes = response.content_length or 0
+    request_metrics.record_response(request.method, route, response.status_code,
+                                    time.perf_counter() - started, response_bytes)
+    return response
+
+@app.teardown_request
+def end_request_metrics(exc):
+    if g.pop('metrics_started', None) is not None:
+        request_metrics.request_ended(request.method, metrics_route())
+
+# SQL tracing (opt-in with SQL_TRACE_ENABLED): per-request statement count and
+# SQL time, reported in a Server-Timing header and per route in the metrics.
+# SQL run while a streamed body is sent happens after this and is not included.
 @app.before_request
-def cleanup_expired_sessions_before_request():
-    """Clean up expired sessions before each request (occasionally)"""
-    # Only run cleanup occasionally to avoid performance impact
-    if random.random() < 0.1:  # 10% chance
-        check_and_cleanup_expired_sessions()
+def start_sql_trace():
+    if sql_tracer is not None:
+        sql_tracer.begin()
+
+@app.after_request
+def report_sql_trace(response):
+    if sql_tracer is None:
+        return response
+    stats = sql_tracer.end()
+    if stats is not None:
+        response.headers.add('Server-Timing', f'sql;dur={stats["seconds"] * 1000:.2f};desc="{stats["statements"]} statements"')
+        request_metrics.record_sql(request.method, metrics_route(), stats['statements'], stats['seconds'])
+    return response
+
+# Response compression
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript')
+
+def choose_content_encoding():
+    """Pick the best supported encoding from Accept-Encoding (honours q-values), or None"""
+    supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(supported)
+
+def compress_body(data, encoding):
+    """Compress a complete response body"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESSION_LEVEL)
+
+def compress_stream(chunks, encoding):
+    """Compress a streamed body chunk by chunk, flushing so each chunk reaches the client promptly"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+@app.after_request
+def compress_response(response):
+    """Compress text/JSON responses according to Accept-Encoding.
+
+    Bodies smaller than COMPRESSION_MIN_SIZE are sent as is; streamed bodies
+    are always compressed incrementally. A compressed body has different
+    bytes, so its ETag is downgraded to a weak one (304s use weak comparison).
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.direct_passthrough:
+        return response
+    if 'Content-Encoding' in response.headers:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = choose_content_encoding()
+    if not encoding:
+        return response
+    
+    if response.status_code == 304:
+        etag, is_weak = response.get_etag()
+        if etag and not is_weak:
+            response.set_etag(etag, weak=True)
+        return response
+    # Any success with a body (e.g. 201/207 from the bulk endpoint); a 206 body is a byte range of the uncompressed one
+    if not 200 <= response.status_code < 300 or response.status_code in (204, 206):
+        return response
+    
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compress_body(data, encoding))
+    
+    response.headers['Content-Encoding'] = encoding
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(etag, weak=True)
+    return response
 
 # Routes
 @app.route('/')
@@ -290,69 +527,85 @@ def favicon():
     """Favicon route to prevent 404 errors"""
     return '', 204
 
+def entries_request_filters():
+    """Dashboard filters from the /api/entries query string; raises ValueError on a malformed date"""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    # Reject malformed dates the same way the old per-row parsing did
+    if start_date:
+        convert_date_string(start_date)
+    if end_date:
+        convert_date_string(end_date)
+    
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'application': request.args.get('application'),
+        'quality_status': request.args.get('quality_status'),
+        'prb_only': request.args.get('prb_only', 'false').lower() == 'true',
+        'hiim_only': request.args.get('hiim_only', 'false').lower() == 'true'
+    }
+
+def entries_request_page():
+    """(page_size, after) when the client asks for a page with limit and/or cursor, else None.
+
+    Raises ValueError for a malformed limit or cursor.
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return None
+    page_size = int(limit) if limit else ENTRIES_PAGE_DEFAULT_LIMIT
+    after = decode_entries_cursor(cursor) if cursor else None
+    return max(1, min(page_size, ENTRIES_PAGE_MAX_LIMIT)), after
+
+def entries_page_response(entries, page_size):
+    """JSON page from entries fetched with limit=page_size + 1 (the extra row means another page follows)"""
+    next_cursor = None
+    if len(entries) > page_size:
+        entries = entries[:page_size]
+        next_cursor = encode_entries_cursor(entries[-1])
+    return jsonify({'entries': entries, 'next_cursor': next_cursor})
+
 @app.route('/api/entries')
+@conditional_get(data_version)
 def get_entries():
     """Get production entries with optional filtering"""
     try:
-        # Get filter parameters
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        application = request.args.get('application')
-        quality_status = request.args.get('quality_status')
-        prb_only = request.args.get('prb_only', 'false').lower() == 'true'
-        hiim_only = request.args.get('hiim_only', 'false').lower() == 'true'
-        
-        # Get all entries from SharePoint SQLite database
-        all_entries = entry_manager.get_all_entries()
-        
-        # Apply filters
-        filtered_entries = []
-        for entry in all_entries:
-            # Date filters
-            if start_date:
-                entry_date = convert_date_string(entry.get('date', ''))
-                if entry_date < datetime.strptime(start_date, '%Y-%m-%d').date():
-                    continue
-            if end_date:
-                entry_date = convert_date_string(entry.get('date', ''))
-                if entry_date > datetime.strptime(end_date, '%Y-%m-%d').date():
-                    continue
-            
-            # Application filter
-            if application:
-                if application.lower() not in entry.get('application_name', '').lower():
-                    continue
-            
-            # Quality status filter
-            if quality_status:
-                if entry.get('quality_status') != quality_status:
-                    continue
-            
-            # PRB only filter
-            if prb_only:
-                # Accept legacy single field or new prbs array
-                if not entry.get('prb_id_number') and not (isinstance(entry.get('prbs'), list) and len(entry.get('prbs')) > 0):
-                    continue
-            
-            # HIIM only filter
-            if hiim_only:
-                # Accept legacy single field or new hiims array
-                if not entry.get('hiim_id_number') and not (isinstance(entry.get('hiims'), list) and len(entry.get('hiims')) > 0):
-                    continue
-            
-            filtered_entries.append(entry)
+        filters = entries_request_filters()
+        
+        # Paginated mode: only when the client asks for it with limit and/or cursor
+        try:
+            page = entries_request_page()
+        except ValueError:
+            return jsonify({'error': 'Invalid limit or cursor'}), 400
+        if page is not None:
+            page_size, after = page
+            entries = entry_manager.get_entries_filtered(limit=page_size + 1, after=after, **filters)
+            return entries_page_response(entries, page_size)
+        
+        # Streaming mode: serialize chunk by chunk straight from the SQL cursor
+        if request.args.get('stream', 'false').lower() == 'true':
+            return Response(stream_entries_json(filters), mimetype='application/json')
         
-        # Sort by date descending, then by created_at descending
-        filtered_entries.sort(key=lambda x: (
-            convert_date_string(x.get('date', '1900-01-01')),
-            x.get('created_at', '1900-01-01T00:00:00')
-        ), reverse=True)
+        # Filtering and ordering (date, then created_at, newest first) run in SQL
+        filtered_entries = entry_manager.get_entries_filtered(**filters)
         
         return jsonify(filtered_entries)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def stream_entries_json(filters):
+    """Yield a JSON array of the filtered entries one chunk of rows at a time"""
+    separator = '['
+    for chunk in entry_manager.iter_entries_filtered(**filters):
+        yield separator + ','.join(json.dumps(entry, separators=(',', ':'), sort_keys=True) for entry in chunk)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
 @app.route('/api/entries/<int:entry_id>')
+@conditional_get(entry_version)
 def get_entry(entry_id):
     """Get a specific production entry by ID"""
     try:
@@ -378,23 +631,81 @@ def create_entry():
         
         # Check if entry already exists for this date and application
         entry_date = convert_date_string(data['date'])
-        all_entries = entry_manager.get_all_entries()
-        
-        for existing_entry in all_entries:
-            if (existing_entry.get('date') == data['date'] and 
-                existing_entry.get('application_name') == data['application_name']):
-                return jsonify({'error': f'An entry already exists for {data["application_name"]} on {data["date"]}'}), 400
+        duplicate_error = f'An entry already exists for {data["application_name"]} on {data["date"]}'
+        if entry_manager.find_entry_id(data['date'], data['application_name']) is not None:
+            return jsonify({'error': duplicate_error}), 400
         
         # Create new entry
         entry = entry_manager.create_entry(data)
         
         if entry:
             return jsonify(entry), 201
+        elif entry_manager.find_entry_id(data['date'], data['application_name']) is not None:
+            # A concurrent request won the unique (date, application_name) index
+            return jsonify({'error': duplicate_error}), 400
         else:
             return jsonify({'error': 'Failed to create entry'}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/entries/bulk', methods=['POST'])
+@require_auth
+def create_entries_bulk():
+    """Create many production entries in one transaction.
+    
+    Accepts a JSON list of entries (or {"entries": [...]}) and reports a result
+    per item: created, invalid or duplicate. Valid, non-duplicate items are
+    written even when other items are rejected.
+    """
+    try:
+        data = request.get_json()
+        items = data.get('entries') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Request body must be a non-empty list of entries'}), 400
+        if len(items) > BULK_ENTRIES_MAX_ITEMS:
+            return jsonify({'error': f'At most {BULK_ENTRIES_MAX_ITEMS} entries can be created per request'}), 400
+        
+        # Validate the whole batch before touching the database
+        results = [None] * len(items)
+        valid_indexes = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {'index': index, 'status': 'invalid', 'error': 'Entry must be an object'}
+                continue
+            is_valid, error_msg = validate_entry_data(item)
+            if is_valid:
+                try:
+                    convert_date_string(item['date'])
+                except (TypeError, ValueError):
+                    is_valid, error_msg = False, 'Invalid date format. Use YYYY-MM-DD'
+            if not is_valid:
+                results[index] = {'index': index, 'status': 'invalid', 'error': error_msg}
+                continue
+            valid_indexes.append(index)
+        
+        # Duplicates (against the database and within the batch) are detected inside the write transaction
+        if valid_indexes:
+            created = entry_manager.create_entries([items[index] for index in valid_indexes])
+            if created is None:
+                return jsonify({'error': 'Failed to create entries'}), 500
+            for index, result in zip(valid_indexes, created):
+                results[index] = dict(result, index=index)
+        
+        created_count = sum(1 for result in results if result['status'] == 'created')
+        if created_count == len(items):
+            status_code = 201
+        elif created_count:
+            status_code = 207
+        else:
+            status_code = 400
+        return jsonify({
+            'created': created_count,
+            'failed': len(items) - created_count,
+            'results': results
+        }), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/entries/<int:entry_id>', methods=['PUT'])
 @require_auth
 def update_entry(entry_id):
@@ -414,12 +725,8 @@ def update_entry(entry_id):
             new_application = data.get('application_name', existing_entry.get('application_name'))
             
             # Check if another entry exists for this date and application (excluding current entry)
-            all_entries = entry_manager.get_all_entries()
-            for entry in all_entries:
-                if (entry.get('id') != entry_id and 
-                    entry.get('date') == new_date and 
-                    entry.get('application_name') == new_application):
-                    return jsonify({'error': f'An entry already exists for {new_application} on {new_date}'}), 400
+            if entry_manager.find_entry_id(new_date, new_application, exclude_id=entry_id) is not None:
+                return jsonify({'error': f'An entry already exists for {new_application} on {new_date}'}), 400
         
         # Validate entry data using the updated validation function
         # Allow partial updates by merging with existing entry for validation
@@ -434,6 +741,10 @@ def update_entry(entry_id):
         
         if updated_entry:
             return jsonify(updated_entry)
+        elif ('date' in data or 'application_name' in data) and \
+                entry_manager.find_entry_id(new_date, new_application, exclude_id=entry_id) is not None:
+            # A concurrent request won the unique (date, application_name) index
+            return jsonify({'error': f'An entry already exists for {new_application} on {new_date}'}), 400
         else:
             return jsonify({'error': 'Failed to update entry'}), 500
     except Exception as e:
@@ -454,6 +765,7 @@ def delete_entry(entry_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/stats')
+@conditional_get(data_version)
 def get_stats():
     """Get aggregated statistics for charts"""
     try:
@@ -469,47 +781,26 @@ def get_stats():
         years = request.args.getlist('year')
         months = request.args.getlist('month')
         
-        # Get all entries from SharePoint SQLite database
-        all_entries = entry_manager.get_all_entries()
+        # Reject malformed dates the same way the old per-row parsing did
+        if start_date:
+            convert_date_string(start_date)
+        if end_date:
+            convert_date_string(end_date)
         
-        # Apply filters
-        entries = []
-        for entry in all_entries:
-            # Date range filters
-            if start_date:
-                entry_date = convert_date_string(entry.get('date', ''))
-                if entry_date < datetime.strptime(start_date, '%Y-%m-%d').date():
-                    continue
-            if end_date:
-                entry_date = convert_date_string(entry.get('date', ''))
-                if entry_date > datetime.strptime(end_date, '%Y-%m-%d').date():
-                    continue
-            
-            # Monthly and yearly filters
-            if years or months:
-                entry_date = convert_date_string(entry.get('date', ''))
-                entry_year = str(entry_date.year)
-                entry_month = str(entry_date.month)
-                
-                if years and entry_year not in years:
-                    continue
-                if months and entry_month not in months:
-                    continue
-            
-            # Other filters
-            if application and application.lower() not in entry.get('application_name', '').lower():
-                continue
-            if quality_status and entry.get('quality_status') != quality_status:
-                continue
-            if prb_only == 'true' and not entry.get('prb_id_number'):
-                continue
-            if hiim_only == 'true' and not entry.get('hiim_id_number'):
-                continue
-            
-            entries.append(entry)
+        # Per (month, application) counts aggregated in SQL
+        monthly_rows = entry_manager.get_monthly_stats(
+            start_date=start_date,
+            end_date=end_date,
+            application=application,
+            quality_status=quality_status,
+            prb_only=prb_only == 'true',
+            hiim_only=hiim_only == 'true',
+            years=years,
+            months=months
+        )
         
         # Calculate statistics
-        total_entries = len(entries)
+        total_entries = 0
         quality_counts = {'Red': 0, 'Yellow': 0, 'Green': 0}
         punctuality_counts = {'Red': 0, 'Yellow': 0, 'Green': 0}
         prb_counts = {'active': 0, 'closed': 0}
@@ -523,123 +814,40 @@ def get_stats():
         monthly_hiim = {}
         
         # First, initialize all selected months with zero data
-        if years or months:
-            selected_months = set()
-            
-            # Generate all possible month-year combinations from selected years and months
-            if years and months:
-                # Both years and months are selected - use combinations
-                for year in years:
-                    for month in months:
-                        month_key = f"{year}-{int(month):02d}"
-                        month_name = datetime(int(year), int(month), 1).strftime('%B %Y')
-                        selected_months.add((month_key, month_name))
-            elif years:
-                # Only years selected - include all months for those years
-                for year in years:
-                    for month in range(1, 13):
-                        month_key = f"{year}-{month:02d}"
-                        month_name = datetime(int(year), month, 1).strftime('%B %Y')
-                        selected_months.add((month_key, month_name))
-            elif months:
-                # Only months selected - include those months for all years in the data
-                # Get year range from the entries
-                if entries:
-                    years_in_data = set(convert_date_string(entry.get('date', '1900-01-01')).year for entry in entries)
-                    for year in years_in_data:
-                        for month in months:
-                            month_key = f"{year}-{int(month):02d}"
-                            month_name = datetime(int(year), int(month), 1).strftime('%B %Y')
-                            selected_months.add((month_key, month_name))
-            
-            # Initialize all selected months with zero data
-            for month_key, month_name in selected_months:
-                monthly_quality[month_key] = {
-                    'month_name': month_name,
-                    'Red': 0, 'Yellow': 0, 'Green': 0
-                }
-                monthly_punctuality[month_key] = {
-                    'month_name': month_name,
-                    'Red': 0, 'Yellow': 0, 'Green': 0
-                }
-                monthly_prb[month_key] = {
-                    'month_name': month_name,
-                    'active': 0, 'closed': 0
-                }
-                monthly_hiim[month_key] = {
-                    'month_name': month_name,
-                    'active': 0, 'closed': 0
-                }
+        years_in_data = set(int(row['month'][:4]) for row in monthly_rows)
+        for month_key, month_name in get_selected_months(years, months, years_in_data):
+            monthly_quality[month_key] = {'month_name': month_name, 'Red': 0, 'Yellow': 0, 'Green': 0}
+            monthly_punctuality[month_key] = {'month_name': month_name, 'Red': 0, 'Yellow': 0, 'Green': 0}
+            monthly_prb[month_key] = {'month_name': month_name, 'active': 0, 'closed': 0}
+            monthly_hiim[month_key] = {'month_name': month_name, 'active': 0, 'closed': 0}
         
-        for entry in entries:
-            # Get month-year key for grouping
-            entry_date = convert_date_string(entry.get('date', '1900-01-01'))
-            month_key = f"{entry_date.year}-{entry_date.month:02d}"
-            month_name = entry_date.strftime('%B %Y')
+        for row in monthly_rows:
+            month_key = row['month']
+            month_name = format_month_name(month_key)
             
             # Initialize monthly data if not exists (for cases where no year/month filters are applied)
             if month_key not in monthly_quality:
-                monthly_quality[month_key] = {
-                    'month_name': month_name,
-                    'Red': 0, 'Yellow': 0, 'Green': 0
-                }
+                monthly_quality[month_key] = {'month_name': month_name, 'Red': 0, 'Yellow': 0, 'Green': 0}
             if month_key not in monthly_punctuality:
-                monthly_punctuality[month_key] = {
-                    'month_name': month_name,
-                    'Red': 0, 'Yellow': 0, 'Green': 0
-                }
+                monthly_punctuality[month_key] = {'month_name': month_name, 'Red': 0, 'Yellow': 0, 'Green': 0}
             if month_key not in monthly_prb:
-                monthly_prb[month_key] = {
-                    'month_name': month_name,
-                    'active': 0, 'closed': 0
-                }
+                monthly_prb[month_key] = {'month_name': month_name, 'active': 0, 'closed': 0}
             if month_key not in monthly_hiim:
-                monthly_hiim[month_key] = {
-                    'month_name': month_name,
-                    'active': 0, 'closed': 0
-                }
+                monthly_hiim[month_key] = {'month_name': month_name, 'active': 0, 'closed': 0}
             
-            # Quality counts
-            quality_status = entry.get('quality_status')
-            if quality_status:
-                quality_counts[quality_status] += 1
-                monthly_quality[month_key][quality_status] += 1
+            total_entries += row['total']
+            for status in ('Red', 'Yellow', 'Green'):
+                quality_counts[status] += row[f'quality_{status.lower()}']
+                monthly_quality[month_key][status] += row[f'quality_{status.lower()}']
+                punctuality_counts[status] += row[f'punctuality_{status.lower()}']
+                monthly_punctuality[month_key][status] += row[f'punctuality_{status.lower()}']
+            for status in ('active', 'closed'):
+                prb_counts[status] += row[f'prb_{status}']
+                monthly_prb[month_key][status] += row[f'prb_{status}']
+                hiim_counts[status] += row[f'hiim_{status}']
+                monthly_hiim[month_key][status] += row[f'hiim_{status}']
             
-            # Calculate punctuality based only on PRC Mail status
-            prc_mail_status = entry.get('prc_mail_status')
-            if prc_mail_status:
-                # Map old status values to new color scheme
-                if prc_mail_status in ['Red', 'red']:
-                    punctuality_counts['Red'] += 1
-                    monthly_punctuality[month_key]['Red'] += 1
-                elif prc_mail_status in ['Yellow', 'yellow', 'warning']:
-                    punctuality_counts['Yellow'] += 1
-                    monthly_punctuality[month_key]['Yellow'] += 1
-                elif prc_mail_status in ['Green', 'green', 'on-time']:
-                    punctuality_counts['Green'] += 1
-                    monthly_punctuality[month_key]['Green'] += 1
-                elif prc_mail_status in ['late']:
-                    punctuality_counts['Red'] += 1
-                    monthly_punctuality[month_key]['Red'] += 1
-                else:
-                    # For any other status, count as Yellow
-                    punctuality_counts['Yellow'] += 1
-                    monthly_punctuality[month_key]['Yellow'] += 1
-            
-            # Count PRB statuses
-            prb_id_status = entry.get('prb_id_status')
-            if prb_id_status:
-                prb_counts[prb_id_status] += 1
-                monthly_prb[month_key][prb_id_status] += 1
-            
-            # Count HIIM statuses
-            hiim_id_status = entry.get('hiim_id_status')
-            if hiim_id_status:
-                hiim_counts[hiim_id_status] += 1
-                monthly_hiim[month_key][hiim_id_status] += 1
-            
-            application_name = entry.get('application_name', 'Unknown')
-            app_counts[application_name] = app_counts.get(application_name, 0) + 1
+            app_counts[row['application_name']] = app_counts.get(row['application_name'], 0) + row['total']
         
         # Convert monthly data to sorted list
         monthly_quality_list = sorted(monthly_quality.items(), key=lambda x: x[0])
@@ -662,10 +870,22 @@ def get_stats():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def too_many_requests(message, retry_after):
+    """429 response telling the client when to retry"""
+    response = jsonify({'error': message, 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
 @app.route('/api/auth/login', methods=['POST'])
 def login():
     """Authenticate user"""
     try:
+        client = request.remote_addr or 'unknown'
+        retry_after = login_throttle.hit(client)
+        if retry_after:
+            return too_many_requests('Too many login attempts, please try again later', retry_after)
+        
         data = request.get_json()
         password = data.get('password', '')
         
@@ -675,7 +895,13 @@ def login():
             return jsonify({'error': 'Authentication not configured'}), 500
         
         # Check password
-        if bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
+        try:
+            password_ok = password_verifier.check(password.encode('utf-8'), stored_hash.encode('utf-8'))
+        except LoginBusyError as e:
+            return too_many_requests('Server is busy verifying logins, please retry shortly', e.retry_after)
+        
+        if password_ok:
+            login_throttle.reset(client)
             session['authenticated'] = True
             session.permanent = True
             return jsonify({'message': 'Authentication successful'})
@@ -687,8 +913,9 @@ def login():
 @app.route('/api/auth/logout', methods=['POST'])
 def logout():
     """Logout user"""
-    # Delete session file immediately on logout
-    delete_current_session_file()
+    # Delete session file immediately on logout (server-side rows are deleted when the cleared session is saved)
+    if SESSION_BACKEND == 'filesystem':
+        delete_current_session_file()
     
     # Clear session data
     session.pop('authenticated', None)
@@ -701,14 +928,30 @@ def auth_status():
     """Check authentication status"""
     return jsonify({'authenticated': is_authenticated()})
 
+@app.route('/api/changes')
+def get_changes():
+    """Current data version, and whether it differs from ?since=<version>.
+
+    Answers immediately here; the ASGI entry point (asgi.py) serves the same
+    route as a long poll that waits up to ?timeout= seconds for a change.
+    """
+    try:
+        since = request.args.get('since', type=int)
+        version = entry_manager.get_data_version()
+        response = jsonify({'data_version': version, 'changed': since is not None and version != since})
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/admin/cleanup-sessions', methods=['POST'])
 @require_auth
 def manual_cleanup_sessions():
-    """Manually clean up expired session files"""
+    """Manually clean up expired sessions"""
     try:
-        deleted_count = check_and_cleanup_expired_sessions()
+        deleted_count = cleanup_expired_sessions()
         return jsonify({
-            'message': f'Successfully cleaned up {deleted_count} expired session files'
+            'message': f'Successfully cleaned up {deleted_count} expired sessions'
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -716,14 +959,52 @@ def manual_cleanup_sessions():
 @app.route('/api/admin/session-stats')
 @require_auth
 def session_file_stats():
-    """Get session file statistics"""
+    """Get session statistics"""
     try:
         stats = get_session_stats()
         return jsonify(stats)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/metrics')
+@require_auth
+def metrics():
+    """Get per-route request metrics as JSON, or Prometheus text with ?format=prometheus.
+
+    Under serve.py the numbers cover all workers ('workers' in the JSON),
+    with other workers' counters up to METRICS_PUBLISH_INTERVAL old; under a
+    single process or another multi-process server, only the process that
+    answered. The login stats are always this process's.
+    """
+    try:
+        metrics = current_request_metrics()
+        if request.args.get('format') == 'prometheus':
+            return Response(metrics.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+        return jsonify(dict(metrics.snapshot(), login=password_verifier.stats()))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/cache-stats')
+@require_auth
+def cache_stats():
+    """Get read cache hit/miss statistics"""
+    try:
+        return jsonify(entry_manager.get_cache_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/duplicates')
+@require_auth
+def duplicate_entries():
+    """Get duplicate (date, application_name) pairs that keep the unique index from being created"""
+    try:
+        duplicates = entry_manager.get_duplicate_entries()
+        return jsonify({'unique_index': not duplicates, 'duplicates': duplicates})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/xva/stats')
+@conditional_get(data_version)
 def get_xva_stats():
     """Get XVA-specific statistics for charts and tables"""
     try:
@@ -733,141 +1014,60 @@ def get_xva_stats():
         years = request.args.getlist('year')
         months = request.args.getlist('month')
         
-        # Get all entries from SharePoint SQLite database and filter for XVA only
-        all_entries = entry_manager.get_all_entries()
+        # Reject malformed dates the same way the old per-row parsing did
+        if start_date:
+            convert_date_string(start_date)
+        if end_date:
+            convert_date_string(end_date)
         
-        # Apply filters for XVA entries only
-        entries = []
-        for entry in all_entries:
-            # Only XVA entries
-            if entry.get('application_name') != 'XVA':
-                continue
-            
-            # Date range filters
-            if start_date:
-                entry_date = convert_date_string(entry.get('date', ''))
-                if entry_date < datetime.strptime(start_date, '%Y-%m-%d').date():
-                    continue
-            if end_date:
-                entry_date = convert_date_string(entry.get('date', ''))
-                if entry_date > datetime.strptime(end_date, '%Y-%m-%d').date():
-                    continue
-            
-            # Monthly and yearly filters
-            if years or months:
-                entry_date = convert_date_string(entry.get('date', ''))
-                entry_year = str(entry_date.year)
-                entry_month = str(entry_date.month)
-                
-                if years and entry_year not in years:
-                    continue
-                if months and entry_month not in months:
-                    continue
-            
-            entries.append(entry)
-        
-        # Calculate XVA-specific statistics
-        monthly_red_counts = {}
-        root_cause_analysis = {}
+        # Red card counts per month and root cause breakdown, aggregated in SQL over XVA rows only
+        monthly_rows = entry_manager.get_monthly_stats(
+            start_date=start_date,
+            end_date=end_date,
+            years=years,
+            months=months,
+            application_name='XVA'
+        )
+        root_cause_list = entry_manager.get_xva_root_causes(
+            start_date=start_date,
+            end_date=end_date,
+            years=years,
+            months=months
+        )
         
         # Initialize monthly data for all selected months
-        if years or months:
-            from datetime import datetime
-            selected_months = set()
-            
-            if years and months:
-                for year in years:
-                    for month in months:
-                        month_key = f"{year}-{int(month):02d}"
-                        month_name = datetime(int(year), int(month), 1).strftime('%B %Y')
-                        selected_months.add((month_key, month_name))
-            elif years:
-                for year in years:
-                    for month in range(1, 13):
-                        month_key = f"{year}-{month:02d}"
-                        month_name = datetime(int(year), month, 1).strftime('%B %Y')
-                        selected_months.add((month_key, month_name))
-            elif months:
-                if entries:
-                    years_in_data = set(entry.date.year for entry in entries)
-                    for year in years_in_data:
-                        for month in months:
-                            month_key = f"{year}-{int(month):02d}"
-                            month_name = datetime(int(year), int(month), 1).strftime('%B %Y')
-                            selected_months.add((month_key, month_name))
-            
-            # Initialize all selected months with zero data
-            for month_key, month_name in selected_months:
-                monthly_red_counts[month_key] = {
-                    'month_name': month_name,
-                    'valo_red': 0,
-                    'sensi_red': 0,
-                    'cf_ra_red': 0,
-                    'total_red': 0
-                }
+        monthly_red_counts = {}
+        years_in_data = set(int(row['month'][:4]) for row in monthly_rows)
+        for month_key, month_name in get_selected_months(years, months, years_in_data):
+            monthly_red_counts[month_key] = {
+                'month_name': month_name,
+                'valo_red': 0,
+                'sensi_red': 0,
+                'cf_ra_red': 0,
+                'total_red': 0
+            }
         
-        for entry in entries:
-            # Get month-year key for grouping
-            entry_date = convert_date_string(entry.get('date', '1900-01-01'))
-            month_key = f"{entry_date.year}-{entry_date.month:02d}"
-            month_name = entry_date.strftime('%B %Y')
-            
-            # Initialize monthly data if not exists
+        for row in monthly_rows:
+            month_key = row['month']
             if month_key not in monthly_red_counts:
                 monthly_red_counts[month_key] = {
-                    'month_name': month_name,
+                    'month_name': format_month_name(month_key),
                     'valo_red': 0,
                     'sensi_red': 0,
                     'cf_ra_red': 0,
                     'total_red': 0
                 }
             
-            # Check if entry is a red card (punctuality OR quality is red)
-            is_red_card = False
-            
-            # Check punctuality statuses for red
-            if (entry.get('valo_status') == 'Red' or 
-                entry.get('sensi_status') == 'Red' or 
-                entry.get('cf_ra_status') == 'Red'):
-                is_red_card = True
-            
-            # Check quality status for red
-            if (entry.get('quality_legacy') == 'Red' or 
-                entry.get('quality_target') == 'Red'):
-                is_red_card = True
-            
-            if is_red_card:
-                # Count red occurrences by category
-                if entry.get('valo_status') == 'Red':
-                    monthly_red_counts[month_key]['valo_red'] += 1
-                
-                if entry.get('sensi_status') == 'Red':
-                    monthly_red_counts[month_key]['sensi_red'] += 1
-                
-                if entry.get('cf_ra_status') == 'Red':
-                    monthly_red_counts[month_key]['cf_ra_red'] += 1
-                
-                # Increment total red count for this month
-                monthly_red_counts[month_key]['total_red'] += 1
-                
-                # Root cause analysis
-                root_cause_app = entry.get('root_cause_application') or 'Unknown'
-                root_cause_type = entry.get('root_cause_type') or 'Unknown'
-                
-                key = f"{root_cause_app}|{root_cause_type}"
-                if key not in root_cause_analysis:
-                    root_cause_analysis[key] = {
-                        'root_cause_application': root_cause_app,
-                        'root_cause_type': root_cause_type,
-                        'count': 0
-                    }
-                root_cause_analysis[key]['count'] += 1
+            # valo/sensi/cf_ra red always make the entry a red card; total_red counts red cards
+            monthly_red_counts[month_key]['valo_red'] += row['valo_red']
+            monthly_red_counts[month_key]['sensi_red'] += row['sensi_red']
+            monthly_red_counts[month_key]['cf_ra_red'] += row['cf_ra_red']
+            monthly_red_counts[month_key]['total_red'] += row['red_cards']
         
         # Convert monthly data to sorted list
         monthly_red_counts_list = sorted(monthly_red_counts.items(), key=lambda x: x[0])
         
-        # Convert root cause analysis to list and calculate grand total
-        root_cause_list = list(root_cause_analysis.values())
+        # Calculate grand total
         grand_total = sum(item['count'] for item in root_cause_list)
         
         return jsonify({
@@ -893,8 +1093,8 @@ def initialize_database():
             hashed_password = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt())
             entry_manager.set_setting('admin_password', hashed_password.decode('utf-8'))
         
-        # Clean up any existing expired session files on startup
-        cleanup_expired_session_files()
+        # Clean up any existing expired sessions on startup
+        cleanup_expired_sessions()
         
     except Exception as e:
         raise
@@ -908,8 +1108,9 @@ if __name__ == '__main__':
     cleanup_thread.start()
     
     print("Starting ProdVision Dashboard...")
+    print(entry_manager.startup_report())
     print(f"Access the dashboard at: http://{HOST}:{PORT}")
     print("Default admin password: admin123")
-    print("Session cleanup: Enabled (runs every 30 minutes)")
+    print(f"Sessions: {SESSION_BACKEND} backend, expired sessions swept in the background")
     print("Press Ctrl+C to stop the server")
     app.run(debug=DEBUG, host=HOST, port=PORT)
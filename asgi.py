@@ -0,0 +1,393 @@
+"""
+ASGI entry point for ProdVision
+Run with an ASGI server, e.g.:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+Connections live in the event loop, so idle keep-alive and long-polling
+clients hold no thread. The read routes dashboards hit repeatedly
+(GET /api/entries, GET /api/entries/<id>, GET /api/changes) are async views
+that await the database through AsyncEntryManager; /api/changes becomes a
+long poll that waits for the data version to move. Every other route runs
+the Flask app unchanged through a WSGI bridge on a bounded thread pool.
+"""
+
+import asyncio
+import contextvars
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import jsonify, make_response, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.urls import url_decode
+
+from app import (app, entry_manager, sql_tracer, initialize_database, cleanup_expired_sessions, build_etag,
+                 entries_request_filters, entries_request_page, entries_page_response, API_CACHE_CONTROL)
+from async_adapter import AsyncEntryManager
+from config import SESSION_SWEEP_INTERVAL
+from config import ASGI_APP_WORKERS, ASYNC_DB_READ_WORKERS, ASYNC_DB_WRITE_WORKERS
+from config import LONG_POLL_MAX_SECONDS, LONG_POLL_CHECK_INTERVAL
+
+app_pool = ThreadPoolExecutor(max_workers=ASGI_APP_WORKERS, thread_name_prefix='asgi-app')
+db = AsyncEntryManager(entry_manager, read_workers=ASYNC_DB_READ_WORKERS, write_workers=ASYNC_DB_WRITE_WORKERS)
+
+
+async def in_app_pool(func, *args):
+    """Run CPU-bound work (JSON encoding, compression) off the event loop, in the current request context"""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(app_pool, context.run, func, *args)
+
+
+class ChangeNotifier:
+    """Wakes long polls when the data version moves.
+
+    However many clients are waiting, a single task checks the version every
+    `interval` seconds, and only while someone is waiting. Each check
+    resolves a future shared by the waiters that were already waiting when
+    it started, so every waiter compares its `since` with a version read
+    after its own and cannot miss a change made while it got ready to wait.
+    """
+
+    def __init__(self, db: AsyncEntryManager, interval: float = 1.0):
+        self.db = db
+        self.interval = interval
+        self.waiting = 0
+        self._next_check = None
+        self._watcher = None
+
+    async def wait_for_change(self, since: int, timeout: float) -> int:
+        """Return the data version as soon as it differs from `since`, or after `timeout` seconds"""
+        version = await self.db.get_data_version()
+        if version != since or timeout <= 0:
+            return version
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self.waiting += 1
+        try:
+            if self._watcher is None or self._watcher.done():
+                self._watcher = asyncio.ensure_future(self._watch())
+            while version == since:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                if self._next_check is None:
+                    self._next_check = loop.create_future()
+                try:
+                    # Shielded: a waiter timing out must not cancel the check others share
+                    checked = await asyncio.wait_for(asyncio.shield(self._next_check), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if checked is not None:
+                    version = checked
+        finally:
+            self.waiting -= 1
+        return version
+
+    async def _watch(self):
+        while self.waiting:
+            await asyncio.sleep(self.interval)
+            # Waiters arriving from now on wait for the next check, which reads after they arrived
+            check, self._next_check = self._next_check, None
+            try:
+                version = await self.db.get_data_version()
+            except Exception as e:
+                print(f"Change watcher error: {e}")
+                version = None  # waiters keep waiting for the next check
+            if check is not None:
+                check.set_result(version)
+
+    def stop(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+
+
+notifier = ChangeNotifier(db, interval=LONG_POLL_CHECK_INTERVAL)
+
+
+# Async views. They run inside a Flask request context (without loading the
+# session, which none of them use) so the app's before/after_request hooks
+# still add metrics, CORS headers and compression.
+
+async def conditional_response(version, render):
+    """Async counterpart of app.conditional_get: 304 when If-None-Match matches, else await render()"""
+    if version is None:
+        return app.make_response(await render())
+    etag = build_etag(version)
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        response = app.make_response(await render())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = API_CACHE_CONTROL
+    return response
+
+
+async def get_entries():
+    async def render():
+        try:
+            filters = entries_request_filters()
+            try:
+                page = entries_request_page()
+            except ValueError:
+                return jsonify({'error': 'Invalid limit or cursor'}), 400
+            if page is not None:
+                page_size, after = page
+                entries = await db.get_entries_filtered(limit=page_size + 1, after=after, **filters)
+                return await in_app_pool(entries_page_response, entries, page_size)
+            entries = await db.get_entries_filtered(**filters)
+            return await in_app_pool(jsonify, entries)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    return await conditional_response(await db.get_data_version(), render)
+
+
+async def get_entry(entry_id):
+    async def render():
+        try:
+            entry = await db.get_entry_by_id(entry_id)
+            if entry:
+                return jsonify(entry)
+            return jsonify({'error': 'Entry not found'}), 404
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    updated_at = await db.get_entry_updated_at(entry_id)
+    return await conditional_response([entry_id, updated_at] if updated_at else None, render)
+
+
+async def get_changes():
+    """Long poll: wait up to ?timeout= seconds for the data version to differ from ?since="""
+    try:
+        since = request.args.get('since', type=int)
+        timeout = min(max(request.args.get('timeout', 0.0, type=float), 0.0), LONG_POLL_MAX_SECONDS)
+        if since is None:
+            version = await db.get_data_version()
+        else:
+            version = await notifier.wait_for_change(since, timeout)
+        response = jsonify({'data_version': version, 'changed': since is not None and version != since})
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def serves_async(endpoint, environ) -> bool:
+    """Whether a GET for this Flask endpoint is handled by an async view"""
+    if endpoint == 'get_entries':
+        # Streamed bodies are produced by the Flask view, chunk by chunk from the SQL cursor
+        args = url_decode(environ.get('QUERY_STRING', ''))
+        return args.get('stream', 'false').lower() != 'true'
+    return endpoint in ASYNC_VIEWS
+
+
+# Flask endpoint name -> async view for GET/HEAD requests
+ASYNC_VIEWS = {
+    'get_entries': get_entries,
+    'get_entry': get_entry,
+    'get_changes': get_changes,
+}
+
+
+async def run_async_view(view, view_args, environ, send):
+    ctx = app.request_context(environ)
+    ctx.session = app.session_interface.make_null_session(app)
+    ctx.push()
+    try:
+        try:
+            try:
+                response = app.preprocess_request()
+            finally:
+                # before_request began a SQL trace on this (the loop) thread; end it on the same
+                # thread, as process_response runs on an app_pool thread. The view's queries run
+                # on the db pools, so async views get no per-request SQL stats.
+                if sql_tracer is not None:
+                    sql_tracer.end()
+            if response is None:
+                response = await view(**view_args)
+            response = app.make_response(response)
+        except Exception as e:
+            response = app.make_response((jsonify({'error': str(e)}), 500))
+        response = await in_app_pool(app.process_response, response)
+        headers = response.get_wsgi_headers(environ)
+        body = b'' if environ['REQUEST_METHOD'] == 'HEAD' or response.status_code in (204, 304) else response.get_data()
+    finally:
+        ctx.pop()
+    await send_response_start(send, response.status_code, headers.to_wsgi_list())
+    await send({'type': 'http.response.body', 'body': body})
+
+
+# WSGI bridge for everything else
+
+def build_environ(scope, body: bytes) -> dict:
+    """WSGI environ for an ASGI HTTP scope and its (fully read) request body"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]) if server[1] is not None else '80',
+        'SERVER_PROTOCOL': 'HTTP/' + scope.get('http_version', '1.1'),
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else 'HTTP_' + name
+        value = raw_value.decode('latin-1')
+        if key in environ:
+            environ[key] += ('; ' if key == 'HTTP_COOKIE' else ',') + value
+        else:
+            environ[key] = value
+    if body and 'CONTENT_LENGTH' not in environ:
+        environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+async def send_response_start(send, status: int, headers):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    })
+
+
+async def call_wsgi(environ, send):
+    """Run the Flask app for one request on the app pool, sending the body as it is produced.
+
+    A thread is held while the app computes each chunk, never while a slow
+    client receives it.
+    """
+    loop = asyncio.get_running_loop()
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+        return started.setdefault('written', []).append
+
+    def begin():
+        body = app(environ, start_response)
+        iterator = iter(body)
+        return body, iterator, next(iterator, None)
+
+    body, iterator, chunk = await loop.run_in_executor(app_pool, begin)
+    try:
+        await send_response_start(send, started['status'], started['headers'])
+        for data in started.get('written', []):
+            await send({'type': 'http.response.body', 'body': data, 'more_body': True})
+        while chunk is not None:
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            chunk = await loop.run_in_executor(app_pool, next, iterator, None)
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(body, 'close'):
+            await loop.run_in_executor(app_pool, body.close)
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+
+# Startup and shutdown (ASGI lifespan; also run on the first request by servers without it)
+
+_startup = None
+_background_tasks = []
+
+
+async def sweep_sessions():
+    """Delete expired sessions every SESSION_SWEEP_INTERVAL seconds (replaces app.py's cleanup thread)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            await loop.run_in_executor(app_pool, cleanup_expired_sessions)
+        except Exception as e:
+            print(f"Session cleanup error: {e}")
+
+
+async def startup():
+    """Initialize once; concurrent callers wait for the same initialization"""
+    global _startup
+    if _startup is None:
+        _startup = asyncio.ensure_future(_initialize())
+    await asyncio.shield(_startup)
+
+
+async def _initialize():
+    def initialize():
+        with app.app_context():
+            initialize_database()
+
+    await asyncio.get_running_loop().run_in_executor(app_pool, initialize)
+    _background_tasks.append(asyncio.ensure_future(sweep_sessions()))
+    print("Starting ProdVision Dashboard (ASGI)...")
+    print(entry_manager.startup_report())
+
+
+async def shutdown():
+    for task in _background_tasks:
+        task.cancel()
+    notifier.stop()
+    db.shutdown()
+    app_pool.shutdown(wait=False)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await startup()
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI 3 application"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    await startup()
+    environ = build_environ(scope, await read_body(receive))
+    if environ['REQUEST_METHOD'] in ('GET', 'HEAD'):
+        try:
+            endpoint, view_args = app.url_map.bind_to_environ(environ).match(method='GET')
+        except HTTPException:
+            endpoint = None
+        if endpoint is not None and serves_async(endpoint, environ):
+            await run_async_view(ASYNC_VIEWS[endpoint], view_args, environ, send)
+            return
+    await call_wsgi(environ, send)
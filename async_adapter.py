@@ -0,0 +1,128 @@
+"""
+Async Entry Manager
+asyncio facade over ProductionEntryManagerWorking for the ASGI serving mode.
+Blocking SQLite calls run on dedicated thread pools, one for reads and one for
+writes, each with its own concurrency limit, so a burst of dashboard reads
+cannot hold up saves and a slow save cannot hold up reads.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+class AsyncEntryManager:
+    """Awaitable versions of the entry manager's methods.
+
+    Callers beyond a pool's worker count wait on an asyncio semaphore in the
+    event loop (a suspended coroutine, not a thread), so the number of threads
+    is fixed no matter how many requests are waiting. Writes default to a
+    single worker: SQLite allows one writer at a time, so more would only
+    queue on the database lock.
+    """
+
+    def __init__(self, manager, read_workers: int = 4, write_workers: int = 1):
+        self.manager = manager
+        self.read_workers = read_workers
+        self.write_workers = write_workers
+        self._pools = {
+            'read': ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix='db-read'),
+            'write': ThreadPoolExecutor(max_workers=write_workers, thread_name_prefix='db-write')
+        }
+        self._limits = None  # semaphores, created on first use inside the running loop
+        self._lock = threading.Lock()
+        self._counts = {kind: {'running': 0, 'waiting': 0, 'completed': 0} for kind in self._pools}
+
+    def _semaphores(self) -> Dict[str, asyncio.Semaphore]:
+        if self._limits is None:
+            self._limits = {
+                'read': asyncio.Semaphore(self.read_workers),
+                'write': asyncio.Semaphore(self.write_workers)
+            }
+        return self._limits
+
+    async def _run(self, kind: str, func, *args, **kwargs):
+        counts = self._counts[kind]
+        with self._lock:
+            counts['waiting'] += 1
+        async with self._semaphores()[kind]:
+            with self._lock:
+                counts['waiting'] -= 1
+                counts['running'] += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pools[kind], lambda: func(*args, **kwargs))
+            finally:
+                with self._lock:
+                    counts['running'] -= 1
+                    counts['completed'] += 1
+
+    async def read(self, func, *args, **kwargs):
+        """Run a blocking read on the read pool"""
+        return await self._run('read', func, *args, **kwargs)
+
+    async def write(self, func, *args, **kwargs):
+        """Run a blocking write on the write pool"""
+        return await self._run('write', func, *args, **kwargs)
+
+    # Reads
+
+    async def get_data_version(self) -> int:
+        return await self.read(self.manager.get_data_version)
+
+    async def get_entry_updated_at(self, entry_id: int) -> Optional[str]:
+        return await self.read(self.manager.get_entry_updated_at, entry_id)
+
+    async def get_all_entries(self) -> List[Dict]:
+        return await self.read(self.manager.get_all_entries)
+
+    async def get_entries_filtered(self, **filters) -> List[Dict]:
+        return await self.read(self.manager.get_entries_filtered, **filters)
+
+    async def get_entry_by_id(self, entry_id: int) -> Optional[Dict]:
+        return await self.read(self.manager.get_entry_by_id, entry_id)
+
+    async def get_monthly_stats(self, **filters) -> List[Dict]:
+        return await self.read(self.manager.get_monthly_stats, **filters)
+
+    async def get_xva_root_causes(self, **filters) -> List[Dict]:
+        return await self.read(self.manager.get_xva_root_causes, **filters)
+
+    async def find_entry_id(self, date: str, application_name: str, exclude_id: int = None) -> Optional[int]:
+        return await self.read(self.manager.find_entry_id, date, application_name, exclude_id)
+
+    async def get_setting(self, key: str) -> Optional[str]:
+        return await self.read(self.manager.get_setting, key)
+
+    # Writes
+
+    async def create_entry(self, entry_data: Dict) -> Optional[Dict]:
+        return await self.write(self.manager.create_entry, entry_data)
+
+    async def create_entries(self, entries_data: List[Dict]) -> Optional[List[Dict]]:
+        return await self.write(self.manager.create_entries, entries_data)
+
+    async def update_entry(self, entry_id: int, update_data: Dict) -> Optional[Dict]:
+        return await self.write(self.manager.update_entry, entry_id, update_data)
+
+    async def delete_entry(self, entry_id: int) -> bool:
+        return await self.write(self.manager.delete_entry, entry_id)
+
+    async def set_setting(self, key: str, value: str) -> bool:
+        return await self.write(self.manager.set_setting, key, value)
+
+    async def rebuild_rollups(self) -> int:
+        return await self.write(self.manager.rebuild_rollups)
+
+    def stats(self) -> Dict:
+        """Running, waiting and completed calls per pool"""
+        with self._lock:
+            return {
+                kind: dict(counts, workers=self.read_workers if kind == 'read' else self.write_workers)
+                for kind, counts in self._counts.items()
+            }
+
+    def shutdown(self):
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for SharePointSQLiteAdapter
+Seeds temporary databases of configurable size and times the read and write
+paths, recording latency percentiles, queries per call and peak memory.
+Results are written as JSON so runs can be compared across changes.
+
+Usage:
+    python3 benchmarks/bench_adapter.py --sizes 1000 10000 --output before.json
+    python3 benchmarks/bench_adapter.py --sizes 1000 10000 --output after.json --compare before.json
+"""
+
+import sys
+import os
+import argparse
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+# Add the repository root to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sharepoint_sqlite_adapter import SharePointSQLiteAdapter
+from generate_dummy_data import DEFAULT_APPLICATIONS, generate_entry, plan_for_count, iter_entries
+from bench_child_rows import count_queries
+
+PERCENTILES = (50, 90, 95, 99)
+SEED_BATCH_SIZE = 2000
+
+
+def seed_database(adapter, entry_count, seed):
+    """Fill the adapter's database with generated entries dated up to 2024-12-31"""
+    rng = random.Random(seed)
+    end_date = date(2024, 12, 31)
+    applications, dates = plan_for_count(entry_count, DEFAULT_APPLICATIONS, end_date, include_weekends=True)
+    batch = []
+    for entry_data in iter_entries(applications, dates, rng, entry_count):
+        batch.append(entry_data)
+        if len(batch) >= SEED_BATCH_SIZE:
+            adapter.create_entries(batch)
+            batch = []
+    if batch:
+        adapter.create_entries(batch)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds"""
+    values = sorted(sample * 1000 for sample in samples)
+    summary = {f'p{pct}': round(percentile(values, pct), 3) for pct in PERCENTILES}
+    summary.update(
+        min=round(values[0], 3),
+        max=round(values[-1], 3),
+        mean=round(sum(values) / len(values), 3)
+    )
+    return summary
+
+
+def bench_operation(counter, func, args_list):
+    """Call func(*args) for each args tuple; the last call runs under tracemalloc for peak memory"""
+    samples = []
+    counter['queries'] = 0
+    for args in args_list[:-1]:
+        started = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - started)
+    timed_queries = counter['queries']
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(*args_list[-1])
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if not samples:
+        # A single iteration: its (tracemalloc-inflated) time is all we have
+        samples.append(elapsed)
+        timed_queries = counter['queries']
+
+    return {
+        'iterations': len(args_list),
+        'latency_ms': summarize(samples),
+        'queries_per_call': round(timed_queries / len(samples), 2),
+        'peak_memory_bytes': peak
+    }
+
+
+def replacement_children(rng):
+    """Child arrays used to replace an entry's issues/PRBs/HIIMs on update"""
+    fresh = generate_entry('CVAR ALL', '2024-01-01', rng)
+    return {'issues': fresh['issues'], 'prbs': fresh['prbs'], 'hiims': fresh['hiims']}
+
+
+def run_size(size, iterations, list_iterations, seed):
+    """Benchmark every operation against a fresh database of `size` entries"""
+    temp_dir = tempfile.mkdtemp(prefix='prodvision-bench-')
+    try:
+        adapter = SharePointSQLiteAdapter('bench', data_dir=temp_dir)
+        started = time.perf_counter()
+        seed_database(adapter, size, seed)
+        seed_seconds = time.perf_counter() - started
+        counter = count_queries(adapter)
+        rng = random.Random(seed + 1)
+
+        conn = adapter.get_connection()
+        entry_ids = [row[0] for row in conn.execute('SELECT id FROM entries')]
+        conn.close()
+        sample_ids = rng.sample(entry_ids, min(iterations, len(entry_ids)))
+
+        # New entries use dates after the seeded range so they never collide
+        first_new_date = date(2025, 1, 1)
+        new_entries = [
+            (generate_entry('CVAR ALL', (first_new_date + timedelta(days=i)).isoformat(), rng),)
+            for i in range(iterations)
+        ]
+
+        cases = [
+            ('get_all_entries', adapter.get_all_entries, [()] * list_iterations),
+            ('get_entries_by_application', adapter.get_entries_by_application, [('XVA',)] * list_iterations),
+            ('get_entry_by_id', adapter.get_entry_by_id, [(entry_id,) for entry_id in sample_ids]),
+            ('create_entry', adapter.create_entry, new_entries),
+            ('update_entry', adapter.update_entry,
+             [(entry_id, dict(replacement_children(rng), remarks='Updated by benchmark')) for entry_id in sample_ids]),
+            ('delete_entry', adapter.delete_entry, [(entry_id,) for entry_id in sample_ids]),
+        ]
+
+        results = []
+        for operation, func, args_list in cases:
+            result = bench_operation(counter, func, args_list)
+            result.update(size=size, operation=operation)
+            results.append(result)
+            latency = result['latency_ms']
+            print(f"{size:>8}  {operation:<28} {latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+                  f" {result['queries_per_call']:>8} {result['peak_memory_bytes'] / 1024:>10.0f}")
+        adapter.close()
+        return seed_seconds, results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def git_revision():
+    """Current commit of the working tree, if available"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline_path):
+    """Print p50 latency and query count changes against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = {(r['size'], r['operation']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path}:")
+    print(f"{'entries':>8}  {'operation':<28} {'p50 before':>11} {'p50 after':>10} {'change':>8} {'queries':>12}")
+    for result in results:
+        before = baseline.get((result['size'], result['operation']))
+        if before is None:
+            continue
+        p50_before = before['latency_ms']['p50']
+        p50_after = result['latency_ms']['p50']
+        change = (p50_after - p50_before) / p50_before * 100 if p50_before else 0.0
+        queries = f"{before['queries_per_call']} -> {result['queries_per_call']}"
+        print(f"{result['size']:>8}  {result['operation']:<28} {p50_before:>11.2f} {p50_after:>10.2f}"
+              f" {change:>+7.1f}% {queries:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SharePointSQLiteAdapter operations')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help='Entry counts to benchmark (default: 1000 10000)')
+    parser.add_argument('--iterations', type=int, default=50,
+                        help='Calls per single-entry operation (default: 50)')
+    parser.add_argument('--list-iterations', type=int, default=5,
+                        help='Calls per list operation (default: 5)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--output', default='bench_adapter_results.json',
+                        help='Where to write JSON results (default: bench_adapter_results.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    print(f"{'entries':>8}  {'operation':<28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'peak KiB':>10}")
+    results = []
+    seed_seconds = {}
+    for size in args.sizes:
+        seed_seconds[size], size_results = run_size(size, args.iterations, args.list_iterations, args.seed)
+        results.extend(size_results)
+
+    report = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'config': {
+            'sizes': args.sizes,
+            'iterations': args.iterations,
+            'list_iterations': args.list_iterations,
+            'seed': args.seed
+        },
+        'seed_seconds': {str(size): round(seconds, 3) for size, seconds in seed_seconds.items()},
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark for loading entries together with their child rows
+Compares the batched child-row loader against the old per-entry (N+1) queries
+and reports query count and latency at 1k, 10k and 100k entries
+"""
+
+import sys
+import os
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the repository root to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sharepoint_sqlite_adapter import SharePointSQLiteAdapter, CHILD_TABLES
+
+APPLICATIONS = ['CVAR ALL', 'CVAR NYQ', 'XVA']
+
+
+def seed_database(adapter, entry_count, seed=42):
+    """Fill the adapter's database with synthetic entries and child rows"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    now = datetime.utcnow().isoformat()
+
+    conn = adapter.get_connection()
+    cursor = conn.cursor()
+    entries = []
+    for i in range(entry_count):
+        entry_date = (start + timedelta(days=i // len(APPLICATIONS))).strftime('%Y-%m-%d')
+        entries.append((
+            i + 1, entry_date, APPLICATIONS[i % len(APPLICATIONS)],
+            rng.choice(['Red', 'Yellow', 'Green']), rng.choice(['Red', 'Yellow', 'Green']), now, now
+        ))
+    cursor.executemany(
+        'INSERT INTO entries (id, date, application_name, quality_status, prc_mail_status, created_at, updated_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)', entries
+    )
+
+    issues, prbs, hiims = [], [], []
+    for entry_id in range(1, entry_count + 1):
+        for position in range(rng.randint(1, 3)):
+            issues.append((entry_id, 'Synthetic issue', 'Synthetic remark', position, now))
+        for position in range(rng.randint(0, 2)):
+            prbs.append((entry_id, str(rng.randint(10000, 99999)), 'active', '', position, now))
+        for position in range(rng.randint(0, 2)):
+            hiims.append((entry_id, str(rng.randint(1000, 9999)), 'closed', '', position, now))
+    cursor.executemany('INSERT INTO issues (entry_id, description, remarks, position, created_at) VALUES (?, ?, ?, ?, ?)', issues)
+    cursor.executemany('INSERT INTO prbs (entry_id, prb_id_number, prb_id_status, prb_link, position, created_at) VALUES (?, ?, ?, ?, ?, ?)', prbs)
+    cursor.executemany('INSERT INTO hiims (entry_id, hiim_id_number, hiim_id_status, hiim_link, position, created_at) VALUES (?, ?, ?, ?, ?, ?)', hiims)
+    conn.commit()
+    conn.close()
+
+
+def count_queries(adapter):
+    """Wrap adapter.get_connection so every executed statement is counted.
+
+    The counting trace callback is only installed while a connection is
+    checked out; it forwards to the connection's own callback (an SQLTracer's)
+    and puts that back when the connection is closed.
+    """
+    counter = {'queries': 0}
+    original_get_connection = adapter.get_connection
+
+    def counting_connection():
+        conn = original_get_connection()
+        previous = getattr(conn, 'trace_callback', None)
+        release = conn.close
+
+        def trace(statement):
+            counter['queries'] += 1
+            if previous is not None:
+                previous(statement)
+
+        def close():
+            conn.set_trace_callback(previous)
+            del conn.close
+            release()
+
+        conn.set_trace_callback(trace)
+        conn.close = close
+        return conn
+
+    adapter.get_connection = counting_connection
+    return counter
+
+
+def legacy_get_all_entries(adapter):
+    """Previous get_all_entries implementation: three child queries per entry"""
+    conn = adapter.get_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM entries ORDER BY created_at DESC')
+    columns = [description[0] for description in cursor.description]
+    entries = []
+    for row in cursor.fetchall():
+        entry = dict(zip(columns, row))
+        for table, child_columns in CHILD_TABLES:
+            cursor.execute(
+                f"SELECT {', '.join(child_columns)} FROM {table} WHERE entry_id = ? ORDER BY position ASC, id ASC",
+                (entry['id'],)
+            )
+            entry[table] = [dict(zip(child_columns, r)) for r in cursor.fetchall()]
+        entries.append(entry)
+    conn.close()
+    return entries
+
+
+def measure(counter, func, *args):
+    """Run func once and return (seconds, query count, result)"""
+    counter['queries'] = 0
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    return elapsed, counter['queries'], result
+
+
+def run(sizes, legacy_max):
+    print(f"{'entries':>8}  {'method':<32} {'queries':>8} {'latency':>10}")
+    for size in sizes:
+        temp_dir = tempfile.mkdtemp(prefix='prodvision-bench-')
+        try:
+            adapter = SharePointSQLiteAdapter('bench', data_dir=temp_dir)
+            seed_database(adapter, size)
+            counter = count_queries(adapter)
+
+            cases = [
+                ('get_all_entries', adapter.get_all_entries),
+                ('get_entries_by_application', lambda: adapter.get_entries_by_application('XVA')),
+            ]
+            if size <= legacy_max:
+                cases.append(('get_all_entries (legacy N+1)', lambda: legacy_get_all_entries(adapter)))
+
+            for label, func in cases:
+                elapsed, queries, _ = measure(counter, func)
+                print(f"{size:>8}  {label:<32} {queries:>8} {elapsed * 1000:>8.1f}ms")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched child-row loading')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Entry counts to benchmark (default: 1000 10000 100000)')
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='Largest size to also run the old per-entry loader on (default: 10000)')
+    args = parser.parse_args()
+    run(args.sizes, args.legacy_max)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,14 +14,57 @@ SHAREPOINT_URL = "https://groupsg001.sharepoint.com/sites/CCRTeam/Shared%20Docum
 
 # Database Configuration
 DATABASE_PATH = "./data/prodvision.db"
+DB_POOL_SIZE = 8  # Idle SQLite connections kept open per process
+READ_CACHE_MAX_BYTES = 64 * 1024 * 1024  # In-process cache for entries and stats (0 disables)
+READ_CACHE_PROBE_INTERVAL = 0  # Seconds between checks for other processes' writes (0 = every lookup; higher may serve stale data that long)
+SQL_TRACE_ENABLED = False  # Count/time SQL per request (Server-Timing header, /api/admin/metrics)
+SQL_SLOW_QUERY_MS = 100  # With tracing on, log statements slower than this with EXPLAIN QUERY PLAN
+
+# Sessions
+SESSION_BACKEND = 'sqlite'  # 'sqlite' (server-side table), 'cookie' (signed stateless cookie) or 'filesystem' (legacy)
+SESSION_DB_PATH = "./data/sessions.db"  # Kept apart from prodvision.db so logins don't invalidate the read cache
+SESSION_SWEEP_INTERVAL = 300  # Seconds between background deletions of expired sessions
+SESSION_SWEEP_BATCH_SIZE = 500  # Expired sessions deleted per transaction
+
+# Login protection
+LOGIN_BCRYPT_WORKERS = 2  # Password checks run concurrently (each takes ~100-300 ms of CPU)
+LOGIN_MAX_PENDING = 16  # Further checks allowed to wait; beyond this logins get 429 + Retry-After
+LOGIN_RATE_LIMIT_ATTEMPTS = 10  # Login attempts allowed per client...
+LOGIN_RATE_LIMIT_WINDOW = 60  # ...per this many seconds
+LOGIN_THROTTLE_DB_PATH = "./data/sessions.db"  # Login attempts are recorded here so every worker process shares the limit
+LOGIN_TRUSTED_PROXIES = 0  # Reverse proxies in front of the app; with N > 0 the client is taken from X-Forwarded-For
+
+# Response Compression (gzip, or brotli when the optional brotli package is installed)
+COMPRESSION_MIN_SIZE = 1024  # Bytes; smaller responses are sent uncompressed
+COMPRESSION_LEVEL = 6  # gzip level 1-9
+BROTLI_QUALITY = 4  # brotli quality 0-11
+
+# ASGI serving mode (asgi.py, e.g. `uvicorn asgi:application`)
+ASGI_APP_WORKERS = 8  # Threads running Flask routes and after_request hooks (compression)
+ASYNC_DB_READ_WORKERS = 4  # Threads for SQLite reads made by async routes
+ASYNC_DB_WRITE_WORKERS = 1  # Threads for SQLite writes made by async routes (SQLite has one writer at a time)
+LONG_POLL_MAX_SECONDS = 30  # Longest wait allowed for /api/changes?timeout=
+LONG_POLL_CHECK_INTERVAL = 1.0  # Seconds between data version checks while long polls are waiting
+
+# Multi-process server (serve.py; Werkzeug-based, sized for a small team)
+SERVER_WORKERS = 0  # Worker processes; 0 = one per CPU core
+MAINTENANCE_INTERVAL = 3600  # Seconds between PRAGMA optimize / WAL checkpoints (run by the master only)
+METRICS_DB_PATH = "./data/metrics.db"  # Where workers publish request metrics so /api/admin/metrics covers all of them
+METRICS_PUBLISH_INTERVAL = 5  # Seconds between publishes; other workers' numbers are up to this old
 
 # Production Server Configuration
 SERVER_MODE = True  # Enable server-specific features
 SHAREPOINT_SYNC_ENABLED = False  # Disable SharePoint sync
 
+# SharePoint sync (sync_sharepoint.py)
+SYNC_REMOTE_DIR = None  # Directory to sync with (e.g. a OneDrive-synced SharePoint library); None = HTTP to SHAREPOINT_URL
+SYNC_CHUNK_SIZE = 256 * 1024  # Bytes per content-hashed chunk; a multiple of the SQLite page size
+
 # Instructions:
 # 1. The application uses SQLite database stored locally and synced to SharePoint
 # 2. Database file: ./data/prodvision.db
-# 3. SharePoint sync: Automatic on all database operations (can be disabled)
-# 4. For production: Set DEBUG=False and use a proper WSGI server
+# 3. SharePoint sync: `python3 sync_sharepoint.py push|pull` transfers only the chunks that changed
+# 4. For a small team: Set DEBUG=False and run `python3 serve.py` (pre-forked Werkzeug workers);
+#    for heavier or internet-facing traffic use a production WSGI server (e.g. gunicorn app:app) behind a reverse proxy
 # 5. For 24/7 operation: Use systemd, supervisor, or similar process manager
+# 6. For many idle or polling dashboard clients: serve asgi.py with an ASGI server (uvicorn asgi:application)
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Dummy Data Generator for ProdVision
+Generates reproducible production entries for any applications and date range,
+or at load-testing scale (1k / 100k / 1M entries), and writes them in bulk
+transactions. Existing (date, application) entries are skipped, never overwritten.
+
+Usage:
+    python3 generate_dummy_data.py                                  # last 3 months, all applications
+    python3 generate_dummy_data.py --applications XVA --seed 7
+    python3 generate_dummy_data.py --start 2024-01-01 --end 2024-12-31 --weekends
+    python3 generate_dummy_data.py --preset 100k --data-dir /tmp/prodvision-load
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+# Add the current directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sharepoint_sqlite_adapter import ProductionEntryManagerWorking
+from config import SHAREPOINT_URL
+
+# Entry counts for --preset
+SCALE_PRESETS = {
+    '1k': 1000,
+    '100k': 100000,
+    '1M': 1000000,
+}
+
+DEFAULT_APPLICATIONS = ['CVAR ALL', 'CVAR NYQ', 'XVA']
+DEFAULT_BATCH_SIZE = 2000
+
+# --preset/--count never go back further than this; larger counts add load-test
+# applications instead, since (date, application) is unique
+MAX_SPAN_DAYS = 3 * 365
+LOAD_APPLICATION_PREFIX = 'LOAD APP'
+
+# Per-application value pools and child-row fan-out: (min, max) issues/PRBs/HIIMs per entry.
+# Applications not listed here are generated like CVAR ALL.
+APPLICATION_PROFILES = {
+    'CVAR ALL': {
+        'issue_descriptions': [
+            "Database connection timeout",
+            "Memory leak in calculation engine",
+            "Network latency issues",
+            "Configuration file corruption",
+            "Authentication service down",
+            "Data validation error",
+            "Performance degradation",
+            "Cache invalidation problem"
+        ],
+        'issue_prefix': "Issue",
+        'issues': (1, 4),
+        'prbs': (0, 3),
+        'hiims': (0, 2),
+        'prb_range': (10000, 99999),
+        'hiim_range': (1000, 9999),
+        'cp_alerts_ratio': 0.3,
+        'remarks_prefix': "Daily production report",
+        'remarks': ['All systems operational', 'Minor issues resolved',
+                    'Performance monitoring active', 'Routine maintenance completed'],
+    },
+    'CVAR NYQ': {
+        'issue_descriptions': [
+            "NYQ calculation engine timeout",
+            "Market data feed interruption",
+            "Risk calculation error",
+            "Configuration mismatch",
+            "Database query optimization needed",
+            "Memory allocation issue",
+            "Network connectivity problem",
+            "Data validation failure"
+        ],
+        'issue_prefix': "NYQ Issue",
+        'issues': (1, 3),
+        'prbs': (0, 2),
+        'hiims': (0, 2),
+        'prb_range': (20000, 29999),
+        'hiim_range': (2000, 2999),
+        'cp_alerts_ratio': 0.4,
+        'remarks_prefix': "NYQ production report",
+        'remarks': ['NYQ calculations completed', 'Market data processing successful',
+                    'Risk metrics updated', 'NYQ system stable'],
+    },
+    'XVA': {
+        'issue_descriptions': [
+            "XVA calculation engine timeout",
+            "CVA calculation error",
+            "DVA computation failure",
+            "FVA calculation issue",
+            "KVA computation problem",
+            "XVA aggregation error",
+            "Counterparty data missing",
+            "XVA model validation failure"
+        ],
+        'issue_prefix': "XVA Issue",
+        'issues': (1, 3),
+        'prbs': (0, 2),
+        'hiims': (0, 2),
+        'prb_range': (30000, 39999),
+        'hiim_range': (3000, 3999),
+        'remarks_prefix': "XVA production report",
+        'remarks': ['XVA calculations completed successfully', 'CVA/DVA processing finished',
+                    'FVA/KVA computations updated', 'XVA system performance stable'],
+    },
+}
+
+XVA_ROOT_CAUSE_APPLICATIONS = [
+    "XVA Engine", "CVA Calculator", "DVA Processor", "FVA Module",
+    "KVA Component", "XVA Aggregator", "Risk Engine", "Pricing System"
+]
+
+XVA_ROOT_CAUSE_TYPES = [
+    "Performance Issue", "Data Quality", "Configuration Error",
+    "Memory Leak", "Network Timeout", "Calculation Error",
+    "Model Validation", "System Integration"
+]
+
+STATUSES = ['Red', 'Yellow', 'Green']
+
+
+def get_dates(start_date, end_date, include_weekends=False):
+    """List ISO (YYYY-MM-DD) dates from start_date to end_date inclusive"""
+    dates = []
+    current_date = start_date
+    while current_date <= end_date:
+        # Monday=0 ... Sunday=6
+        if include_weekends or current_date.weekday() < 5:
+            dates.append(current_date.isoformat())
+        current_date += timedelta(days=1)
+    return dates
+
+
+def plan_for_count(entry_count, applications, end_date, include_weekends=False):
+    """Choose (applications, dates) holding entry_count entries, counting back from end_date.
+
+    Dates go back only as far as needed and never more than MAX_SPAN_DAYS;
+    if the given applications cannot hold entry_count entries in that window,
+    numbered load-test applications are added.
+    """
+    window = get_dates(end_date - timedelta(days=MAX_SPAN_DAYS - 1), end_date, include_weekends)
+    days_needed = -(-entry_count // len(applications))
+    if days_needed <= len(window):
+        return list(applications), window[len(window) - days_needed:]
+
+    applications_needed = -(-entry_count // len(window))
+    extra = applications_needed - len(applications)
+    load_applications = [f"{LOAD_APPLICATION_PREFIX} {i:0{len(str(extra))}d}" for i in range(1, extra + 1)]
+    return list(applications) + load_applications, window
+
+
+def generate_entry(application_name, date_str, rng):
+    """Generate one dummy entry, with child rows, for an application and date"""
+    profile = APPLICATION_PROFILES.get(application_name, APPLICATION_PROFILES['CVAR ALL'])
+    day_name = datetime.strptime(date_str, '%Y-%m-%d').strftime('%A')
+
+    def random_time():
+        # Business hours, HH:MM
+        return f"{rng.randint(8, 18):02d}:{rng.choice([0, 15, 30, 45]):02d}"
+
+    issues = [{
+        "description": rng.choice(profile['issue_descriptions']),
+        "remarks": f"{profile['issue_prefix']} #{i + 1} - {rng.choice(['Critical', 'High', 'Medium', 'Low'])} priority"
+    } for i in range(rng.randint(*profile['issues']))]
+
+    prbs = [{
+        "prb_id_number": str(rng.randint(*profile['prb_range'])),
+        "prb_id_status": rng.choice(['active', 'closed']),
+        "prb_link": f"https://prb.example.com/{rng.randint(*profile['prb_range'])}"
+    } for _ in range(rng.randint(*profile['prbs']))]
+
+    hiims = [{
+        "hiim_id_number": str(rng.randint(*profile['hiim_range'])),
+        "hiim_id_status": rng.choice(['active', 'closed']),
+        "hiim_link": f"https://hiim.example.com/{rng.randint(*profile['hiim_range'])}"
+    } for _ in range(rng.randint(*profile['hiims']))]
+
+    entry_data = {
+        "date": date_str,
+        "day": day_name,
+        "application_name": application_name,
+        "issues": issues,
+        "prbs": prbs,
+        "hiims": hiims,
+    }
+
+    if application_name == 'XVA':
+        entry_data.update({
+            "acq_text": random_time() if rng.random() > 0.5 else "",
+            "valo_text": random_time(),
+            "valo_status": rng.choice(STATUSES),
+            "sensi_text": random_time(),
+            "sensi_status": rng.choice(STATUSES),
+            "cf_ra_text": random_time(),
+            "cf_ra_status": rng.choice(STATUSES),
+            "quality_legacy": rng.choice(STATUSES),
+            "quality_target": rng.choice(STATUSES),
+            "root_cause_application": rng.choice(XVA_ROOT_CAUSE_APPLICATIONS),
+            "root_cause_type": rng.choice(XVA_ROOT_CAUSE_TYPES),
+            "xva_remarks": f"{profile['remarks_prefix']} for {date_str} - {rng.choice(profile['remarks'])}"
+        })
+    else:
+        has_cp_alerts = rng.random() > profile['cp_alerts_ratio']
+        entry_data.update({
+            "prc_mail_text": random_time(),
+            "prc_mail_status": rng.choice(STATUSES),
+            "cp_alerts_text": random_time() if has_cp_alerts else "",
+            "cp_alerts_status": rng.choice(STATUSES) if has_cp_alerts else "",
+            "quality_status": rng.choice(STATUSES),
+            "remarks": f"{profile['remarks_prefix']} for {date_str} - {rng.choice(profile['remarks'])}"
+        })
+
+    return entry_data
+
+
+def iter_entries(applications, dates, rng, limit=None):
+    """Yield dummy entries date by date, one per application, up to limit entries"""
+    count = 0
+    for date_str in dates:
+        for application_name in applications:
+            if limit is not None and count >= limit:
+                return
+            yield generate_entry(application_name, date_str, rng)
+            count += 1
+
+
+def write_entries(entry_manager, entries, batch_size):
+    """Write entries through the bulk path in batches; returns (created, duplicates, failed)"""
+    created = duplicates = failed = 0
+    batch = []
+
+    def flush():
+        nonlocal created, duplicates, failed
+        results = entry_manager.create_entries(batch)
+        if results is None:
+            failed += len(batch)
+            print(f"❌ Failed to write a batch of {len(batch)} entries")
+        else:
+            for result in results:
+                if result['status'] == 'created':
+                    created += 1
+                else:
+                    duplicates += 1
+        print(f"📝 {created + duplicates + failed} entries processed ({created} created)")
+        batch.clear()
+
+    for entry_data in entries:
+        batch.append(entry_data)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return created, duplicates, failed
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{value}', use YYYY-MM-DD")
+
+
+def main(argv=None):
+    """Generate dummy data; returns True if no batch failed"""
+    parser = argparse.ArgumentParser(description='Generate dummy production entries')
+    parser.add_argument('--applications', nargs='+', default=DEFAULT_APPLICATIONS,
+                        help=f"Applications to generate entries for (default: {' '.join(DEFAULT_APPLICATIONS)})")
+    parser.add_argument('--start', type=parse_date, help='First date, YYYY-MM-DD (default: 90 days before --end)')
+    parser.add_argument('--end', type=parse_date, help='Last date, YYYY-MM-DD (default: today)')
+    parser.add_argument('--weekends', action='store_true', help='Also generate Saturday and Sunday entries')
+    parser.add_argument('--preset', choices=sorted(SCALE_PRESETS, key=SCALE_PRESETS.get),
+                        help='Generate this many entries, going back from --end as far as needed, at most '
+                             f'{MAX_SPAN_DAYS} days, with extra applications beyond that (ignores --start)')
+    parser.add_argument('--count', type=int, help='Like --preset, with an explicit entry count')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Entries per transaction (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--data-dir', default='./data', help='Directory holding prodvision.db (default: ./data)')
+    args = parser.parse_args(argv)
+
+    end_date = args.end or date.today()
+    entry_count = args.count or SCALE_PRESETS.get(args.preset)
+    applications = args.applications
+    if entry_count:
+        applications, dates = plan_for_count(entry_count, args.applications, end_date, args.weekends)
+    else:
+        start_date = args.start or end_date - timedelta(days=90)
+        dates = get_dates(start_date, end_date, args.weekends)
+
+    total = min(entry_count, len(dates) * len(applications)) if entry_count else len(dates) * len(applications)
+    print(f"🚀 Generating {total} entries for {', '.join(args.applications)}")
+    if len(applications) > len(args.applications):
+        print(f"➕ Plus {len(applications) - len(args.applications)} load-test applications "
+              f"to stay within {MAX_SPAN_DAYS} days")
+    if dates:
+        print(f"📅 {len(dates)} dates from {dates[0]} to {dates[-1]}")
+    if args.seed is not None:
+        print(f"🎲 Seed: {args.seed}")
+
+    entry_manager = ProductionEntryManagerWorking(SHAREPOINT_URL, data_dir=args.data_dir)
+    try:
+        started = time.perf_counter()
+        rng = random.Random(args.seed)
+        created, duplicates, failed = write_entries(
+            entry_manager, iter_entries(applications, dates, rng, entry_count), args.batch_size
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        entry_manager.close()
+
+    print(f"\n🎉 Dummy data generation completed in {elapsed:.1f}s!")
+    print(f"✅ Successfully created: {created} entries")
+    print(f"ℹ️  Skipped (already exist): {duplicates} entries")
+    print(f"❌ Failed: {failed} entries")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
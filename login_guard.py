@@ -0,0 +1,166 @@
+"""
+Login Guard
+Runs bcrypt password checks in a small bounded worker pool and throttles
+login attempts per client, so a burst of logins cannot starve other requests.
+The throttle keeps its attempts in SQLite so all worker processes share it.
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from sharepoint_sqlite_adapter import SQLiteConnectionPool
+
+
+class LoginBusyError(Exception):
+    """Raised when too many password checks are already running or queued"""
+
+    def __init__(self, retry_after: int):
+        super().__init__('Too many logins in progress')
+        self.retry_after = retry_after
+
+
+class PasswordVerifier:
+    """bcrypt.checkpw on at most `max_workers` threads, with at most `max_pending` checks waiting.
+
+    bcrypt releases the GIL while hashing, so capping the workers caps the
+    CPU that logins can take; requests beyond the queue limit are rejected
+    immediately with a retry hint instead of piling up.
+
+    check() still blocks the calling request thread until its hash is done
+    (it waits on the future's result()): the pool bounds the CPU spent on
+    bcrypt, not how many request threads sit waiting on logins. The queue
+    limit is what keeps that number small.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+        self._lock = threading.Lock()
+        self._in_progress = 0
+        self._average_seconds = 0.2  # refined as checks complete
+        self.rejected = 0
+
+    def _timed_check(self, password: bytes, hashed: bytes) -> bool:
+        started = time.perf_counter()
+        try:
+            return bcrypt.checkpw(password, hashed)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._average_seconds = 0.8 * self._average_seconds + 0.2 * elapsed
+
+    def _retry_after_locked(self) -> int:
+        # Seconds until the current backlog should have drained
+        return max(1, math.ceil(self._in_progress / self.max_workers * self._average_seconds))
+
+    def check(self, password: bytes, hashed: bytes) -> bool:
+        """Verify a password against a bcrypt hash; raises LoginBusyError when saturated"""
+        with self._lock:
+            if self._in_progress >= self.max_workers + self.max_pending:
+                self.rejected += 1
+                raise LoginBusyError(self._retry_after_locked())
+            self._in_progress += 1
+        try:
+            return self._executor.submit(self._timed_check, password, hashed).result()
+        finally:
+            with self._lock:
+                self._in_progress -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_progress': self._in_progress,
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'average_check_ms': round(self._average_seconds * 1000, 1),
+                'rejected': self.rejected
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+class LoginThrottle:
+    """Sliding-window limit of login attempts per client, shared by every process using `db_path`.
+
+    Attempts are rows in a `login_attempts` table (normally in the sessions
+    database), so serve.py's pre-forked workers enforce one limit between
+    them instead of each allowing `max_attempts`. hit() checks and records
+    an attempt in one IMMEDIATE transaction, so concurrent logins from
+    several processes cannot both slip under the limit.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 10, window_seconds: float = 60, pool_size: int = 2):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.pool = SQLiteConnectionPool(db_path, size=pool_size)
+        conn = self.pool.acquire()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS login_attempts (
+                    client TEXT NOT NULL,
+                    attempted_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_login_attempts_client ON login_attempts(client, attempted_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_login_attempts_attempted_at ON login_attempts(attempted_at)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def hit(self, client: str) -> int:
+        """Record an attempt; returns 0 if allowed, else seconds until the client may retry"""
+        now = time.time()
+        cutoff = now - self.window_seconds
+        conn = self.pool.acquire()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('DELETE FROM login_attempts WHERE client = ? AND attempted_at <= ?', (client, cutoff))
+                count, oldest = conn.execute(
+                    'SELECT COUNT(*), MIN(attempted_at) FROM login_attempts WHERE client = ?', (client,)).fetchone()
+                if count >= self.max_attempts:
+                    retry_after = max(1, math.ceil(oldest - cutoff))
+                else:
+                    conn.execute('INSERT INTO login_attempts (client, attempted_at) VALUES (?, ?)', (client, now))
+                    retry_after = 0
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.close()
+        return retry_after
+
+    def reset(self, client: str):
+        """Forget a client's attempts (after a successful login)"""
+        self._execute('DELETE FROM login_attempts WHERE client = ?', (client,))
+
+    def sweep(self) -> int:
+        """Delete attempts older than the window for every client; returns how many"""
+        return self._execute('DELETE FROM login_attempts WHERE attempted_at <= ?', (time.time() - self.window_seconds,))
+
+    def _execute(self, sql: str, params=()) -> int:
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def release_connections(self):
+        """Close idle connections (e.g. before fork); they are reopened on demand"""
+        self.pool.close_idle()
+
+    def close(self):
+        self.pool.close_all()
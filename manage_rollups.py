@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Monthly Rollup Maintenance Script for ProdVision
+Rebuilds the monthly_rollups table from entries, or checks it against a full recompute.
+
+Usage:
+    python3 manage_rollups.py check
+    python3 manage_rollups.py rebuild
+"""
+
+import sys
+import argparse
+from sharepoint_sqlite_adapter import ProductionEntryManagerWorking
+from config import SHAREPOINT_URL
+
+def check_rollups(entry_manager):
+    """Report counters where the rollups disagree with the entries table"""
+    mismatches = entry_manager.check_rollups()
+    if not mismatches:
+        print("✅ Monthly rollups match a full recompute")
+        return True
+
+    print(f"❌ Found {len(mismatches)} mismatching rollup counters:")
+    for mismatch in mismatches:
+        print(f"   {mismatch['application_name']} {mismatch['month']} {mismatch['counter']}: "
+              f"expected {mismatch['expected']}, found {mismatch['actual']}")
+    print("Run 'python3 manage_rollups.py rebuild' to recompute them")
+    return False
+
+def rebuild_rollups(entry_manager):
+    """Recompute all rollups from the entries table"""
+    row_count = entry_manager.rebuild_rollups()
+    print(f"✅ Rebuilt monthly rollups: {row_count} (application, month) rows")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain the monthly_rollups statistics table')
+    parser.add_argument('command', choices=['check', 'rebuild'], help='check consistency or rebuild from entries')
+    args = parser.parse_args()
+
+    entry_manager = ProductionEntryManagerWorking(SHAREPOINT_URL)
+    try:
+        if args.command == 'check':
+            return check_rollups(entry_manager)
+        return rebuild_rollups(entry_manager)
+    finally:
+        entry_manager.close()
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,173 @@
+"""
+Read Cache
+In-process LRU cache for entry lists, single entries and stats results,
+invalidated by a data version that every write bumps
+"""
+
+import sys
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached result (dicts, lists and scalars)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(v) for v in value)
+    return size
+
+
+def copy_value(value: Any) -> Any:
+    """Copy the dicts and lists of a cached result; scalars (str, int, None) are immutable and shared"""
+    if isinstance(value, dict):
+        return {k: copy_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_value(v) for v in value]
+    return value
+
+
+class ReadCache:
+    """Read-through LRU cache bounded by estimated memory.
+
+    Every cached value is tagged with the data version it was loaded at and
+    is only served while that version is current. The version is bumped
+    explicitly after each write from this process, and also whenever SQLite's
+    PRAGMA data_version on a dedicated probe connection changes, which covers
+    commits made by other connections and other processes.
+
+    Every caller gets its own copy of a cached value, so routes may modify
+    what they are given. Copying containers is far cheaper than the SQL and
+    child-row assembly it replaces.
+
+    The probe is a PRAGMA under the cache lock, so by default every lookup
+    pays one small query and lookups are serialized on it. probe_interval
+    (seconds) skips the probe for lookups soon after the last one; writes from
+    this process still invalidate at once, but another process's writes can
+    then be served stale for up to that long.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = 64 * 1024 * 1024, probe_interval: float = 0.0):
+        self.max_bytes = max_bytes
+        self.probe_interval = probe_interval
+        self._probed_at = None
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.db_path = db_path
+        self._probe = None
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self) -> int:
+        if self._probe is None:
+            self._probe = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._probe.execute('PRAGMA data_version').fetchone()[0]
+
+    def _bump_locked(self):
+        self.version += 1
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def bump(self) -> int:
+        """Invalidate everything cached so far; returns the new data version"""
+        with self._lock:
+            self._bump_locked()
+            return self.version
+
+    def current_version(self) -> int:
+        """Return the data version, bumping it first if the database changed underneath us"""
+        with self._lock:
+            now = time.monotonic()
+            if self._probed_at is not None and now - self._probed_at < self.probe_interval:
+                return self.version
+            self._probed_at = now
+            data_version = self._read_data_version()
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._bump_locked()
+            return self.version
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return a copy of the cached value for key, calling loader() on a miss"""
+        if self.max_bytes <= 0:
+            return loader()
+
+        version = self.current_version()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = item[1]
+            else:
+                value = None
+                self.misses += 1
+        if value is not None:
+            return copy_value(value)
+
+        value = loader()
+        if value is None:
+            return value
+
+        size = estimate_size(value)
+        # The caller keeps (and may modify) the loaded value; the cache stores a copy
+        stored = copy_value(value)
+        with self._lock:
+            # Skip storing if a write landed while loading, or the value alone exceeds the bound
+            if self.version != version or size > self.max_bytes:
+                return value
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[2]
+            self._entries[key] = (version, stored, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and memory use for tuning"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def release_probe(self):
+        """Close the probe connection (e.g. before fork); it is reopened on next use.
+
+        PRAGMA data_version values are only comparable on one connection, so
+        everything cached so far is invalidated when the new probe starts.
+        """
+        with self._lock:
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
+            self._data_version = None
+            self._probed_at = None
+
+    def close(self):
+        """Drop cached values and close the probe connection"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
@@ -0,0 +1,322 @@
+"""
+Request Metrics
+Per-route request counts, status codes, latency histograms, response bytes and
+in-flight requests, exported as JSON or Prometheus text.
+
+A RequestMetrics instance counts the requests of its own process. Under a
+multi-process server each worker publishes its counters to a
+SharedMetricsStore, and the metrics endpoint merges every worker's counters.
+"""
+
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+# Upper bounds (seconds) of the latency histogram buckets; a final +Inf bucket is implied
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = 'prodvision_http'
+
+
+class RouteStats:
+    """Counters for one (method, route) pair"""
+
+    __slots__ = ('count', 'status_codes', 'bucket_counts', 'latency_sum', 'latency_max',
+                 'response_bytes', 'in_flight', 'sql_requests', 'sql_statements', 'sql_seconds')
+
+    def __init__(self, bucket_count: int):
+        self.count = 0
+        self.status_codes = {}
+        self.bucket_counts = [0] * (bucket_count + 1)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.response_bytes = 0
+        self.in_flight = 0
+        self.sql_requests = 0
+        self.sql_statements = 0
+        self.sql_seconds = 0.0
+
+
+def _estimate_percentile(bucket_counts: List[int], buckets, count: int, q: float) -> float:
+    """Estimate a latency percentile (seconds) by interpolating inside the histogram bucket that holds it"""
+    if not count:
+        return 0.0
+    target = q * count
+    cumulative = 0
+    for index, bucket_count in enumerate(bucket_counts):
+        if cumulative + bucket_count >= target and bucket_count:
+            if index >= len(buckets):
+                # Beyond the largest bound; like Prometheus, report that bound
+                return buckets[-1]
+            lower = buckets[index - 1] if index else 0.0
+            return lower + (buckets[index] - lower) * (target - cumulative) / bucket_count
+        cumulative += bucket_count
+    return buckets[-1]
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """Thread-safe per-route request metrics.
+
+    Routes are keyed by their URL rule (e.g. /api/entries/<int:entry_id>), not
+    the concrete path, so the number of series stays bounded. Recording a
+    request costs a dict lookup and a bisect under a lock.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self.workers = 1
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget everything counted so far (e.g. in a freshly forked worker)"""
+        with self._lock:
+            self.started_at = time.time()
+            self._routes = {}
+
+    def state(self) -> Dict:
+        """Raw counters as a JSON-serialisable dict, for SharedMetricsStore"""
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                'buckets': list(self.buckets),
+                'routes': [[method, route, {name: getattr(stats, name) for name in RouteStats.__slots__}]
+                           for (method, route), stats in self._routes.items()]
+            }
+
+    def add_state(self, state: Dict, include_in_flight: bool = True):
+        """Add another process's state() to these counters (histogram buckets must match)"""
+        if tuple(state['buckets']) != self.buckets:
+            raise ValueError('Cannot merge request metrics with different latency buckets')
+        with self._lock:
+            self.started_at = min(self.started_at, state['started_at'])
+            for method, route, counters in state['routes']:
+                stats = self._stats(method, route)
+                stats.count += counters['count']
+                for code, n in counters['status_codes'].items():
+                    stats.status_codes[int(code)] = stats.status_codes.get(int(code), 0) + n
+                stats.bucket_counts = [a + b for a, b in zip(stats.bucket_counts, counters['bucket_counts'])]
+                stats.latency_sum += counters['latency_sum']
+                stats.latency_max = max(stats.latency_max, counters['latency_max'])
+                stats.response_bytes += counters['response_bytes']
+                if include_in_flight:
+                    stats.in_flight += counters['in_flight']
+                stats.sql_requests += counters['sql_requests']
+                stats.sql_statements += counters['sql_statements']
+                stats.sql_seconds += counters['sql_seconds']
+
+    def _stats(self, method: str, route: str) -> RouteStats:
+        stats = self._routes.get((method, route))
+        if stats is None:
+            stats = self._routes[(method, route)] = RouteStats(len(self.buckets))
+        return stats
+
+    def request_started(self, method: str, route: str):
+        with self._lock:
+            self._stats(method, route).in_flight += 1
+
+    def request_ended(self, method: str, route: str):
+        with self._lock:
+            self._stats(method, route).in_flight -= 1
+
+    def record_response(self, method: str, route: str, status_code: int, seconds: float, response_bytes: int = 0):
+        """Record a finished response's status, latency and (known) body size"""
+        bucket = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            stats = self._stats(method, route)
+            stats.count += 1
+            stats.status_codes[status_code] = stats.status_codes.get(status_code, 0) + 1
+            stats.bucket_counts[bucket] += 1
+            stats.latency_sum += seconds
+            if seconds > stats.latency_max:
+                stats.latency_max = seconds
+            stats.response_bytes += response_bytes
+
+    def record_sql(self, method: str, route: str, statements: int, seconds: float):
+        """Record the SQL work of one request (only when SQL tracing is enabled)"""
+        with self._lock:
+            stats = self._stats(method, route)
+            stats.sql_requests += 1
+            stats.sql_statements += statements
+            stats.sql_seconds += seconds
+
+    def add_response_bytes(self, method: str, route: str, response_bytes: int):
+        """Count bytes of a streamed body as they are sent"""
+        with self._lock:
+            self._stats(method, route).response_bytes += response_bytes
+
+    def count_stream(self, chunks, method: str, route: str):
+        """Wrap a streamed response body so its bytes are counted"""
+        for chunk in chunks:
+            self.add_response_bytes(method, route, len(chunk))
+            yield chunk
+
+    def _percentile_ms(self, stats: RouteStats, q: float) -> float:
+        # Interpolation can overshoot inside the top bucket; never report more than the observed max
+        estimate = _estimate_percentile(stats.bucket_counts, self.buckets, stats.count, q)
+        return round(min(estimate, stats.latency_max) * 1000, 3)
+
+    def snapshot(self) -> Dict:
+        """All metrics as a JSON-serialisable dict, latencies in milliseconds"""
+        with self._lock:
+            routes = []
+            for (method, route), stats in sorted(self._routes.items(), key=lambda item: (item[0][1], item[0][0])):
+                cumulative = 0
+                histogram = {}
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), stats.bucket_counts):
+                    cumulative += bucket_count
+                    histogram['+Inf' if bound == float('inf') else repr(bound)] = cumulative
+                routes.append({
+                    'method': method,
+                    'route': route,
+                    'count': stats.count,
+                    'in_flight': stats.in_flight,
+                    'status_codes': {str(code): n for code, n in sorted(stats.status_codes.items())},
+                    'latency_ms': {
+                        'p50': self._percentile_ms(stats, 0.50),
+                        'p95': self._percentile_ms(stats, 0.95),
+                        'p99': self._percentile_ms(stats, 0.99),
+                        'mean': round(stats.latency_sum / stats.count * 1000, 3) if stats.count else 0.0,
+                        'max': round(stats.latency_max * 1000, 3)
+                    },
+                    'latency_histogram': histogram,
+                    'response_bytes': stats.response_bytes
+                })
+                if stats.sql_requests:
+                    routes[-1]['sql'] = {
+                        'statements': stats.sql_statements,
+                        'statements_per_request': round(stats.sql_statements / stats.sql_requests, 2),
+                        'ms_per_request': round(stats.sql_seconds / stats.sql_requests * 1000, 3)
+                    }
+            return {
+                'workers': self.workers,
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'in_flight': sum(stats.in_flight for stats in self._routes.values()),
+                'routes': routes
+            }
+
+    def prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._routes.items(), key=lambda item: (item[0][1], item[0][0]))
+            requests, durations, sizes, in_flight, sql_statements, sql_seconds = [], [], [], [], [], []
+            for (method, route), stats in items:
+                labels = f'method="{_escape_label(method)}",route="{_escape_label(route)}"'
+                for code, n in sorted(stats.status_codes.items()):
+                    requests.append(f'{METRIC_PREFIX}_requests_total{{{labels},status="{code}"}} {n}')
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), stats.bucket_counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    durations.append(f'{METRIC_PREFIX}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                durations.append(f'{METRIC_PREFIX}_request_duration_seconds_sum{{{labels}}} {stats.latency_sum:.6f}')
+                durations.append(f'{METRIC_PREFIX}_request_duration_seconds_count{{{labels}}} {stats.count}')
+                sizes.append(f'{METRIC_PREFIX}_response_bytes_total{{{labels}}} {stats.response_bytes}')
+                in_flight.append(f'{METRIC_PREFIX}_requests_in_flight{{{labels}}} {stats.in_flight}')
+                if stats.sql_requests:
+                    sql_statements.append(f'{METRIC_PREFIX}_sql_statements_total{{{labels}}} {stats.sql_statements}')
+                    sql_seconds.append(f'{METRIC_PREFIX}_sql_seconds_total{{{labels}}} {stats.sql_seconds:.6f}')
+
+        lines = [
+            f'# HELP {METRIC_PREFIX}_requests_total Requests handled, by route and status code',
+            f'# TYPE {METRIC_PREFIX}_requests_total counter',
+        ] + requests + [
+            f'# HELP {METRIC_PREFIX}_request_duration_seconds Time to produce the response (headers, for streamed bodies)',
+            f'# TYPE {METRIC_PREFIX}_request_duration_seconds histogram',
+        ] + durations + [
+            f'# HELP {METRIC_PREFIX}_response_bytes_total Response body bytes sent',
+            f'# TYPE {METRIC_PREFIX}_response_bytes_total counter',
+        ] + sizes + [
+            f'# HELP {METRIC_PREFIX}_requests_in_flight Requests currently being handled',
+            f'# TYPE {METRIC_PREFIX}_requests_in_flight gauge',
+        ] + in_flight
+        if sql_statements:
+            lines += [
+                f'# HELP {METRIC_PREFIX}_sql_statements_total SQL statements run by requests (SQL tracing only)',
+                f'# TYPE {METRIC_PREFIX}_sql_statements_total counter',
+            ] + sql_statements + [
+                f'# HELP {METRIC_PREFIX}_sql_seconds_total Time spent in SQL by requests (SQL tracing only)',
+                f'# TYPE {METRIC_PREFIX}_sql_seconds_total counter',
+            ] + sql_seconds
+        return '\n'.join(lines) + '\n'
+
+
+class SharedMetricsStore:
+    """Per-worker RequestMetrics states in a small SQLite file shared by the workers of one server.
+
+    Each worker publishes its state() periodically and when it exits;
+    aggregate() merges every published state into one RequestMetrics. Other
+    workers' counters are therefore up to one publish interval old, and the
+    in-flight count of a worker that has not published for stale_after
+    seconds (e.g. one that was killed) is left out. The counters of exited
+    workers are kept, so totals cover the whole server run.
+    """
+
+    def __init__(self, db_path: str, stale_after: float = 30.0):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.stale_after = stale_after
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS worker_metrics (
+                    worker TEXT PRIMARY KEY,
+                    pid INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    state TEXT NOT NULL
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # A short-lived connection per call: publishes are infrequent and nothing is shared across fork()
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def clear(self):
+        """Drop every published state (when a server starts)"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM worker_metrics')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def publish(self, metrics: RequestMetrics):
+        """Store this process's counters, replacing what it published before"""
+        state = metrics.state()
+        # A restarted worker may reuse a pid; its start time keeps its row apart from the old one
+        worker = f"{os.getpid()}:{state['started_at']}"
+        conn = self._connect()
+        try:
+            conn.execute('INSERT OR REPLACE INTO worker_metrics (worker, pid, updated_at, state) VALUES (?, ?, ?, ?)',
+                         (worker, os.getpid(), time.time(), json.dumps(state)))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def aggregate(self, buckets=LATENCY_BUCKETS) -> RequestMetrics:
+        """One RequestMetrics holding the sum of every worker's published counters"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT updated_at, state FROM worker_metrics').fetchall()
+        finally:
+            conn.close()
+        merged = RequestMetrics(buckets)
+        merged.workers = len(rows)
+        now = time.time()
+        for updated_at, state in rows:
+            merged.add_state(json.loads(state), include_in_flight=now - updated_at <= self.stale_after)
+        return merged
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Multi-process Server for ProdVision
+Pre-forks worker processes that accept connections from one shared listening
+socket. The master initializes and migrates the database once, then runs the
+background jobs (expired-session sweep, database maintenance) once for the
+host while the workers only serve requests. Each worker keeps its own read
+cache; SQLite's data_version invalidates it when another worker writes, so a
+client sees its own writes whichever worker serves the next request. Workers
+publish their request metrics to METRICS_DB_PATH, so /api/admin/metrics
+reports the whole server whichever worker answers.
+
+Each worker runs Werkzeug's threaded HTTP server (HTTP/1.0, a thread per
+request, no request timeouts). That suits an internal dashboard for a small
+team. For heavier or internet-facing traffic, serve app:app with a
+production WSGI server such as gunicorn behind a reverse proxy, and schedule
+the session sweep and database maintenance separately.
+
+Usage:
+    python3 serve.py                      # one worker per CPU core
+    python3 serve.py --workers 4 --port 7070
+"""
+
+import sys
+import os
+import argparse
+import signal
+import socket
+import threading
+import time
+
+from werkzeug.serving import ThreadedWSGIServer
+
+from config import HOST, PORT, SERVER_WORKERS, SESSION_SWEEP_INTERVAL, MAINTENANCE_INTERVAL
+from config import METRICS_DB_PATH, METRICS_PUBLISH_INTERVAL
+
+# A worker that dies sooner than this after starting is restarted only after a pause
+MIN_WORKER_LIFETIME = 1.0
+# Seconds workers get to finish in-flight requests on shutdown
+SHUTDOWN_TIMEOUT = 10
+# A worker stops waiting for its requests a little earlier, so it exits before the master kills it
+WORKER_DRAIN_TIMEOUT = SHUTDOWN_TIMEOUT - 1
+
+
+def bind_socket(host, port, backlog=1024):
+    """Listening socket shared by all workers"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class DrainingWSGIServer(ThreadedWSGIServer):
+    """Werkzeug's threaded server, keeping track of request threads so shutdown can wait for them.
+
+    Request threads stay daemon threads; drain() joins them with a deadline
+    instead of server_close() joining them without one.
+    """
+
+    block_on_close = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request_threads = set()
+        self._threads_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        thread = threading.Thread(target=self._handle_request, args=(request, client_address), daemon=True)
+        with self._threads_lock:
+            self.request_threads.add(thread)
+        thread.start()
+
+    def _handle_request(self, request, client_address):
+        try:
+            self.process_request_thread(request, client_address)
+        finally:
+            with self._threads_lock:
+                self.request_threads.discard(threading.current_thread())
+
+    def drain(self, timeout: float) -> int:
+        """Wait up to timeout seconds for in-flight requests; returns how many are still running"""
+        deadline = time.monotonic() + timeout
+        with self._threads_lock:
+            threads = list(self.request_threads)
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        return sum(thread.is_alive() for thread in threads)
+
+
+def run_worker(app_module, sock, host):
+    """Serve requests until SIGTERM, then let in-flight requests finish"""
+    server = DrainingWSGIServer(host, sock.getsockname()[1], app_module.app, fd=sock.fileno())
+    # shutdown() blocks until serve_forever() returns, so it cannot run in the handler's own thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown, daemon=True).start())
+    try:
+        server.serve_forever()
+    finally:
+        unfinished = server.drain(WORKER_DRAIN_TIMEOUT)
+        if unfinished:
+            print(f"⚠️  Worker {os.getpid()} stopped with {unfinished} requests still running")
+        server.server_close()
+
+
+def publish_metrics_periodically(app_module, stop):
+    """Publish the worker's request metrics every METRICS_PUBLISH_INTERVAL seconds until stop is set"""
+    while not stop.wait(METRICS_PUBLISH_INTERVAL):
+        try:
+            app_module.publish_request_metrics()
+        except Exception as e:
+            print(f"⚠️  Worker {os.getpid()} could not publish request metrics: {e}")
+
+
+class Master:
+    """Starts and supervises the workers and runs the per-host background jobs"""
+
+    def __init__(self, app_module, sock, host, worker_count):
+        self.app_module = app_module
+        self.sock = sock
+        self.host = host
+        self.worker_count = worker_count
+        self.workers = {}  # pid -> start time
+        self.stopping = False
+        now = time.monotonic()
+        self.jobs = [
+            # [interval, name, func, next run]
+            [SESSION_SWEEP_INTERVAL, 'session sweep', app_module.cleanup_expired_sessions, now + SESSION_SWEEP_INTERVAL],
+            [MAINTENANCE_INTERVAL, 'database maintenance', self.run_maintenance, now + MAINTENANCE_INTERVAL],
+        ]
+
+    def run_maintenance(self):
+        result = self.app_module.entry_manager.run_maintenance()
+        print(f"Database maintenance: checkpointed {result['checkpointed_pages']} of {result['wal_pages']} WAL pages")
+
+    def spawn(self):
+        # Connections opened by the master (jobs) must not leak into the child
+        self.app_module.release_connections()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            # Ctrl+C reaches the whole process group; the master decides when workers stop
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            code = 0
+            self.app_module.request_metrics.reset()
+            stop_publishing = threading.Event()
+            threading.Thread(target=publish_metrics_periodically, args=(self.app_module, stop_publishing),
+                             daemon=True).start()
+            try:
+                run_worker(self.app_module, self.sock, self.host)
+            except BaseException as e:
+                print(f"❌ Worker {os.getpid()} crashed: {e}")
+                code = 1
+            stop_publishing.set()
+            try:
+                # Final counters, so the totals keep this worker's requests after it is gone
+                self.app_module.publish_request_metrics()
+            except Exception as e:
+                print(f"⚠️  Worker {os.getpid()} could not publish request metrics: {e}")
+            try:
+                self.app_module.close_resources()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                # Leave without unwinding the master's stack or running its atexit handlers
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def reap(self):
+        """Collect exited workers and replace them unless shutting down"""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            print(f"⚠️  Worker {pid} exited with status {status}; starting a replacement")
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            self.spawn()
+
+    def run_due_jobs(self):
+        now = time.monotonic()
+        for job in self.jobs:
+            interval, name, func, next_run = job
+            if now < next_run:
+                continue
+            try:
+                func()
+            except Exception as e:
+                print(f"❌ Background job '{name}' failed: {e}")
+            job[3] = time.monotonic() + interval
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.worker_count):
+            self.spawn()
+        print(f"✅ {self.worker_count} workers started (master pid {os.getpid()})")
+
+        while not self.stopping:
+            self.reap()
+            self.run_due_jobs()
+            time.sleep(0.5)
+
+        print("Stopping workers...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            os.kill(pid, signal.SIGKILL)
+        self.reap()
+        self.sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run ProdVision with pre-forked worker processes')
+    parser.add_argument('--host', default=HOST, help=f'Address to listen on (default: {HOST})')
+    parser.add_argument('--port', type=int, default=PORT, help=f'Port to listen on (default: {PORT})')
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS or os.cpu_count() or 1,
+                        help='Worker processes (default: SERVER_WORKERS, or one per CPU core)')
+    args = parser.parse_args(argv)
+
+    # Importing the app opens the database and applies pending migrations, once, here
+    import app as app_module
+    with app_module.app.app_context():
+        app_module.initialize_database()
+    print(app_module.entry_manager.startup_report())
+    if app_module.session_files is not None:
+        # Workers write session files the master's index has not seen
+        app_module.session_files.expiry_index.shared = True
+
+    sock = bind_socket(args.host, args.port)
+    print("Starting ProdVision Dashboard...")
+    print(f"Access the dashboard at: http://{args.host}:{args.port}")
+
+    if not hasattr(os, 'fork'):
+        print("⚠️  fork() is not available on this platform; serving from a single process")
+        import threading
+        threading.Thread(target=app_module.periodic_session_cleanup, daemon=True).start()
+        run_worker(app_module, sock, args.host)
+        return
+
+    # Workers publish their request metrics so /api/admin/metrics can report all of them
+    app_module.share_request_metrics(METRICS_DB_PATH)
+    Master(app_module, sock, args.host, max(1, args.workers)).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+"""
+Session Store
+Server-side Flask sessions in a SQLite table with an indexed expiry column.
+Expired sessions are rejected (and deleted) when read; sweep_expired()
+removes the rest in small batches from a background thread.
+
+For the legacy filesystem backend, SessionFileExpiryIndex keeps session
+files in a min-heap by expiry so cleanup and stats never list the directory.
+"""
+
+import heapq
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from flask_session.sessions import FileSystemSessionInterface
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+from sharepoint_sqlite_adapter import SQLiteConnectionPool
+
+# A session's expiry is pushed forward at most this often when it is only read
+SESSION_REFRESH_SECONDS = 60
+
+
+class SQLiteSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its id and stored expiry"""
+
+    def __init__(self, initial=None, sid=None, expires_at=None, new=False):
+        def on_update(self):
+            self.modified = True
+        CallbackDict.__init__(self, initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = new
+        self.modified = False
+
+
+class SQLiteSessionInterface(SessionInterface):
+    """Flask session interface backed by a `sessions` table.
+
+    The cookie carries only a signed random session id. Sessions expire
+    PERMANENT_SESSION_LIFETIME after their last use; reading a session
+    pushes its expiry forward at most once per SESSION_REFRESH_SECONDS so
+    ordinary requests do not each cost a write.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, db_path: str, pool_size: int = 4):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.pool = SQLiteConnectionPool(db_path, size=pool_size)
+        conn = self.pool.acquire()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _signer(self, app) -> Signer:
+        return Signer(app.secret_key, salt='flask-session', key_derivation='hmac')
+
+    def open_session(self, app, request):
+        cookie_value = request.cookies.get(self.get_cookie_name(app))
+        if not cookie_value:
+            return SQLiteSession(sid=secrets.token_urlsafe(32), new=True)
+        try:
+            sid = self._signer(app).unsign(cookie_value).decode('utf-8')
+        except (BadSignature, UnicodeDecodeError):
+            return SQLiteSession(sid=secrets.token_urlsafe(32), new=True)
+
+        conn = self.pool.acquire()
+        try:
+            row = conn.execute('SELECT data, expires_at FROM sessions WHERE id = ?', (sid,)).fetchone()
+            if row is not None and row[1] <= time.time():
+                # Lazy expiry: an expired session is deleted the moment someone presents it
+                conn.execute('DELETE FROM sessions WHERE id = ?', (sid,))
+                conn.commit()
+                row = None
+        finally:
+            conn.close()
+
+        if row is None:
+            return SQLiteSession(sid=secrets.token_urlsafe(32), new=True)
+        try:
+            data = self.serializer.loads(row[0])
+        except ValueError:
+            data = {}
+        return SQLiteSession(data, sid=sid, expires_at=row[1])
+
+    def save_session(self, app, session, response):
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self._execute('DELETE FROM sessions WHERE id = ?', (session.sid,))
+                response.delete_cookie(self.get_cookie_name(app), domain=domain, path=path)
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        if session.modified or session.new:
+            self._execute('INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)',
+                          (session.sid, self.serializer.dumps(dict(session)), now + lifetime))
+        elif session.expires_at is not None and session.expires_at - now < lifetime - SESSION_REFRESH_SECONDS:
+            self._execute('UPDATE sessions SET expires_at = ? WHERE id = ?', (now + lifetime, session.sid))
+        elif not self.should_set_cookie(app, session):
+            return
+
+        response.set_cookie(
+            self.get_cookie_name(app),
+            self._signer(app).sign(session.sid.encode('utf-8')).decode('utf-8'),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+    def _execute(self, sql: str, params=()):
+        conn = self.pool.acquire()
+        try:
+            conn.execute(sql, params)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def sweep_expired(self, batch_size: int = 500) -> int:
+        """Delete expired sessions in batches (one short transaction each); returns how many"""
+        deleted = 0
+        now = time.time()
+        conn = self.pool.acquire()
+        try:
+            while True:
+                cursor = conn.execute('''
+                    DELETE FROM sessions WHERE id IN (
+                        SELECT id FROM sessions WHERE expires_at <= ? LIMIT ?
+                    )
+                ''', (now, batch_size))
+                conn.commit()
+                deleted += cursor.rowcount
+                if cursor.rowcount < batch_size:
+                    break
+        except sqlite3.Error as e:
+            print(f"Session sweep error: {e}")
+        finally:
+            conn.close()
+        return deleted
+
+    def stats(self) -> Dict:
+        """Active and expired-but-not-yet-swept session counts (both answered from the expiry index)"""
+        conn = self.pool.acquire()
+        try:
+            now = time.time()
+            active = conn.execute('SELECT COUNT(*) FROM sessions WHERE expires_at > ?', (now,)).fetchone()[0]
+            expired = conn.execute('SELECT COUNT(*) FROM sessions WHERE expires_at <= ?', (now,)).fetchone()[0]
+        finally:
+            conn.close()
+        return {'active_sessions': active, 'expired_sessions': expired}
+
+    def release_connections(self):
+        """Close idle connections (e.g. before fork); they are reopened on demand"""
+        self.pool.close_idle()
+
+    def close(self):
+        self.pool.close_all()
+
+
+class SessionFileExpiryIndex:
+    """In-memory min-heap of session files by expiry time (mtime + lifetime).
+
+    Built once with os.scandir, then kept current by touch()/remove() as the
+    session interface writes and deletes files. Superseded heap items are
+    skipped lazily and the heap is compacted when they pile up. A file is
+    re-stat'ed before deletion, so one rewritten by another process since it
+    was indexed is kept.
+
+    With shared=True (several processes writing the same directory) the index
+    is rebuilt before cleanup and stats whenever the directory's mtime shows
+    that files were created or removed since the last scan.
+    """
+
+    def __init__(self, session_dir: str, lifetime_seconds: float, ignore_names=(), shared: bool = False):
+        self.session_dir = session_dir
+        self.lifetime_seconds = lifetime_seconds
+        self.ignore_names = frozenset(ignore_names)
+        self.shared = shared
+        self._dir_mtime = None
+        self._files = {}  # filename -> (expires_at, size)
+        self._heap = []  # (expires_at, filename), possibly superseded
+        self.total_size = 0
+        self._lock = threading.Lock()
+
+    def build(self):
+        """(Re)index every session file with a single directory scan"""
+        files = {}
+        total_size = 0
+        dir_mtime = self._read_dir_mtime()
+        if os.path.isdir(self.session_dir):
+            with os.scandir(self.session_dir) as entries:
+                for entry in entries:
+                    if entry.name in self.ignore_names or entry.name.endswith('.__wz_cache'):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files[entry.name] = (stat.st_mtime + self.lifetime_seconds, stat.st_size)
+                    total_size += stat.st_size
+        with self._lock:
+            self._files = files
+            self._heap = [(expires_at, name) for name, (expires_at, _) in files.items()]
+            heapq.heapify(self._heap)
+            self.total_size = total_size
+            self._dir_mtime = dir_mtime
+
+    def _read_dir_mtime(self):
+        try:
+            return os.stat(self.session_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def refresh(self) -> bool:
+        """Rebuild the index if files were added or removed since the last scan; returns whether it did"""
+        if self._read_dir_mtime() == self._dir_mtime:
+            return False
+        self.build()
+        return True
+
+    def _set_locked(self, name: str, expires_at: float, size: int):
+        previous = self._files.get(name)
+        if previous is not None:
+            self.total_size -= previous[1]
+        self._files[name] = (expires_at, size)
+        self.total_size += size
+        heapq.heappush(self._heap, (expires_at, name))
+        if len(self._heap) > 2 * len(self._files) + 64:
+            self._heap = [(expires, file_name) for file_name, (expires, _) in self._files.items()]
+            heapq.heapify(self._heap)
+
+    def touch(self, path: str):
+        """Record that a session file was (re)written"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.remove(path)
+            return
+        with self._lock:
+            self._set_locked(os.path.basename(path), stat.st_mtime + self.lifetime_seconds, stat.st_size)
+
+    def remove(self, path: str):
+        """Record that a session file was deleted (its heap item is dropped lazily)"""
+        with self._lock:
+            previous = self._files.pop(os.path.basename(path), None)
+            if previous is not None:
+                self.total_size -= previous[1]
+
+    def pop_expired(self, now: float = None) -> List[str]:
+        """Delete the session files that have expired; returns their names"""
+        now = time.time() if now is None else now
+        if self.shared:
+            self.refresh()
+        deleted = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, name = heapq.heappop(self._heap)
+                current = self._files.get(name)
+                if current is None or current[0] != expires_at:
+                    continue  # superseded by a later write, or already removed
+                path = os.path.join(self.session_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    self.total_size -= current[1]
+                    del self._files[name]
+                    continue
+                if stat.st_mtime + self.lifetime_seconds > now:
+                    # Rewritten behind our back (e.g. by another process); keep it
+                    self._set_locked(name, stat.st_mtime + self.lifetime_seconds, stat.st_size)
+                    continue
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Error deleting session file {name}: {e}")
+                    continue
+                self.total_size -= current[1]
+                del self._files[name]
+                deleted.append(name)
+        return deleted
+
+    def stats(self) -> Dict:
+        """File count and total size (without touching the filesystem unless shared)"""
+        if self.shared:
+            self.refresh()
+        with self._lock:
+            return {'total_files': len(self._files), 'total_size': self.total_size}
+
+
+class IndexedFileSystemSessionInterface(FileSystemSessionInterface):
+    """Flask-Session filesystem sessions that keep a SessionFileExpiryIndex up to date"""
+
+    def __init__(self, cache_dir, threshold, mode, key_prefix, use_signer=False, permanent=True,
+                 lifetime_seconds: float = 7200):
+        super().__init__(cache_dir, threshold, mode, key_prefix, use_signer, permanent)
+        # cachelib's file-count bookkeeping file sits next to the sessions (hashed name in newer versions)
+        count_file = getattr(self.cache, '_fs_count_file', '__wz_cache_count')
+        ignore_names = {count_file, os.path.basename(self.cache._get_filename(count_file))}
+        self.expiry_index = SessionFileExpiryIndex(cache_dir, lifetime_seconds, ignore_names)
+        self.expiry_index.build()
+
+    def session_file_path(self, sid: str) -> str:
+        return self.cache._get_filename(self.key_prefix + sid)
+
+    def save_session(self, app, session, response):
+        super().save_session(app, session, response)
+        path = self.session_file_path(session.sid)
+        if session:
+            self.expiry_index.touch(path)
+        elif session.modified:
+            self.expiry_index.remove(path)
+
+    def delete_session(self, sid: str) -> bool:
+        """Delete a session's file immediately"""
+        path = self.session_file_path(sid)
+        self.expiry_index.remove(path)
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
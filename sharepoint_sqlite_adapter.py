@@ -5,17 +5,272 @@ Store SQLite database in SharePoint for team collaboration
 
 import os
 import sqlite3
+import threading
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
+from read_cache import ReadCache
+from sql_tracing import TracingCursor
+from sharepoint_sync import SyncEngine, HTTPTransport, DEFAULT_CHUNK_SIZE
+
+# Columns returned for each child row, keyed by child table name
+CHILD_TABLES = (
+    ('issues', ('id', 'description', 'remarks', 'position', 'created_at')),
+    ('prbs', ('id', 'prb_id_number', 'prb_id_status', 'prb_link', 'position', 'created_at')),
+    ('hiims', ('id', 'hiim_id_number', 'hiim_id_status', 'hiim_link', 'position', 'created_at')),
+)
+
+# Content columns written for each child row; entry_id, position and created_at are set by the adapter
+CHILD_WRITE_COLUMNS = {
+    'issues': ('description', 'remarks'),
+    'prbs': ('prb_id_number', 'prb_id_status', 'prb_link'),
+    'hiims': ('hiim_id_number', 'hiim_id_status', 'hiim_link'),
+}
+
+
+def _child_row_values(table: str, item: Dict) -> tuple:
+    """Content values of a child item in CHILD_WRITE_COLUMNS order (ticket numbers stored as text)"""
+    values = []
+    for column in CHILD_WRITE_COLUMNS[table]:
+        value = item.get(column, '')
+        if column.endswith('_id_number'):
+            value = str(value) if value is not None else ''
+        values.append(value)
+    return tuple(values)
+
+
+def _insert_child_rows(cursor, table: str, rows: List[tuple], now: str):
+    """Insert (entry_id, position, item) rows into a child table with one executemany"""
+    if not rows:
+        return
+    columns = ('entry_id',) + CHILD_WRITE_COLUMNS[table] + ('position', 'created_at')
+    cursor.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [(entry_id,) + _child_row_values(table, item) + (position, now) for entry_id, position, item in rows]
+    )
+
+
+# Max entry ids per IN (...) query; stays below SQLite's default 999 variable limit
+CHILD_ROW_CHUNK_SIZE = 500
+
+# Max (date, application_name) pairs per lookup query (two variables each)
+ENTRY_KEY_CHUNK_SIZE = 400
+
+# Entry columns written on create, in INSERT order; created_at/updated_at are set by the adapter
+ENTRY_INSERT_COLUMNS = (
+    'date', 'day', 'application_name', 'prc_mail_text', 'prc_mail_status',
+    'cp_alerts_text', 'cp_alerts_status', 'quality_status', 'quality_legacy', 'quality_target',
+    'prb_id_number', 'prb_id_status', 'hiim_id_number', 'hiim_id_status',
+    'valo_text', 'valo_status', 'sensi_text', 'sensi_status', 'cf_ra_text', 'cf_ra_status',
+    'acq_text', 'root_cause_application', 'root_cause_type', 'issue_description', 'remarks',
+    'created_at', 'updated_at', 'prb_link', 'hiim_link', 'xva_remarks'
+)
+_ENTRY_INSERT_SQL = (
+    f"INSERT INTO entries ({', '.join(ENTRY_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in ENTRY_INSERT_COLUMNS)})"
+)
+
+# Per (month, application) counters behind /api/stats, as SQL conditions to count.
+# Punctuality is derived from the PRC mail status: red/late -> Red, green/on-time
+# -> Green, any other non-empty value -> Yellow.
+_PUNCTUALITY_RED = "('Red', 'red', 'late')"
+_PUNCTUALITY_GREEN = "('Green', 'green', 'on-time')"
+MONTHLY_STAT_COLUMNS = (
+    ('total', '1'),
+    ('quality_red', "quality_status = 'Red'"),
+    ('quality_yellow', "quality_status = 'Yellow'"),
+    ('quality_green', "quality_status = 'Green'"),
+    ('punctuality_red', f"prc_mail_status IN {_PUNCTUALITY_RED}"),
+    ('punctuality_yellow', f"prc_mail_status != '' AND prc_mail_status NOT IN {_PUNCTUALITY_RED} "
+                           f"AND prc_mail_status NOT IN {_PUNCTUALITY_GREEN}"),
+    ('punctuality_green', f"prc_mail_status IN {_PUNCTUALITY_GREEN}"),
+    ('prb_active', "prb_id_status = 'active'"),
+    ('prb_closed', "prb_id_status = 'closed'"),
+    ('hiim_active', "hiim_id_status = 'active'"),
+    ('hiim_closed', "hiim_id_status = 'closed'"),
+    # XVA red cards: any punctuality or quality status is Red
+    ('valo_red', "valo_status = 'Red'"),
+    ('sensi_red', "sensi_status = 'Red'"),
+    ('cf_ra_red', "cf_ra_status = 'Red'"),
+    ('red_cards', "valo_status = 'Red' OR sensi_status = 'Red' OR cf_ra_status = 'Red' "
+                  "OR quality_legacy = 'Red' OR quality_target = 'Red'"),
+)
+MONTHLY_STAT_NAMES = [name for name, _ in MONTHLY_STAT_COLUMNS]
+
+
+# Application label of a get_monthly_stats group; NULL and '' (merged in the rollups) read as 'Unknown'
+MONTHLY_STAT_APPLICATION = "COALESCE(NULLIF(application_name, ''), 'Unknown')"
+
+
+def _stat_select_list(stat_columns) -> str:
+    """Render (name, condition) pairs as SUM(CASE WHEN condition THEN 1 ELSE 0 END) aggregates"""
+    return ', '.join(f'SUM(CASE WHEN {condition} THEN 1 ELSE 0 END) AS {name}' for name, condition in stat_columns)
+
+
+# Applied once to every new connection. WAL lets dashboard reads run while an
+# editor saves; busy_timeout makes concurrent writers wait instead of failing.
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('foreign_keys', 'ON'),
+    ('busy_timeout', 5000),
+    ('cache_size', -20000),  # negative = KiB, i.e. ~20 MB page cache
+    ('mmap_size', 268435456),
+)
+
+# Ordered schema steps as (PRAGMA user_version after the step, description, adapter method).
+# Each runs once per database; append new steps, never edit applied ones.
+SCHEMA_MIGRATIONS = (
+    (1, 'create tables', '_migrate_create_tables'),
+    (2, 'backfill child rows', '_migrate_backfill_child_rows'),
+    (3, 'entry indexes', '_ensure_indexes'),
+    (4, 'entry page order index', '_migrate_entry_order_index'),
+    (5, 'drop superseded date/created_at index', '_migrate_drop_date_created_at_index'),
+)
+
+# Sort key for created_at in the dashboard order and keyset cursors. Legacy and
+# imported rows may have no created_at; '' sorts them where NULL would (last
+# within a date, newest first) but still compares, so they are not lost between pages
+ENTRY_CREATED_KEY = "COALESCE(created_at, '')"
+ENTRY_PAGE_ORDER = f'date DESC, {ENTRY_CREATED_KEY} DESC, id DESC'
+
+# Schema version from which the unique (date, application_name) index is expected
+UNIQUE_INDEX_SCHEMA_VERSION = 3
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to its pool.
+
+    When an SQLTracer is attached, cursors (including those behind
+    conn.execute) are TracingCursors so statement time is measured, and
+    commit() is timed like a statement.
+    """
+
+    pool = None
+    checked_out = False
+    tracer = None
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = TracingCursor if self.tracer is not None else sqlite3.Cursor
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        if self.tracer is None:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if self.tracer is None:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        if self.tracer is None:
+            return super().commit()
+        return self.tracer.timed(self, 'COMMIT', super().commit)
+
+    def close(self):
+        if self.tracer is not None:
+            self.tracer.finish_cursors(self)
+        if self.pool is not None and self.pool.release(self):
+            return
+        super().close()
+
+
+class SQLiteConnectionPool:
+    """Thread-safe pool of configured SQLite connections.
+
+    acquire() never blocks: when no idle connection is available a new one is
+    opened. At most `size` connections are kept idle; extra ones are closed
+    when released. Connections are handed between threads, so they are opened
+    with check_same_thread=False and used by one thread at a time.
+    """
+
+    def __init__(self, db_path: str, size: int = 5, pragmas=SQLITE_PRAGMAS, tracer=None):
+        self.db_path = db_path
+        self.size = size
+        self.pragmas = pragmas
+        self.tracer = tracer
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self) -> PooledConnection:
+        """Return an idle connection or open a new one"""
+        conn = None
+        with self._lock:
+            if self._idle:
+                conn = self._idle.pop()
+        if conn is None:
+            conn = self._connect()
+        conn.checked_out = True
+        return conn
+
+    def _connect(self) -> PooledConnection:
+        conn = sqlite3.connect(self.db_path, factory=PooledConnection, check_same_thread=False)
+        for name, value in self.pragmas:
+            try:
+                conn.execute(f'PRAGMA {name} = {value}')
+            except sqlite3.Error:
+                # e.g. WAL is unsupported on some network filesystems
+                pass
+        conn.pool = self
+        if self.tracer is not None:
+            self.tracer.instrument(conn)
+        return conn
+
+    def release(self, conn: PooledConnection) -> bool:
+        """Return conn to the pool; False means the caller should really close it"""
+        if not conn.checked_out:
+            # Already released (double close); nothing to do
+            return True
+        conn.checked_out = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            return False
+        with self._lock:
+            if self._closed or len(self._idle) >= self.size:
+                return False
+            self._idle.append(conn)
+        return True
+
+    def close_idle(self):
+        """Close idle connections but keep pooling (e.g. before fork; new ones are opened on demand)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            sqlite3.Connection.close(conn)
+
+    def close_all(self):
+        """Close idle connections and stop pooling (used at shutdown)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._closed = True
+        for conn in idle:
+            sqlite3.Connection.close(conn)
+
 class SharePointSQLiteAdapter:
     """SQLite adapter with SharePoint integration for database storage"""
     
-    def __init__(self, sharepoint_url: str, db_name: str = "prodvision.db"):
+    def __init__(self, sharepoint_url: str, db_name: str = "prodvision.db", data_dir: str = "./data",
+                 pool_size: int = 5, sql_tracer=None, sync_transport=None,
+                 sync_chunk_size: int = DEFAULT_CHUNK_SIZE):
         self.sharepoint_url = sharepoint_url.rstrip('/')
+        self.sync_transport = sync_transport
+        self.sync_chunk_size = sync_chunk_size
+        self.last_sync_stats = None
         self.db_name = db_name
-        self.local_db_path = f"./data/{db_name}"
+        self.local_db_path = os.path.join(data_dir, db_name)
+        self.duplicate_entries = []
+        self.schema_version = 0
+        self._entry_columns = None
+        self.startup_timings = []
         self.ensure_data_directory()
+        self.pool = SQLiteConnectionPool(self.local_db_path, size=pool_size, tracer=sql_tracer)
         
         # Initialize local database
         self.init_database()
@@ -26,12 +281,89 @@ class SharePointSQLiteAdapter:
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
     
+    def _timed_phase(self, phase: str, started: float) -> float:
+        """Record how long a startup phase took; returns the time it ended"""
+        ended = time.perf_counter()
+        self.startup_timings.append((phase, (ended - started) * 1000))
+        return ended
+    
     def init_database(self):
-        """Initialize SQLite database with tables"""
-        conn = sqlite3.connect(self.local_db_path)
-        cursor = conn.cursor()
+        """Bring the schema up to date and make sure the rollups exist, timing each phase"""
+        self.startup_timings = []
+        started = time.perf_counter()
+        conn = self.get_connection()
+        conn.close()
+        started = self._timed_phase('open connection', started)
         
-        # Create entries table with all required fields
+        self.migrate_database()
+        
+        started = time.perf_counter()
+        self.ensure_rollups()
+        self._timed_phase('rollups', started)
+    
+    def startup_report(self) -> str:
+        """Human-readable summary of the last init_database() timings and any duplicate entries"""
+        total = sum(ms for _, ms in self.startup_timings)
+        lines = [f"Database ready in {total:.1f} ms (schema version {self.schema_version})"]
+        lines += [f"   {phase:<40} {ms:>9.1f} ms" for phase, ms in self.startup_timings]
+        if self.duplicate_entries:
+            lines.append(f"⚠️  Found {len(self.duplicate_entries)} duplicate (date, application_name) pairs; "
+                         "unique index idx_entries_date_application not created")
+            lines += [f"   {duplicate['application_name']} on {duplicate['date']}: entry ids {duplicate['ids']}"
+                      for duplicate in self.duplicate_entries]
+        return '\n'.join(lines)
+    
+    def migrate_database(self) -> List[int]:
+        """Apply the SCHEMA_MIGRATIONS steps newer than the database's PRAGMA user_version.
+
+        Each step runs once, in its own transaction together with the version
+        bump, so a database is never left half-migrated. A failed step is
+        rolled back and reported; it is retried on the next start. Returns the
+        versions applied.
+        """
+        applied = []
+        started = time.perf_counter()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            self.schema_version = cursor.execute('PRAGMA user_version').fetchone()[0]
+            started = self._timed_phase('read schema version', started)
+            
+            for version, description, step in SCHEMA_MIGRATIONS:
+                if version <= self.schema_version:
+                    continue
+                cursor.execute('BEGIN IMMEDIATE')
+                try:
+                    # Another process may have migrated while we waited for the write lock
+                    current = cursor.execute('PRAGMA user_version').fetchone()[0]
+                    if version > current:
+                        getattr(self, step)(cursor)
+                        cursor.execute(f'PRAGMA user_version = {int(version)}')
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"⚠️  Schema migration {version} ({description}) failed: {e}")
+                    break
+                self.schema_version = max(version, current)
+                if version > current:
+                    applied.append(version)
+                    started = self._timed_phase(f'migration {version}: {description}', started)
+            
+            if self.schema_version >= UNIQUE_INDEX_SCHEMA_VERSION and UNIQUE_INDEX_SCHEMA_VERSION not in applied:
+                # The unique (date, application_name) index is skipped while duplicates exist;
+                # keep checking for it until they have been cleaned up
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_entries_date_application'")
+                if cursor.fetchone() is None:
+                    cursor.execute('BEGIN IMMEDIATE')
+                    self._ensure_indexes(cursor)
+                    conn.commit()
+                    started = self._timed_phase('retry unique entry index', started)
+        finally:
+            conn.close()
+        return applied
+    
+    def _migrate_create_tables(self, cursor):
+        """Schema version 1: entries, settings and the child tables, plus columns added over time"""
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS entries (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -68,7 +400,22 @@ class SharePointSQLiteAdapter:
             )
         ''')
         
-        # Create settings table
+        # Databases created before these columns existed
+        cursor.execute("PRAGMA table_info(entries)")
+        columns = [row[1] for row in cursor.fetchall()]
+        required_columns = {
+            'prb_link': 'TEXT',
+            'hiim_link': 'TEXT',
+            'valo_text': 'TEXT',
+            'sensi_text': 'TEXT',
+            'cf_ra_text': 'TEXT',
+            'acq_text': 'TEXT',
+            'xva_remarks': 'TEXT'
+        }
+        for column, column_type in required_columns.items():
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE entries ADD COLUMN {column} {column_type}")
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS settings (
                 key TEXT PRIMARY KEY,
@@ -88,7 +435,6 @@ class SharePointSQLiteAdapter:
                 FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE
             )
         ''')
-
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS prbs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -101,7 +447,6 @@ class SharePointSQLiteAdapter:
                 FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE
             )
         ''')
-
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS hiims (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -114,239 +459,625 @@ class SharePointSQLiteAdapter:
                 FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE
             )
         ''')
-        
+    
+    def _migrate_backfill_child_rows(self, cursor):
+        """Schema version 2: copy legacy single issue/PRB/HIIM fields into empty child tables"""
+        now = datetime.utcnow().isoformat()
+        backfills = (
+            ('issues', '''
+                INSERT INTO issues (entry_id, description, remarks, position, created_at)
+                SELECT id, issue_description, '', 0, COALESCE(created_at, ?)
+                FROM entries WHERE issue_description IS NOT NULL AND issue_description != ''
+            '''),
+            ('prbs', '''
+                INSERT INTO prbs (entry_id, prb_id_number, prb_id_status, prb_link, position, created_at)
+                SELECT id, CAST(prb_id_number AS TEXT), COALESCE(prb_id_status, ''), COALESCE(prb_link, ''),
+                       0, COALESCE(created_at, ?)
+                FROM entries WHERE prb_id_number IS NOT NULL AND prb_id_number != ''
+            '''),
+            ('hiims', '''
+                INSERT INTO hiims (entry_id, hiim_id_number, hiim_id_status, hiim_link, position, created_at)
+                SELECT id, CAST(hiim_id_number AS TEXT), COALESCE(hiim_id_status, ''), COALESCE(hiim_link, ''),
+                       0, COALESCE(created_at, ?)
+                FROM entries WHERE hiim_id_number IS NOT NULL AND hiim_id_number != ''
+            '''),
+        )
+        for table, insert_sql in backfills:
+            # Only a table that was never used is filled; otherwise its rows are authoritative
+            cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {table})')
+            if not cursor.fetchone()[0]:
+                cursor.execute(insert_sql, (now,))
+    
+    def _migrate_entry_order_index(self, cursor):
+        """Schema version 4: index the dashboard order, treating a NULL created_at (legacy rows) as ''"""
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_entries_date_created_key ON entries(date, {ENTRY_CREATED_KEY})')
+    
+    def _migrate_drop_date_created_at_index(self, cursor):
+        """Schema version 5: idx_entries_date_created_key serves every entry listing, so drop its predecessor"""
+        cursor.execute('DROP INDEX IF EXISTS idx_entries_date_created_at')
+    
+    def _ensure_indexes(self, cursor):
+        """Create lookup indexes and the unique (date, application_name) constraint.
+
+        If the table already holds duplicate (date, application_name) pairs the
+        unique index cannot be built; the duplicates are kept in
+        duplicate_entries (shown by startup_report and /api/admin/duplicates)
+        and a plain index is used for lookups until they are cleaned up. Runs as schema
+        version 3, and again at startup while the unique index is missing.
+        """
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_created_at ON entries(created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_application_date ON entries(application_name, date)')
+        for table, _ in CHILD_TABLES:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_entry_position ON {table}(entry_id, position)')
+
+        cursor.execute('''
+            SELECT date, application_name, COUNT(1), GROUP_CONCAT(id)
+            FROM entries
+            GROUP BY date, application_name
+            HAVING COUNT(1) > 1
+        ''')
+        self.duplicate_entries = [
+            {'date': row[0], 'application_name': row[1], 'count': row[2], 'ids': [int(i) for i in row[3].split(',')]}
+            for row in cursor.fetchall()
+        ]
+
+        if self.duplicate_entries:
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_date_application_nonunique ON entries(date, application_name)')
+        else:
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_date_application ON entries(date, application_name)')
+            cursor.execute('DROP INDEX IF EXISTS idx_entries_date_application_nonunique')
+    
+    def ensure_rollups(self):
+        """Create the monthly_rollups table and (re)build it when missing, outdated or empty"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('PRAGMA table_info(monthly_rollups)')
+        existing_columns = [row[1] for row in cursor.fetchall()]
+        expected_columns = ['application_name', 'month'] + MONTHLY_STAT_NAMES
+        rebuild = existing_columns != expected_columns
+
+        if existing_columns and rebuild:
+            # Counter set changed since the table was created
+            cursor.execute('DROP TABLE monthly_rollups')
+        counter_columns = ', '.join(f'{name} INTEGER NOT NULL DEFAULT 0' for name in MONTHLY_STAT_NAMES)
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS monthly_rollups (
+                application_name TEXT NOT NULL,
+                month TEXT NOT NULL,
+                {counter_columns},
+                PRIMARY KEY (application_name, month)
+            )
+        ''')
         conn.commit()
+
+        if not rebuild:
+            cursor.execute('SELECT EXISTS (SELECT 1 FROM entries) AND NOT EXISTS (SELECT 1 FROM monthly_rollups)')
+            rebuild = bool(cursor.fetchone()[0])
         conn.close()
-        
-        # Migrate existing database if needed
-        self.migrate_database()
+
+        if rebuild:
+            self.rebuild_rollups()
     
-    def migrate_database(self):
-        """Migrate existing database to add missing columns"""
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+    def rebuild_rollups(self) -> int:
+        """Recompute monthly_rollups from the entries table; returns the number of rollup rows"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
 
-            # Check if entries table exists and get its schema
-            cursor.execute("PRAGMA table_info(entries)")
-            columns = [row[1] for row in cursor.fetchall()]
-
-            # List of columns that should exist
-            required_columns = {
-                'prb_link': 'TEXT',
-                'hiim_link': 'TEXT',
-                'valo_text': 'TEXT',
-                'sensi_text': 'TEXT',
-                'cf_ra_text': 'TEXT',
-                'acq_text': 'TEXT',
-                'xva_remarks': 'TEXT'
-            }
-
-            # Add missing columns
-            for column, column_type in required_columns.items():
-                if column not in columns:
-                    cursor.execute(f"ALTER TABLE entries ADD COLUMN {column} {column_type}")
-
-            # Ensure child tables exist (in case migrate is called separately)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS issues (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entry_id INTEGER,
-                    description TEXT,
-                    remarks TEXT,
-                    position INTEGER,
-                    created_at TEXT,
-                    FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS prbs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entry_id INTEGER,
-                    prb_id_number TEXT,
-                    prb_id_status TEXT,
-                    prb_link TEXT,
-                    position INTEGER,
-                    created_at TEXT,
-                    FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS hiims (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entry_id INTEGER,
-                    hiim_id_number TEXT,
-                    hiim_id_status TEXT,
-                    hiim_link TEXT,
-                    position INTEGER,
-                    created_at TEXT,
-                    FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE
-                )
-            ''')
-
-            # Migrate legacy single fields into child tables if child tables are empty
-            cursor.execute('SELECT COUNT(1) FROM prbs')
-            prb_count = cursor.fetchone()[0]
-            cursor.execute('SELECT COUNT(1) FROM hiims')
-            hiim_count = cursor.fetchone()[0]
-            cursor.execute('SELECT COUNT(1) FROM issues')
-            issues_count = cursor.fetchone()[0]
-
-            if prb_count == 0 or hiim_count == 0 or issues_count == 0:
-                cursor.execute('SELECT id, issue_description, prb_id_number, prb_id_status, prb_link, hiim_id_number, hiim_id_status, hiim_link, created_at FROM entries')
-                rows = cursor.fetchall()
-                for row in rows:
-                    entry_id = row[0]
-                    issue_description = row[1]
-                    prb_id_number = row[2]
-                    prb_id_status = row[3]
-                    prb_link = row[4]
-                    hiim_id_number = row[5]
-                    hiim_id_status = row[6]
-                    hiim_link = row[7]
-                    created_at = row[8] or datetime.utcnow().isoformat()
-
-                    if issue_description and issues_count == 0:
-                        cursor.execute('INSERT INTO issues (entry_id, description, remarks, position, created_at) VALUES (?, ?, ?, ?, ?)', (entry_id, issue_description, '', 0, created_at))
-                    if prb_id_number and prb_count == 0:
-                        cursor.execute('INSERT INTO prbs (entry_id, prb_id_number, prb_id_status, prb_link, position, created_at) VALUES (?, ?, ?, ?, ?, ?)', (entry_id, str(prb_id_number), prb_id_status or '', prb_link or '', 0, created_at))
-                    if hiim_id_number and hiim_count == 0:
-                        cursor.execute('INSERT INTO hiims (entry_id, hiim_id_number, hiim_id_status, hiim_link, position, created_at) VALUES (?, ?, ?, ?, ?, ?)', (entry_id, str(hiim_id_number), hiim_id_status or '', hiim_link or '', 0, created_at))
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute('DELETE FROM monthly_rollups')
+        cursor.execute(f'''
+            INSERT INTO monthly_rollups (application_name, month, {', '.join(MONTHLY_STAT_NAMES)})
+            SELECT COALESCE(application_name, ''), COALESCE(substr(date, 1, 7), ''),
+                   {_stat_select_list(MONTHLY_STAT_COLUMNS)}
+            FROM entries
+            GROUP BY 1, 2
+        ''')
+        row_count = cursor.rowcount
+        self._bump_data_version(cursor)
+        conn.commit()
+        conn.close()
+        return row_count
+    
+    def check_rollups(self) -> List[Dict]:
+        """Compare monthly_rollups with a full recompute from entries.
 
-            conn.commit()
-            conn.close()
+        Returns one dict per mismatching counter (empty list when consistent).
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
 
-        except Exception as e:
-            # If migration fails, log (silent) and continue
-            try:
-                conn.close()
-            except Exception:
-                pass
+        cursor.execute(f'''
+            SELECT COALESCE(application_name, ''), COALESCE(substr(date, 1, 7), ''),
+                   {_stat_select_list(MONTHLY_STAT_COLUMNS)}
+            FROM entries
+            GROUP BY 1, 2
+        ''')
+        expected = {(row[0], row[1]): row[2:] for row in cursor.fetchall()}
+        cursor.execute(f"SELECT application_name, month, {', '.join(MONTHLY_STAT_NAMES)} FROM monthly_rollups")
+        actual = {(row[0], row[1]): row[2:] for row in cursor.fetchall()}
+        conn.close()
+
+        zeros = (0,) * len(MONTHLY_STAT_NAMES)
+        mismatches = []
+        for key in sorted(set(expected) | set(actual)):
+            expected_counts = expected.get(key, zeros)
+            actual_counts = actual.get(key, zeros)
+            for name, expected_value, actual_value in zip(MONTHLY_STAT_NAMES, expected_counts, actual_counts):
+                if expected_value != actual_value:
+                    mismatches.append({
+                        'application_name': key[0], 'month': key[1], 'counter': name,
+                        'expected': expected_value, 'actual': actual_value
+                    })
+        return mismatches
+    
+    def _apply_rollup_delta(self, cursor, entry_id: int, sign: int, application_name: str = None):
+        """Add (sign=1) or subtract (sign=-1) an entry's contribution to monthly_rollups.
+
+        Must run inside the caller's write transaction so the rollups commit
+        or roll back together with the entry change.
+        """
+        query = f'''
+            SELECT COALESCE(application_name, ''), COALESCE(substr(date, 1, 7), ''),
+                   {_stat_select_list(MONTHLY_STAT_COLUMNS)}
+            FROM entries WHERE id = ?
+        '''
+        params = [entry_id]
+        if application_name:
+            query += ' AND application_name = ?'
+            params.append(application_name)
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+        if row is None or row[2] is None:
+            return
+        self._apply_rollup_rows(cursor, [row], sign)
+    
+    def _add_rollups_for_entries(self, cursor, entry_ids: List[int]):
+        """Add the contribution of many new entries to monthly_rollups, one GROUP BY per id chunk"""
+        for start in range(0, len(entry_ids), CHILD_ROW_CHUNK_SIZE):
+            chunk = entry_ids[start:start + CHILD_ROW_CHUNK_SIZE]
+            placeholders = ', '.join('?' for _ in chunk)
+            cursor.execute(f'''
+                SELECT COALESCE(application_name, ''), COALESCE(substr(date, 1, 7), ''),
+                       {_stat_select_list(MONTHLY_STAT_COLUMNS)}
+                FROM entries WHERE id IN ({placeholders})
+                GROUP BY 1, 2
+            ''', chunk)
+            self._apply_rollup_rows(cursor, cursor.fetchall(), 1)
+    
+    def _apply_rollup_rows(self, cursor, rows, sign: int):
+        """Add (sign=1) or subtract (sign=-1) (application, month, *counters) rows to monthly_rollups"""
+        if not rows:
             return
+        keys = [(row[0], row[1]) for row in rows]
+        cursor.executemany('INSERT OR IGNORE INTO monthly_rollups (application_name, month) VALUES (?, ?)', keys)
+        set_clause = ', '.join(f'{name} = {name} + ?' for name in MONTHLY_STAT_NAMES)
+        cursor.executemany(f'UPDATE monthly_rollups SET {set_clause} WHERE application_name = ? AND month = ?',
+                           [[sign * count for count in row[2:]] + list(key) for row, key in zip(rows, keys)])
+        if sign < 0:
+            cursor.executemany('DELETE FROM monthly_rollups WHERE application_name = ? AND month = ? AND total <= 0', keys)
+    
+    def _bump_data_version(self, cursor):
+        """Increment the persisted data version inside the caller's write transaction"""
+        cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('data_version', '0')")
+        cursor.execute("UPDATE settings SET value = CAST(value AS INTEGER) + 1 WHERE key = 'data_version'")
+    
+    def _advance_data_version(self, conn, floor: int) -> int:
+        """Set the data version to one past floor (or the current value, if higher); returns it"""
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('data_version', '0')")
+        conn.execute("UPDATE settings SET value = MAX(CAST(value AS INTEGER), ?) + 1 WHERE key = 'data_version'",
+                     (int(floor),))
+        version = int(conn.execute("SELECT value FROM settings WHERE key = 'data_version'").fetchone()[0])
+        conn.commit()
+        return version
+    
+    def get_data_version(self) -> int:
+        """Database-wide counter bumped by every entry write (shared by all processes)"""
+        value = self.get_setting('data_version')
+        return int(value) if value else 0
+    
+    def get_entry_updated_at(self, entry_id: int) -> Optional[str]:
+        """Get an entry's updated_at without loading the entry (None if it does not exist)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT updated_at FROM entries WHERE id = ?', (entry_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
     
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.local_db_path)
+        """Get a pooled database connection; close() returns it to the pool"""
+        return self.pool.acquire()
+    
+    def close(self):
+        """Close pooled connections (call at shutdown)"""
+        self.pool.close_all()
+    
+    def run_maintenance(self) -> Dict:
+        """Refresh query planner statistics and checkpoint the WAL; returns the checkpoint result"""
+        conn = self.get_connection()
         try:
-            conn.execute('PRAGMA foreign_keys = ON')
-        except Exception:
-            pass
-        return conn
+            conn.execute('PRAGMA optimize')
+            busy, wal_pages, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+        finally:
+            conn.close()
+        return {'busy': bool(busy), 'wal_pages': wal_pages, 'checkpointed_pages': checkpointed}
     
-    def sync_to_sharepoint(self) -> bool:
-        """Upload local database to SharePoint"""
+    def sync_engine(self) -> SyncEngine:
+        """Delta sync engine for this database (HTTP to sharepoint_url unless a transport was given)"""
+        if self.sync_transport is None:
+            self.sync_transport = HTTPTransport(self.sharepoint_url)
+        return SyncEngine(self.local_db_path, self.sync_transport,
+                          state_dir=os.path.dirname(self.local_db_path), chunk_size=self.sync_chunk_size)
+    
+    def sync_to_sharepoint(self, force: bool = False) -> bool:
+        """Upload the chunks of a database snapshot that SharePoint does not have yet.
+
+        Transfer stats (or the error) are kept in last_sync_stats.
+        """
         try:
-            # In a real implementation, you would use SharePoint REST API
-            # For now, just return True to indicate sync is complete
+            # Read before the snapshot: a write in between only makes the next push redundant
+            data_version = self.get_data_version()
+            conn = self.get_connection()
+            try:
+                self.last_sync_stats = self.sync_engine().push(conn, data_version, force=force)
+            finally:
+                conn.close()
             return True
             
         except Exception as e:
+            print(f"❌ SharePoint upload failed: {e}")
+            self.last_sync_stats = {'direction': 'push', 'status': 'failed', 'error': str(e)}
             return False
     
-    def sync_from_sharepoint(self) -> bool:
-        """Download database from SharePoint"""
+    def sync_from_sharepoint(self, force: bool = False) -> bool:
+        """Replace the local database with the SharePoint copy, downloading only changed chunks.
+
+        The remote contents are copied into the live database with the backup
+        API, so open connections see an ordinary new version; the schema is
+        then brought up to date in case the remote copy is older. The restore
+        brings the remote's data_version along, which may equal a version
+        this host already served with different contents, so it is moved
+        past both before any ETag is computed from it.
+        """
         try:
-            # For now, we'll just ensure local database exists
-            # In a real implementation, you would download from SharePoint
-            if not os.path.exists(self.local_db_path):
+            data_version = self.get_data_version()
+            conn = self.get_connection()
+            try:
+                local_is_empty = conn.execute('SELECT NOT EXISTS (SELECT 1 FROM entries)').fetchone()[0]
+                stats = self.sync_engine().pull(
+                    conn, data_version, bool(local_is_empty), force=force,
+                    on_restored=lambda restored_conn, remote_version: self._advance_data_version(
+                        restored_conn, max(data_version, remote_version))
+                )
+            finally:
+                conn.close()
+            self.last_sync_stats = stats
+            if stats['status'] != 'unchanged':
+                self._entry_columns = None
                 self.init_database()
-            
             return True
             
         except Exception as e:
+            print(f"❌ SharePoint download failed: {e}")
+            self.last_sync_stats = {'direction': 'pull', 'status': 'failed', 'error': str(e)}
             return False
     
     def get_entries_by_application(self, application_name: str) -> List[Dict]:
-        """Get entries for specific application"""
+        """Get entries for specific application, in the dashboard order"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT * FROM entries WHERE application_name = ?
-            ORDER BY created_at DESC
+            ORDER BY {ENTRY_PAGE_ORDER}
         ''', (application_name,))
         
         columns = [description[0] for description in cursor.description]
-        entries = []
+        entries = [dict(zip(columns, row)) for row in cursor.fetchall()]
         
-        for row in cursor.fetchall():
-            entry = dict(zip(columns, row))
-            # Attach child rows
-            entry_id = entry.get('id')
-            # issues
-            cursor.execute('SELECT id, description, remarks, position, created_at FROM issues WHERE entry_id = ? ORDER BY position ASC, id ASC', (entry_id,))
-            issues = []
-            for r in cursor.fetchall():
-                issues.append({
-                    'id': r[0], 'description': r[1], 'remarks': r[2], 'position': r[3], 'created_at': r[4]
-                })
-            entry['issues'] = issues
-
-            # prbs
-            cursor.execute('SELECT id, prb_id_number, prb_id_status, prb_link, position, created_at FROM prbs WHERE entry_id = ? ORDER BY position ASC, id ASC', (entry_id,))
-            prbs = []
-            for r in cursor.fetchall():
-                prbs.append({
-                    'id': r[0], 'prb_id_number': r[1], 'prb_id_status': r[2], 'prb_link': r[3], 'position': r[4], 'created_at': r[5]
-                })
-            entry['prbs'] = prbs
-
-            # hiims
-            cursor.execute('SELECT id, hiim_id_number, hiim_id_status, hiim_link, position, created_at FROM hiims WHERE entry_id = ? ORDER BY position ASC, id ASC', (entry_id,))
-            hiims = []
-            for r in cursor.fetchall():
-                hiims.append({
-                    'id': r[0], 'hiim_id_number': r[1], 'hiim_id_status': r[2], 'hiim_link': r[3], 'position': r[4], 'created_at': r[5]
-                })
-            entry['hiims'] = hiims
-
-            entries.append(entry)
+        # Attach child rows with one IN (...) query per chunk of entry ids
+        self._attach_child_rows(cursor, entries)
         
         conn.close()
         return entries
     
     def get_all_entries(self) -> List[Dict]:
-        """Get all entries from all applications"""
+        """Get all entries from all applications, in the dashboard order"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT * FROM entries
-            ORDER BY created_at DESC
+            ORDER BY {ENTRY_PAGE_ORDER}
         ''')
         
         columns = [description[0] for description in cursor.description]
-        entries = []
+        entries = [dict(zip(columns, row)) for row in cursor.fetchall()]
         
-        for row in cursor.fetchall():
-            entry = dict(zip(columns, row))
-            entry_id = entry.get('id')
-            # Attach child rows similarly to get_entries_by_application
-            cursor.execute('SELECT id, description, remarks, position, created_at FROM issues WHERE entry_id = ? ORDER BY position ASC, id ASC', (entry_id,))
-            issues = []
-            for r in cursor.fetchall():
-                issues.append({'id': r[0], 'description': r[1], 'remarks': r[2], 'position': r[3], 'created_at': r[4]})
-            entry['issues'] = issues
-
-            cursor.execute('SELECT id, prb_id_number, prb_id_status, prb_link, position, created_at FROM prbs WHERE entry_id = ? ORDER BY position ASC, id ASC', (entry_id,))
-            prbs = []
-            for r in cursor.fetchall():
-                prbs.append({'id': r[0], 'prb_id_number': r[1], 'prb_id_status': r[2], 'prb_link': r[3], 'position': r[4], 'created_at': r[5]})
-            entry['prbs'] = prbs
-
-            cursor.execute('SELECT id, hiim_id_number, hiim_id_status, hiim_link, position, created_at FROM hiims WHERE entry_id = ? ORDER BY position ASC, id ASC', (entry_id,))
-            hiims = []
-            for r in cursor.fetchall():
-                hiims.append({'id': r[0], 'hiim_id_number': r[1], 'hiim_id_status': r[2], 'hiim_link': r[3], 'position': r[4], 'created_at': r[5]})
-            entry['hiims'] = hiims
-
-            entries.append(entry)
+        # Every entry is loaded, so read each child table in a single pass
+        self._attach_child_rows(cursor, entries, all_rows=True)
         
         conn.close()
         return entries
     
+    def get_entries_filtered(self, start_date: str = None, end_date: str = None, application: str = None,
+                             quality_status: str = None, prb_only: bool = False, hiim_only: bool = False,
+                             limit: int = None, after: tuple = None) -> List[Dict]:
+        """Get entries matching the dashboard filters, newest date first.
+
+        limit/after give keyset pagination: after is the (date, created_at, id)
+        of the last entry on the previous page, and the next page starts right
+        below it. The ordering is served by idx_entries_date_created_key, so
+        every page costs the same regardless of how deep it is.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        where_clause, params = self._build_entry_filters(
+            start_date=start_date, end_date=end_date, application=application,
+            quality_status=quality_status, prb_only=prb_only, hiim_only=hiim_only, after=after
+        )
+        limit_clause = ''
+        if limit is not None:
+            limit_clause = 'LIMIT ?'
+            params.append(int(limit))
+
+        cursor.execute(f'''
+            SELECT * FROM entries {where_clause}
+            ORDER BY {ENTRY_PAGE_ORDER}
+            {limit_clause}
+        ''', params)
+
+        columns = [description[0] for description in cursor.description]
+        entries = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        # A page only needs the child rows of its own entries
+        self._attach_child_rows(cursor, entries, all_rows=not where_clause and limit is None)
+
+        conn.close()
+        return entries
+
+    def iter_entries_filtered(self, start_date: str = None, end_date: str = None, application: str = None,
+                              quality_status: str = None, prb_only: bool = False, hiim_only: bool = False,
+                              chunk_size: int = CHILD_ROW_CHUNK_SIZE):
+        """Yield filtered entries in chunks, in the same order as get_entries_filtered.
+
+        Rows are pulled from the cursor with fetchmany and child rows are
+        attached one chunk at a time, so memory stays flat however many
+        entries match. The connection is held until the generator finishes
+        or is closed.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            child_cursor = conn.cursor()
+
+            where_clause, params = self._build_entry_filters(
+                start_date=start_date, end_date=end_date, application=application,
+                quality_status=quality_status, prb_only=prb_only, hiim_only=hiim_only
+            )
+            cursor.execute(f'''
+                SELECT * FROM entries {where_clause}
+                ORDER BY {ENTRY_PAGE_ORDER}
+            ''', params)
+            columns = [description[0] for description in cursor.description]
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                entries = [dict(zip(columns, row)) for row in rows]
+                yield self._attach_child_rows(child_cursor, entries)
+        finally:
+            conn.close()
+
+    def get_monthly_stats(self, start_date: str = None, end_date: str = None, application: str = None,
+                          quality_status: str = None, prb_only: bool = False, hiim_only: bool = False,
+                          years: List[str] = None, months: List[str] = None,
+                          application_name: str = None) -> List[Dict]:
+        """Aggregate filtered entries per (month, application_name).
+
+        Returns one dict per group with 'month' (YYYY-MM), 'application_name'
+        and the MONTHLY_STAT_COLUMNS counters. application is a substring
+        match, application_name an exact one. With only year/month/application
+        filters the rows come straight from monthly_rollups; day-level filters
+        fall back to a GROUP BY over entries. Child rows are never loaded.
+        Both paths report a missing (NULL or '') application name as 'Unknown'.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        if not (start_date or end_date or quality_status or prb_only or hiim_only):
+            # Month-level filters only: read the incrementally maintained rollups
+            clauses, params = [], []
+            if years:
+                clauses.append(f"substr(month, 1, 4) IN ({', '.join('?' * len(years))})")
+                params.extend(str(year) for year in years)
+            if months:
+                clauses.append(f"ltrim(substr(month, 6, 2), '0') IN ({', '.join('?' * len(months))})")
+                params.extend(str(month) for month in months)
+            if application:
+                clauses.append('instr(LOWER(application_name), ?) > 0')
+                params.append(application.lower())
+            if application_name:
+                clauses.append('application_name = ?')
+                params.append(application_name)
+            where_clause = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+            cursor.execute(f'''
+                SELECT month, {MONTHLY_STAT_APPLICATION} AS application_name, {', '.join(MONTHLY_STAT_NAMES)}
+                FROM monthly_rollups {where_clause}
+                ORDER BY month, monthly_rollups.application_name
+            ''', params)
+        else:
+            where_clause, params = self._build_entry_filters(
+                start_date=start_date, end_date=end_date, application=application,
+                quality_status=quality_status, prb_only=prb_only, hiim_only=hiim_only,
+                years=years, months=months, application_name=application_name
+            )
+
+            # Grouped like the rollups, which key a NULL application_name or date as ''
+            cursor.execute(f'''
+                SELECT COALESCE(substr(date, 1, 7), '') AS month, {MONTHLY_STAT_APPLICATION} AS application_name,
+                       {_stat_select_list(MONTHLY_STAT_COLUMNS)}
+                FROM entries {where_clause}
+                GROUP BY 1, COALESCE(application_name, '')
+                ORDER BY 1, COALESCE(application_name, '')
+            ''', params)
+
+        columns = [description[0] for description in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        conn.close()
+        return rows
+
+    def get_xva_root_causes(self, start_date: str = None, end_date: str = None,
+                            years: List[str] = None, months: List[str] = None) -> List[Dict]:
+        """Count XVA red cards per (root_cause_application, root_cause_type).
+
+        Missing root causes are reported as 'Unknown'. Groups are ordered by
+        their most recent entry, newest first.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        where_clause, params = self._build_entry_filters(
+            start_date=start_date, end_date=end_date, years=years, months=months, application_name='XVA'
+        )
+        red_card = dict(MONTHLY_STAT_COLUMNS)['red_cards']
+
+        cursor.execute(f'''
+            SELECT COALESCE(NULLIF(root_cause_application, ''), 'Unknown') AS root_cause_application,
+                   COALESCE(NULLIF(root_cause_type, ''), 'Unknown') AS root_cause_type,
+                   COUNT(1) AS count
+            FROM entries {where_clause} AND ({red_card})
+            GROUP BY 1, 2
+            ORDER BY MAX(created_at) DESC
+        ''', params)
+
+        columns = [description[0] for description in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        conn.close()
+        return rows
+
+    def _build_entry_filters(self, start_date: str = None, end_date: str = None, application: str = None,
+                             quality_status: str = None, prb_only: bool = False, hiim_only: bool = False,
+                             years: List[str] = None, months: List[str] = None, after: tuple = None,
+                             application_name: str = None):
+        """Translate dashboard filters into a parameterized WHERE clause on entries.
+
+        Dates are stored as YYYY-MM-DD text, so range checks compare strings.
+        The application filter is a case-insensitive substring match
+        (application_name is an exact, index-friendly match), and the
+        PRB/HIIM filters accept either the legacy single column or a child row.
+        years/months match the entry date's year and unpadded month number.
+        after is a (date, created_at, id) keyset position for pagination.
+        Returns (where_clause, params); where_clause is '' when nothing filters.
+        """
+        clauses = []
+        params = []
+
+        if start_date:
+            clauses.append('date >= ?')
+            params.append(start_date)
+        if end_date:
+            clauses.append('date <= ?')
+            params.append(end_date)
+        if years:
+            clauses.append(f"strftime('%Y', date) IN ({', '.join('?' * len(years))})")
+            params.extend(str(year) for year in years)
+            if all(str(year).isdigit() for year in years):
+                # Redundant range check so the date index can narrow the scan
+                clauses.append('date >= ? AND date < ?')
+                params.append(f'{min(int(year) for year in years):04d}-01-01')
+                params.append(f'{max(int(year) for year in years) + 1:04d}-01-01')
+        if months:
+            # Month filter values are unpadded ('1'..'12')
+            clauses.append(f"ltrim(strftime('%m', date), '0') IN ({', '.join('?' * len(months))})")
+            params.extend(str(month) for month in months)
+        if application:
+            clauses.append('instr(LOWER(application_name), ?) > 0')
+            params.append(application.lower())
+        if application_name:
+            clauses.append('application_name = ?')
+            params.append(application_name)
+        if quality_status:
+            clauses.append('quality_status = ?')
+            params.append(quality_status)
+        if prb_only:
+            clauses.append("((prb_id_number IS NOT NULL AND prb_id_number != '') "
+                           "OR EXISTS (SELECT 1 FROM prbs WHERE prbs.entry_id = entries.id))")
+        if hiim_only:
+            clauses.append("((hiim_id_number IS NOT NULL AND hiim_id_number != '') "
+                           "OR EXISTS (SELECT 1 FROM hiims WHERE hiims.entry_id = entries.id))")
+        if after:
+            clauses.append(f"(date, {ENTRY_CREATED_KEY}, id) < (?, COALESCE(?, ''), ?)")
+            params.extend(after)
+
+        where_clause = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where_clause, params
+
+    def _attach_child_rows(self, cursor, entries: List[Dict], all_rows: bool = False) -> List[Dict]:
+        """Attach issues, prbs and hiims to entries in place.
+
+        Runs one query per child table (or per chunk of CHILD_ROW_CHUNK_SIZE
+        entry ids) instead of three queries per entry. With all_rows=True the
+        child tables are read without an IN (...) filter, which is cheapest
+        when the caller has loaded every entry.
+        """
+        entries_by_id = {}
+        for entry in entries:
+            for table, _ in CHILD_TABLES:
+                entry[table] = []
+            entries_by_id[entry.get('id')] = entry
+
+        if not entries_by_id:
+            return entries
+
+        entry_ids = list(entries_by_id.keys())
+        for table, child_columns in CHILD_TABLES:
+            select = f"SELECT entry_id, {', '.join(child_columns)} FROM {table}"
+            order_by = 'ORDER BY entry_id, position ASC, id ASC'
+            if all_rows:
+                batches = [(f'{select} {order_by}', ())]
+            else:
+                batches = []
+                for start in range(0, len(entry_ids), CHILD_ROW_CHUNK_SIZE):
+                    chunk = entry_ids[start:start + CHILD_ROW_CHUNK_SIZE]
+                    placeholders = ', '.join('?' * len(chunk))
+                    batches.append((f'{select} WHERE entry_id IN ({placeholders}) {order_by}', chunk))
+
+            for query, params in batches:
+                cursor.execute(query, params)
+                for row in cursor.fetchall():
+                    entry = entries_by_id.get(row[0])
+                    if entry is not None:
+                        entry[table].append(dict(zip(child_columns, row[1:])))
+
+        return entries
+    
+    def find_entry_id(self, date: str, application_name: str, exclude_id: int = None) -> Optional[int]:
+        """Return the id of the entry for a date and application, if any (indexed lookup)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        if exclude_id is not None:
+            cursor.execute('SELECT id FROM entries WHERE date = ? AND application_name = ? AND id != ? LIMIT 1',
+                           (date, application_name, exclude_id))
+        else:
+            cursor.execute('SELECT id FROM entries WHERE date = ? AND application_name = ? LIMIT 1',
+                           (date, application_name))
+        row = cursor.fetchone()
+
+        conn.close()
+        return row[0] if row else None
+    
     def create_entry(self, entry_data: Dict) -> Optional[Dict]:
         """Create a new entry"""
+        conn = None
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
@@ -354,88 +1085,22 @@ class SharePointSQLiteAdapter:
             # Add timestamps
             now = datetime.utcnow().isoformat()
             
+            # Take the write lock up front so the rollup update below sees this transaction's rows only
+            cursor.execute('BEGIN IMMEDIATE')
+            
             # Insert entry
-            cursor.execute('''
-                INSERT INTO entries (
-                    date, day, application_name, prc_mail_text, prc_mail_status,
-                    cp_alerts_text, cp_alerts_status, quality_status, quality_legacy, quality_target,
-                    prb_id_number, prb_id_status, hiim_id_number, hiim_id_status,
-                    valo_text, valo_status, sensi_text, sensi_status, cf_ra_text, cf_ra_status,
-                    acq_text, root_cause_application, root_cause_type, issue_description, remarks,
-                    created_at, updated_at, prb_link, hiim_link, xva_remarks
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                entry_data.get('date', ''),
-                entry_data.get('day', ''),
-                entry_data.get('application_name', ''),
-                entry_data.get('prc_mail_text', ''),
-                entry_data.get('prc_mail_status', ''),
-                entry_data.get('cp_alerts_text', ''),
-                entry_data.get('cp_alerts_status', ''),
-                entry_data.get('quality_status', ''),
-                entry_data.get('quality_legacy', ''),
-                entry_data.get('quality_target', ''),
-                entry_data.get('prb_id_number', ''),
-                entry_data.get('prb_id_status', ''),
-                entry_data.get('hiim_id_number', ''),
-                entry_data.get('hiim_id_status', ''),
-                entry_data.get('valo_text', ''),
-                entry_data.get('valo_status', ''),
-                entry_data.get('sensi_text', ''),
-                entry_data.get('sensi_status', ''),
-                entry_data.get('cf_ra_text', ''),
-                entry_data.get('cf_ra_status', ''),
-                entry_data.get('acq_text', ''),
-                entry_data.get('root_cause_application', ''),
-                entry_data.get('root_cause_type', ''),
-                entry_data.get('issue_description', ''),
-                entry_data.get('remarks', ''),
-                now,
-                now,
-                entry_data.get('prb_link', ''),
-                entry_data.get('hiim_link', ''),
-                entry_data.get('xva_remarks', '')
-            ))
+            cursor.execute(_ENTRY_INSERT_SQL, self._entry_insert_values(entry_data, now))
             
             # Get the inserted ID
             entry_id = cursor.lastrowid
             entry_data['id'] = entry_id
 
             # Insert child rows if provided (issues, prbs, hiims)
-            # Issues
             issues = entry_data.get('issues') or []
-            for idx, issue in enumerate(issues):
-                cursor.execute('INSERT INTO issues (entry_id, description, remarks, position, created_at) VALUES (?, ?, ?, ?, ?)', (
-                    entry_id,
-                    issue.get('description', ''),
-                    issue.get('remarks', ''),
-                    idx,
-                    now
-                ))
-
-            # PRBs
             prbs = entry_data.get('prbs') or []
-            for idx, prb in enumerate(prbs):
-                cursor.execute('INSERT INTO prbs (entry_id, prb_id_number, prb_id_status, prb_link, position, created_at) VALUES (?, ?, ?, ?, ?, ?)', (
-                    entry_id,
-                    str(prb.get('prb_id_number', '')) if prb.get('prb_id_number') is not None else '',
-                    prb.get('prb_id_status', ''),
-                    prb.get('prb_link', ''),
-                    idx,
-                    now
-                ))
-
-            # HIIMs
             hiims = entry_data.get('hiims') or []
-            for idx, hiim in enumerate(hiims):
-                cursor.execute('INSERT INTO hiims (entry_id, hiim_id_number, hiim_id_status, hiim_link, position, created_at) VALUES (?, ?, ?, ?, ?, ?)', (
-                    entry_id,
-                    str(hiim.get('hiim_id_number', '')) if hiim.get('hiim_id_number') is not None else '',
-                    hiim.get('hiim_id_status', ''),
-                    hiim.get('hiim_link', ''),
-                    idx,
-                    now
-                ))
+            for table, items in (('issues', issues), ('prbs', prbs), ('hiims', hiims)):
+                _insert_child_rows(cursor, table, [(entry_id, idx, item) for idx, item in enumerate(items)], now)
 
             # For backward compatibility, populate legacy single columns if not provided
             if not entry_data.get('issue_description') and issues:
@@ -445,6 +1110,9 @@ class SharePointSQLiteAdapter:
             if not entry_data.get('hiim_id_number') and hiims:
                 cursor.execute('UPDATE entries SET hiim_id_number = ?, hiim_id_status = ?, hiim_link = ? WHERE id = ?', (str(hiims[0].get('hiim_id_number', '')), hiims[0].get('hiim_id_status', ''), hiims[0].get('hiim_link', ''), entry_id))
 
+            self._apply_rollup_delta(cursor, entry_id, 1)
+            self._bump_data_version(cursor)
+
             conn.commit()
             conn.close()
 
@@ -461,8 +1129,108 @@ class SharePointSQLiteAdapter:
                 conn.close()
             return None
     
+    def _entry_insert_values(self, entry_data: Dict, now: str) -> tuple:
+        """Row values for _ENTRY_INSERT_SQL; missing fields are stored as empty strings"""
+        return tuple(now if column in ('created_at', 'updated_at') else entry_data.get(column, '')
+                     for column in ENTRY_INSERT_COLUMNS)
+    
+    def _lookup_entry_ids(self, cursor, keys) -> Dict[tuple, int]:
+        """Map (date, application_name) pairs to existing entry ids via the unique index"""
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), ENTRY_KEY_CHUNK_SIZE):
+            chunk = keys[start:start + ENTRY_KEY_CHUNK_SIZE]
+            values = ', '.join('(?, ?)' for _ in chunk)
+            cursor.execute(f'''
+                WITH entry_keys(date, application_name) AS (VALUES {values})
+                SELECT e.date, e.application_name, e.id
+                FROM entry_keys CROSS JOIN entries e
+                    ON e.date = entry_keys.date AND e.application_name = entry_keys.application_name
+            ''', [value for key in chunk for value in key])
+            for entry_date, application_name, entry_id in cursor.fetchall():
+                found.setdefault((entry_date, application_name), entry_id)
+        return found
+    
+    def create_entries(self, entries_data: List[Dict]) -> Optional[List[Dict]]:
+        """Create many entries in one transaction.
+        
+        Returns one result per input entry, in order: {'status': 'created', 'entry': ...}
+        or {'status': 'duplicate', 'error': ...} when its (date, application_name) already
+        exists or repeats an earlier entry of the batch. Returns None if the transaction
+        failed, in which case nothing was written.
+        """
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            now = datetime.utcnow().isoformat()
+            
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            keys = [(entry_data.get('date', ''), entry_data.get('application_name', '')) for entry_data in entries_data]
+            existing = self._lookup_entry_ids(cursor, set(keys))
+            
+            results = []
+            batch_keys = set()
+            new_entries = []
+            for entry_data, key in zip(entries_data, keys):
+                if key in existing:
+                    results.append({'status': 'duplicate', 'error': f'An entry already exists for {key[1]} on {key[0]}'})
+                elif key in batch_keys:
+                    results.append({'status': 'duplicate', 'error': f'{key[1]} on {key[0]} appears more than once in this batch'})
+                else:
+                    batch_keys.add(key)
+                    results.append({'status': 'created', 'entry': entry_data})
+                    new_entries.append((key, entry_data))
+            
+            # Populate legacy single columns from the first child row, as create_entry does
+            entry_rows = []
+            for _, entry_data in new_entries:
+                row_data = dict(entry_data)
+                issues = entry_data.get('issues') or []
+                prbs = entry_data.get('prbs') or []
+                hiims = entry_data.get('hiims') or []
+                if not row_data.get('issue_description') and issues:
+                    row_data['issue_description'] = issues[0].get('description', '')
+                if not row_data.get('prb_id_number') and prbs:
+                    row_data.update(prb_id_number=str(prbs[0].get('prb_id_number', '')),
+                                    prb_id_status=prbs[0].get('prb_id_status', ''), prb_link=prbs[0].get('prb_link', ''))
+                if not row_data.get('hiim_id_number') and hiims:
+                    row_data.update(hiim_id_number=str(hiims[0].get('hiim_id_number', '')),
+                                    hiim_id_status=hiims[0].get('hiim_id_status', ''), hiim_link=hiims[0].get('hiim_link', ''))
+                entry_rows.append(self._entry_insert_values(row_data, now))
+            cursor.executemany(_ENTRY_INSERT_SQL, entry_rows)
+            
+            # executemany has no lastrowid; read the new ids back through the unique index
+            new_ids = self._lookup_entry_ids(cursor, [key for key, _ in new_entries])
+            
+            child_rows = {table: [] for table in CHILD_WRITE_COLUMNS}
+            for key, entry_data in new_entries:
+                entry_id = new_ids[key]
+                entry_data['id'] = entry_id
+                for table in CHILD_WRITE_COLUMNS:
+                    entry_data[table] = entry_data.get(table) or []
+                    child_rows[table].extend((entry_id, idx, item) for idx, item in enumerate(entry_data[table]))
+            for table, rows in child_rows.items():
+                _insert_child_rows(cursor, table, rows, now)
+            
+            if new_entries:
+                self._add_rollups_for_entries(cursor, [entry_data['id'] for _, entry_data in new_entries])
+                self._bump_data_version(cursor)
+            
+            conn.commit()
+            conn.close()
+            return results
+            
+        except Exception as e:
+            if conn:
+                conn.rollback()
+                conn.close()
+            return None
+    
     def get_entry_by_id(self, entry_id: int, application_name: str = None) -> Optional[Dict]:
         """Get a specific entry by ID"""
+        conn = None
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
@@ -477,7 +1245,6 @@ class SharePointSQLiteAdapter:
             row = cursor.fetchone()
 
             if not row:
-                conn.close()
                 return None
 
             # Build the entry dict while the connection/cursor is still open
@@ -485,93 +1252,122 @@ class SharePointSQLiteAdapter:
             entry = dict(zip(columns, row))
 
             # Attach child rows
-            cursor.execute('SELECT id, description, remarks, position, created_at FROM issues WHERE entry_id = ? ORDER BY position ASC, id ASC', (entry_id,))
-            entry['issues'] = [{'id': r[0], 'description': r[1], 'remarks': r[2], 'position': r[3], 'created_at': r[4]} for r in cursor.fetchall()]
-
-            cursor.execute('SELECT id, prb_id_number, prb_id_status, prb_link, position, created_at FROM prbs WHERE entry_id = ? ORDER BY position ASC, id ASC', (entry_id,))
-            entry['prbs'] = [{'id': r[0], 'prb_id_number': r[1], 'prb_id_status': r[2], 'prb_link': r[3], 'position': r[4], 'created_at': r[5]} for r in cursor.fetchall()]
-
-            cursor.execute('SELECT id, hiim_id_number, hiim_id_status, hiim_link, position, created_at FROM hiims WHERE entry_id = ? ORDER BY position ASC, id ASC', (entry_id,))
-            entry['hiims'] = [{'id': r[0], 'hiim_id_number': r[1], 'hiim_id_status': r[2], 'hiim_link': r[3], 'position': r[4], 'created_at': r[5]} for r in cursor.fetchall()]
-
-            conn.close()
+            self._attach_child_rows(cursor, [entry])
             return entry
             
         except Exception as e:
             return None
+        finally:
+            if conn:
+                conn.close()
+    
+    def _get_entry_columns(self, cursor) -> frozenset:
+        """Column names of the entries table (read once; the schema only changes during init)"""
+        if self._entry_columns is None:
+            cursor.execute('PRAGMA table_info(entries)')
+            self._entry_columns = frozenset(row[1] for row in cursor.fetchall())
+        return self._entry_columns
+    
+    def _reconcile_child_rows(self, cursor, entry_id: int, table: str, items: List[Dict], now: str):
+        """Make an entry's rows in a child table match items, writing only what changed.
+
+        Items carrying the id of one of the entry's rows are matched to that
+        row; the rest are paired with the remaining rows in position order.
+        Matched rows are updated only if their content or position differs
+        (keeping created_at), extra items are inserted and leftover rows deleted.
+        """
+        content_columns = CHILD_WRITE_COLUMNS[table]
+        cursor.execute(
+            f"SELECT id, position, {', '.join(content_columns)} FROM {table} "
+            "WHERE entry_id = ? ORDER BY position ASC, id ASC",
+            (entry_id,)
+        )
+        existing = cursor.fetchall()
+        existing_by_id = {row[0]: row for row in existing}
+
+        matched, claimed = {}, set()
+        for idx, item in enumerate(items):
+            child_id = item.get('id')
+            if child_id in existing_by_id and child_id not in claimed:
+                matched[idx] = child_id
+                claimed.add(child_id)
+        unclaimed = iter([row for row in existing if row[0] not in claimed])
+
+        updates, inserts = [], []
+        for idx, item in enumerate(items):
+            values = _child_row_values(table, item)
+            row = existing_by_id[matched[idx]] if idx in matched else next(unclaimed, None)
+            if row is None:
+                inserts.append((entry_id, idx, item))
+            elif row[1] != idx or tuple(row[2:]) != values:
+                updates.append(values + (idx, row[0]))
+        deletes = [(row[0],) for row in unclaimed]
+
+        if deletes:
+            cursor.executemany(f'DELETE FROM {table} WHERE id = ?', deletes)
+        if updates:
+            set_clause = ', '.join(f'{column} = ?' for column in content_columns + ('position',))
+            cursor.executemany(f'UPDATE {table} SET {set_clause} WHERE id = ?', updates)
+        _insert_child_rows(cursor, table, inserts, now)
     
     def update_entry(self, entry_id: int, update_data: Dict, application_name: str = None) -> Optional[Dict]:
-        """Update an existing entry"""
+        """Update an existing entry.
+
+        Child arrays (issues, prbs, hiims) present in update_data replace the
+        entry's rows, but are reconciled with the stored rows so only changed
+        rows are written. The updated entry is read back inside the same
+        transaction. Returns None if the entry does not exist or the update failed.
+        """
+        conn = None
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
             
             # Add updated timestamp
-            update_data['updated_at'] = datetime.utcnow().isoformat()
-            
-            # Determine which keys correspond to real columns in entries table
-            cursor.execute("PRAGMA table_info(entries)")
-            existing_columns = {row[1] for row in cursor.fetchall()}
-
-            # Prepare column updates for only existing entry columns
-            column_updates = {k: v for k, v in update_data.items() if k in existing_columns}
-
-            if column_updates:
-                set_clause = ', '.join([f"{key} = ?" for key in column_updates.keys()])
-                values = list(column_updates.values())
-                values.append(entry_id)
-
-                if application_name:
-                    query = f'''
-                        UPDATE entries SET {set_clause}
-                        WHERE id = ? AND application_name = ?
-                    '''
-                    values.append(application_name)
-                else:
-                    query = f'UPDATE entries SET {set_clause} WHERE id = ?'
+            now = datetime.utcnow().isoformat()
+            update_data['updated_at'] = now
+            
+            # Only keys that are real entry columns are written
+            entry_columns = self._get_entry_columns(cursor)
+            column_updates = {k: v for k, v in update_data.items() if k in entry_columns and k != 'id'}
+
+            # Swap the entry's old rollup contribution for the new one in this transaction
+            cursor.execute('BEGIN IMMEDIATE')
+            self._apply_rollup_delta(cursor, entry_id, -1, application_name)
 
-                cursor.execute(query, values)
+            set_clause = ', '.join([f"{key} = ?" for key in column_updates.keys()])
+            values = list(column_updates.values())
+            values.append(entry_id)
+            if application_name:
+                query = f'''
+                    UPDATE entries SET {set_clause}
+                    WHERE id = ? AND application_name = ?
+                '''
+                values.append(application_name)
             else:
-                # No top-level entry columns to update (maybe only child arrays were provided)
-                # Still proceed to replace child rows below
-                pass
+                query = f'UPDATE entries SET {set_clause} WHERE id = ?'
+            cursor.execute(query, values)
+            
+            if cursor.rowcount == 0:
+                # No such entry (for this application); leave its child rows alone
+                conn.rollback()
+                conn.close()
+                return None
+            self._apply_rollup_delta(cursor, entry_id, 1, application_name)
+            
+            for table, _ in CHILD_TABLES:
+                if table in update_data:
+                    self._reconcile_child_rows(cursor, entry_id, table, update_data.get(table) or [], now)
+            self._bump_data_version(cursor)
+            
+            cursor.execute('SELECT * FROM entries WHERE id = ?', (entry_id,))
+            columns = [description[0] for description in cursor.description]
+            entry = dict(zip(columns, cursor.fetchone()))
+            self._attach_child_rows(cursor, [entry])
             
-            # If update_data contains child arrays, replace child rows
-            if 'issues' in update_data:
-                    cursor.execute('DELETE FROM issues WHERE entry_id = ?', (entry_id,))
-                    for idx, issue in enumerate(update_data.get('issues') or []):
-                        cursor.execute('INSERT INTO issues (entry_id, description, remarks, position, created_at) VALUES (?, ?, ?, ?, ?)', (
-                            entry_id,
-                            issue.get('description', ''),
-                            issue.get('remarks', ''),
-                            idx,
-                            datetime.utcnow().isoformat()
-                        ))
-            if 'prbs' in update_data:
-                    cursor.execute('DELETE FROM prbs WHERE entry_id = ?', (entry_id,))
-                    for idx, prb in enumerate(update_data.get('prbs') or []):
-                        cursor.execute('INSERT INTO prbs (entry_id, prb_id_number, prb_id_status, prb_link, position, created_at) VALUES (?, ?, ?, ?, ?, ?)', (
-                            entry_id,
-                            str(prb.get('prb_id_number', '')) if prb.get('prb_id_number') is not None else '',
-                            prb.get('prb_id_status', ''),
-                            prb.get('prb_link', ''),
-                            idx,
-                            datetime.utcnow().isoformat()
-                        ))
-            if 'hiims' in update_data:
-                    cursor.execute('DELETE FROM hiims WHERE entry_id = ?', (entry_id,))
-                    for idx, hiim in enumerate(update_data.get('hiims') or []):
-                        cursor.execute('INSERT INTO hiims (entry_id, hiim_id_number, hiim_id_status, hiim_link, position, created_at) VALUES (?, ?, ?, ?, ?, ?)', (
-                            entry_id,
-                            str(hiim.get('hiim_id_number', '')) if hiim.get('hiim_id_number') is not None else '',
-                            hiim.get('hiim_id_status', ''),
-                            hiim.get('hiim_link', ''),
-                            idx,
-                            datetime.utcnow().isoformat()
-                        ))
             conn.commit()
             conn.close()
-            return self.get_entry_by_id(entry_id, application_name)
+            return entry
                 
         except Exception as e:
             # Log exception for debugging purposes
@@ -594,6 +1390,9 @@ class SharePointSQLiteAdapter:
             conn = self.get_connection()
             cursor = conn.cursor()
             
+            cursor.execute('BEGIN IMMEDIATE')
+            self._apply_rollup_delta(cursor, entry_id, -1, application_name)
+            
             if application_name:
                 cursor.execute('''
                     DELETE FROM entries WHERE id = ? AND application_name = ?
@@ -602,12 +1401,19 @@ class SharePointSQLiteAdapter:
                 cursor.execute('DELETE FROM entries WHERE id = ?', (entry_id,))
             
             success = cursor.rowcount > 0
+            if success:
+                self._bump_data_version(cursor)
             conn.commit()
             conn.close()
             
             return success
             
         except Exception as e:
+            try:
+                conn.rollback()
+                conn.close()
+            except Exception:
+                pass
             return False
     
     def get_setting(self, key: str) -> Optional[str]:
@@ -646,40 +1452,199 @@ class SharePointSQLiteAdapter:
 
 # Production Entry Manager for backward compatibility
 class ProductionEntryManagerWorking:
-    """Production Entry Manager using SharePoint SQLite adapter"""
+    """Production Entry Manager using SharePoint SQLite adapter.
+
+    Reads of entry lists, single entries and stats go through a ReadCache;
+    every write bumps its data version so cached results are never stale.
+    """
     
-    def __init__(self, sharepoint_url: str = None):
+    def __init__(self, sharepoint_url: str = None, pool_size: int = 5, cache_max_bytes: int = 64 * 1024 * 1024,
+                 data_dir: str = "./data", sql_tracer=None, sync_transport=None,
+                 sync_chunk_size: int = DEFAULT_CHUNK_SIZE, cache_probe_interval: float = 0.0):
         if not sharepoint_url:
             sharepoint_url = "https://groupsg001.sharepoint.com/sites/CCRTeam/Shared%20Documents/ProdVision"
-        self.adapter = SharePointSQLiteAdapter(sharepoint_url)
+        self.adapter = SharePointSQLiteAdapter(sharepoint_url, data_dir=data_dir, pool_size=pool_size,
+                                               sql_tracer=sql_tracer, sync_transport=sync_transport,
+                                               sync_chunk_size=sync_chunk_size)
+        self.cache = ReadCache(self.adapter.local_db_path, max_bytes=cache_max_bytes,
+                               probe_interval=cache_probe_interval)
+        # Settings are tiny and read on every conditional GET and login; they are
+        # kept here (not in the LRU) and dropped whenever the cache version moves
+        self._settings = {}
+        self._settings_version = None
+        self._settings_lock = threading.Lock()
+    
+    def close(self):
+        """Release database connections"""
+        self.cache.close()
+        self.adapter.close()
+    
+    def release_connections(self):
+        """Close idle connections, including the cache's probe; all are reopened on next use.
+
+        SQLite connections must not be carried across fork(), so a pre-forking
+        server calls this in the parent before starting workers.
+        """
+        self.adapter.pool.close_idle()
+        self.cache.release_probe()
+    
+    def run_maintenance(self) -> Dict:
+        """Periodic database upkeep (planner statistics, WAL checkpoint)"""
+        return self.adapter.run_maintenance()
+    
+    def sync_to_sharepoint(self, force: bool = False) -> bool:
+        """Push local changes to SharePoint (see SharePointSQLiteAdapter.sync_to_sharepoint)"""
+        return self.adapter.sync_to_sharepoint(force=force)
+    
+    def sync_from_sharepoint(self, force: bool = False) -> bool:
+        """Pull the SharePoint copy; cached reads are invalidated by the new data version"""
+        result = self.adapter.sync_from_sharepoint(force=force)
+        if result and self.adapter.last_sync_stats['status'] != 'unchanged':
+            self.cache.bump()
+        return result
+    
+    def _cached(self, name: str, loader, **kwargs):
+        """Serve a read through the cache, keyed by method name and arguments"""
+        key = (name,) + tuple(sorted(
+            (k, tuple(v) if isinstance(v, list) else v) for k, v in kwargs.items()
+        ))
+        return self.cache.get_or_load(key, lambda: loader(**kwargs))
+    
+    def get_cache_stats(self) -> Dict:
+        """Get read cache hit/miss counters and memory use"""
+        return self.cache.stats()
+    
+    def get_data_version(self) -> int:
+        """Get the database-wide data version (changes after every write, in any process)"""
+        value = self.get_setting('data_version')
+        return int(value) if value else 0
+    
+    def startup_report(self) -> str:
+        """How long each database initialization phase took"""
+        return self.adapter.startup_report()
+    
+    def get_duplicate_entries(self) -> List[Dict]:
+        """Duplicate (date, application_name) pairs blocking the unique index, found at startup"""
+        return self.adapter.duplicate_entries
+    
+    def get_entry_updated_at(self, entry_id: int) -> Optional[str]:
+        """Get an entry's last update timestamp"""
+        return self.adapter.get_entry_updated_at(entry_id)
     
     def get_all_entries(self) -> List[Dict]:
         """Get all production entries from all applications"""
-        return self.adapter.get_all_entries()
+        return self._cached('get_all_entries', self.adapter.get_all_entries)
+    
+    def get_entries_filtered(self, start_date: str = None, end_date: str = None, application: str = None,
+                             quality_status: str = None, prb_only: bool = False, hiim_only: bool = False,
+                             limit: int = None, after: tuple = None) -> List[Dict]:
+        """Get production entries matching the dashboard filters"""
+        return self._cached(
+            'get_entries_filtered', self.adapter.get_entries_filtered,
+            start_date=start_date, end_date=end_date, application=application,
+            quality_status=quality_status, prb_only=prb_only, hiim_only=hiim_only,
+            limit=limit, after=after
+        )
+    
+    def iter_entries_filtered(self, start_date: str = None, end_date: str = None, application: str = None,
+                              quality_status: str = None, prb_only: bool = False, hiim_only: bool = False):
+        """Stream production entries matching the dashboard filters in chunks (not cached)"""
+        return self.adapter.iter_entries_filtered(
+            start_date=start_date, end_date=end_date, application=application,
+            quality_status=quality_status, prb_only=prb_only, hiim_only=hiim_only
+        )
+    
+    def get_monthly_stats(self, start_date: str = None, end_date: str = None, application: str = None,
+                          quality_status: str = None, prb_only: bool = False, hiim_only: bool = False,
+                          years: List[str] = None, months: List[str] = None,
+                          application_name: str = None) -> List[Dict]:
+        """Get per (month, application) status counts for the charts"""
+        return self._cached(
+            'get_monthly_stats', self.adapter.get_monthly_stats,
+            start_date=start_date, end_date=end_date, application=application,
+            quality_status=quality_status, prb_only=prb_only, hiim_only=hiim_only,
+            years=years, months=months, application_name=application_name
+        )
+    
+    def get_xva_root_causes(self, start_date: str = None, end_date: str = None,
+                            years: List[str] = None, months: List[str] = None) -> List[Dict]:
+        """Get XVA red card counts per root cause application and type"""
+        return self._cached(
+            'get_xva_root_causes', self.adapter.get_xva_root_causes,
+            start_date=start_date, end_date=end_date, years=years, months=months
+        )
+    
+    def rebuild_rollups(self) -> int:
+        """Recompute the monthly rollups from all entries"""
+        try:
+            return self.adapter.rebuild_rollups()
+        finally:
+            self.cache.bump()
+    
+    def check_rollups(self) -> List[Dict]:
+        """List counters where the monthly rollups disagree with the entries"""
+        return self.adapter.check_rollups()
+    
+    def find_entry_id(self, date: str, application_name: str, exclude_id: int = None) -> Optional[int]:
+        """Return the id of the entry for a date and application, if any"""
+        return self.adapter.find_entry_id(date, application_name, exclude_id)
     
     def create_entry(self, entry_data: Dict) -> Optional[Dict]:
         """Create a new production entry"""
-        return self.adapter.create_entry(entry_data)
+        try:
+            return self.adapter.create_entry(entry_data)
+        finally:
+            self.cache.bump()
+    
+    def create_entries(self, entries_data: List[Dict]) -> Optional[List[Dict]]:
+        """Create many production entries in one transaction, with a result per entry"""
+        try:
+            return self.adapter.create_entries(entries_data)
+        finally:
+            self.cache.bump()
     
     def get_entry_by_id(self, entry_id: int) -> Optional[Dict]:
         """Get a specific entry by ID"""
-        return self.adapter.get_entry_by_id(entry_id)
+        return self._cached('get_entry_by_id', self.adapter.get_entry_by_id, entry_id=entry_id)
     
     def update_entry(self, entry_id: int, update_data: Dict) -> Optional[Dict]:
         """Update an existing entry"""
-        return self.adapter.update_entry(entry_id, update_data)
+        try:
+            return self.adapter.update_entry(entry_id, update_data)
+        finally:
+            self.cache.bump()
     
     def delete_entry(self, entry_id: int) -> bool:
         """Delete an entry"""
-        return self.adapter.delete_entry(entry_id)
+        try:
+            return self.adapter.delete_entry(entry_id)
+        finally:
+            self.cache.bump()
     
     def get_setting(self, key: str) -> Optional[str]:
-        """Get a setting value"""
-        return self.adapter.get_setting(key)
+        """Get a setting value, from memory unless the database changed since it was read"""
+        version = self.cache.current_version()
+        with self._settings_lock:
+            if self._settings_version != version:
+                self._settings = {}
+                self._settings_version = version
+            elif key in self._settings:
+                return self._settings[key]
+        
+        value = self.adapter.get_setting(key)
+        with self._settings_lock:
+            # Skip storing if a write landed while reading
+            if value is not None and self._settings_version == version and self.cache.version == version:
+                self._settings[key] = value
+        return value
     
     def set_setting(self, key: str, value: str) -> bool:
         """Set a setting value"""
-        return self.adapter.set_setting(key, value)
+        try:
+            return self.adapter.set_setting(key, value)
+        finally:
+            with self._settings_lock:
+                self._settings.pop(key, None)
     
     def _ensure_datasets_exist(self) -> bool:
         """Ensure all database tables exist - they are created automatically"""
@@ -0,0 +1,441 @@
+"""
+SharePoint Sync
+Delta sync of prodvision.db with a remote store. A consistent snapshot is
+taken with the SQLite online backup API and split into fixed-size chunks
+named by their SHA-256; chunks are stored compressed and only those the
+remote does not have yet are transferred. The manifest listing a snapshot's
+chunks is written last, so an interrupted sync never leaves a partial
+database behind, and a rerun resumes where it stopped.
+
+The remote is a SyncTransport: LocalDirectoryTransport (a mounted SharePoint
+library, a network share, or a plain directory for tests) or HTTPTransport
+(GET/PUT/HEAD against a base URL).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+# requests is only needed for HTTPTransport
+try:
+    import requests
+except ImportError:
+    requests = None
+
+MANIFEST_NAME = 'manifest.json'
+CHUNK_PREFIX = 'chunks/'
+MANIFEST_FORMAT = 1
+
+# SQLite changes pages in place, so fixed chunks that are a multiple of the page
+# size keep unchanged pages in unchanged chunks
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+
+class SyncError(Exception):
+    """Raised when a sync cannot be completed"""
+
+
+class SyncConflictError(SyncError):
+    """Raised when both sides changed since the last sync (use force to overwrite)"""
+
+
+class SyncTransport(ABC):
+    """Remote object store used by SyncEngine: named blobs, written atomically.
+
+    list() and delete() are only needed by SyncEngine.prune(); transports
+    that provide them set supports_listing.
+    """
+
+    supports_listing = False
+
+    @abstractmethod
+    def get(self, name: str) -> Optional[bytes]:
+        """Blob contents, or None if it does not exist"""
+
+    @abstractmethod
+    def put(self, name: str, data: bytes):
+        """Write a blob; readers must never see a partially written one"""
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        """Whether a blob exists"""
+
+    def list(self, prefix: str) -> List[str]:
+        """Names starting with prefix (optional; needed for prune)"""
+        raise NotImplementedError(f'{type(self).__name__} cannot list blobs')
+
+    def delete(self, name: str):
+        """Remove a blob (optional; needed for prune)"""
+        raise NotImplementedError(f'{type(self).__name__} cannot delete blobs')
+
+
+class LocalDirectoryTransport(SyncTransport):
+    """Blobs as files under a directory (a synced SharePoint library, a share, or a test folder)"""
+
+    supports_listing = True
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, *name.split('/'))
+
+    def get(self, name: str) -> Optional[bytes]:
+        try:
+            with open(self._path(name), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, name: str, data: bytes):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self._path(name))
+
+    def list(self, prefix: str) -> List[str]:
+        directory = os.path.dirname(self._path(prefix + 'x'))
+        if not os.path.isdir(directory):
+            return []
+        base = prefix.rsplit('/', 1)[0] + '/' if '/' in prefix else ''
+        return [base + name for name in os.listdir(directory)
+                if (base + name).startswith(prefix) and not name.startswith('.upload-')]
+
+    def delete(self, name: str):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+
+class HTTPTransport(SyncTransport):
+    """Blobs at base_url/<name> via GET, PUT and HEAD (e.g. a WebDAV folder or a local test server).
+
+    Plain HTTP has no way to list a folder, so this transport cannot prune.
+    """
+
+    def __init__(self, base_url: str, auth=None, headers: Dict = None, timeout: float = 60):
+        if requests is None:
+            raise SyncError('HTTPTransport needs the requests package')
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.auth = auth
+        self.session.headers.update(headers or {})
+
+    def _url(self, name: str) -> str:
+        return f'{self.base_url}/{name}'
+
+    def get(self, name: str) -> Optional[bytes]:
+        response = self.session.get(self._url(name), timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.content
+
+    def put(self, name: str, data: bytes):
+        response = self.session.put(self._url(name), data=data, timeout=self.timeout)
+        response.raise_for_status()
+
+    def exists(self, name: str) -> bool:
+        response = self.session.head(self._url(name), timeout=self.timeout)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class SyncEngine:
+    """Pushes and pulls chunked snapshots of one SQLite database.
+
+    Local bookkeeping lives in state_dir:
+      sync_state.json   id of the remote manifest and local data version at the last sync
+      sync_push.journal chunks uploaded by an unfinished push (resume without re-checking)
+      sync_cache/       compressed chunks downloaded by an unfinished pull
+    """
+
+    def __init__(self, db_path: str, transport: SyncTransport, state_dir: str = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, compression_level: int = 6):
+        self.db_path = db_path
+        self.transport = transport
+        self.state_dir = state_dir or os.path.dirname(os.path.abspath(db_path))
+        self.chunk_size = chunk_size
+        self.compression_level = compression_level
+        self.state_path = os.path.join(self.state_dir, 'sync_state.json')
+        self.journal_path = os.path.join(self.state_dir, 'sync_push.journal')
+        self.cache_dir = os.path.join(self.state_dir, 'sync_cache')
+
+    # Local state
+
+    def load_state(self) -> Dict:
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self, state: Dict):
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def _read_journal(self) -> Set[str]:
+        try:
+            with open(self.journal_path) as f:
+                return {line.strip() for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+
+    # Snapshots
+
+    def snapshot(self, source_conn) -> str:
+        """Copy the database through the online backup API into a temp file; returns its path"""
+        fd, snapshot_path = tempfile.mkstemp(dir=self.state_dir, prefix='.snapshot-', suffix='.db')
+        os.close(fd)
+        target = sqlite3.connect(snapshot_path)
+        try:
+            source_conn.backup(target)
+            # A rollback-journal file is self-contained; no -wal to carry around
+            target.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            target.close()
+        return snapshot_path
+
+    def iter_chunks(self, path: str) -> Iterable[bytes]:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def remote_manifest(self):
+        """(manifest dict, manifest id) of the remote, or (None, None) if it has none"""
+        data = self.transport.get(MANIFEST_NAME)
+        if data is None:
+            return None, None
+        manifest = json.loads(data.decode('utf-8'))
+        if manifest.get('format') != MANIFEST_FORMAT:
+            raise SyncError(f"Unsupported remote manifest format {manifest.get('format')}")
+        return manifest, _sha256(data)
+
+    # Push
+
+    def push(self, source_conn, data_version: int, force: bool = False) -> Dict:
+        """Upload a snapshot, sending only chunks the remote lacks; returns transfer stats.
+
+        Raises SyncConflictError if the remote changed since our last sync
+        (someone else pushed) unless force is set.
+        """
+        started = time.perf_counter()
+        state = self.load_state()
+        remote_manifest, remote_id = self.remote_manifest()
+        if remote_id != state.get('manifest_id') and remote_id is not None and not force:
+            raise SyncConflictError('The remote copy changed since the last sync; pull first or force the push')
+        if remote_id is not None and remote_id == state.get('manifest_id') and data_version == state.get('data_version'):
+            return {'direction': 'push', 'status': 'unchanged', 'chunks_total': len(remote_manifest['chunks']),
+                    'chunks_transferred': 0, 'bytes_transferred': 0, 'seconds': round(time.perf_counter() - started, 3)}
+
+        # Chunks known to be on the remote: the current manifest's, plus those an interrupted push got out
+        known = set(remote_manifest['chunks']) if remote_manifest else set()
+        known |= self._read_journal()
+
+        snapshot_path = self.snapshot(source_conn)
+        try:
+            hashes = []
+            whole = hashlib.sha256()
+            size = transferred = uploaded = 0
+            with open(self.journal_path, 'a') as journal:
+                for chunk in self.iter_chunks(snapshot_path):
+                    digest = _sha256(chunk)
+                    whole.update(chunk)
+                    size += len(chunk)
+                    hashes.append(digest)
+                    if digest in known:
+                        continue
+                    name = CHUNK_PREFIX + digest
+                    if not self.transport.exists(name):
+                        data = zlib.compress(chunk, self.compression_level)
+                        self.transport.put(name, data)
+                        transferred += len(data)
+                        uploaded += 1
+                    known.add(digest)
+                    journal.write(digest + '\n')
+                    journal.flush()
+        finally:
+            os.remove(snapshot_path)
+
+        manifest = {
+            'format': MANIFEST_FORMAT,
+            'created_at': datetime.utcnow().isoformat(),
+            'chunk_size': self.chunk_size,
+            'size': size,
+            'sha256': whole.hexdigest(),
+            'data_version': data_version,
+            'chunks': hashes
+        }
+        manifest_data = json.dumps(manifest, indent=1).encode('utf-8')
+        self.transport.put(MANIFEST_NAME, manifest_data)
+        transferred += len(manifest_data)
+
+        self._save_state({'manifest_id': _sha256(manifest_data), 'data_version': data_version,
+                          'synced_at': manifest['created_at']})
+        os.remove(self.journal_path)
+        return {'direction': 'push', 'status': 'uploaded', 'chunks_total': len(hashes),
+                'chunks_transferred': uploaded, 'bytes_total': size, 'bytes_transferred': transferred,
+                'seconds': round(time.perf_counter() - started, 3)}
+
+    # Pull
+
+    def pull(self, target_conn, data_version: int, local_is_empty: bool, force: bool = False,
+             on_restored=None) -> Dict:
+        """Download the remote snapshot into the live database, fetching only chunks not held locally.
+
+        The new contents are assembled in a temp file, verified, and then
+        copied into target_conn's database with the backup API, so other
+        connections simply see a new committed version. on_restored(conn,
+        remote_data_version), if given, runs right after the restore and
+        returns the local data version to record instead of the remote one.
+        Raises SyncConflictError if the local database changed since the last
+        sync unless force is set (a database without entries is never a
+        conflict).
+        """
+        started = time.perf_counter()
+        state = self.load_state()
+        remote_manifest, remote_id = self.remote_manifest()
+        if remote_manifest is None:
+            raise SyncError('The remote has no database yet; push first')
+        if remote_id == state.get('manifest_id'):
+            return {'direction': 'pull', 'status': 'unchanged', 'chunks_total': len(remote_manifest['chunks']),
+                    'chunks_transferred': 0, 'bytes_transferred': 0, 'seconds': round(time.perf_counter() - started, 3)}
+        local_changed = data_version != state.get('data_version') if state else not local_is_empty
+        if local_changed and not force:
+            raise SyncConflictError('The local database changed since the last sync; push first or force the pull')
+
+        chunk_size = remote_manifest['chunk_size']
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Chunks the local database already has are copied instead of downloaded
+        local_chunks = {}
+        snapshot_path = self.snapshot(target_conn)
+        try:
+            with open(snapshot_path, 'rb') as f:
+                offset = 0
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    local_chunks.setdefault(_sha256(chunk), offset)
+                    offset += len(chunk)
+
+            fd, assembled_path = tempfile.mkstemp(dir=self.state_dir, prefix='.pull-', suffix='.db')
+            transferred = downloaded = 0
+            whole = hashlib.sha256()
+            try:
+                with os.fdopen(fd, 'wb') as out, open(snapshot_path, 'rb') as local:
+                    for digest in remote_manifest['chunks']:
+                        if digest in local_chunks:
+                            local.seek(local_chunks[digest])
+                            chunk = local.read(chunk_size)
+                        else:
+                            chunk, fetched = self._fetch_chunk(digest)
+                            if fetched:
+                                transferred += fetched
+                                downloaded += 1
+                        whole.update(chunk)
+                        out.write(chunk)
+                if whole.hexdigest() != remote_manifest['sha256']:
+                    raise SyncError('Downloaded database does not match the remote manifest')
+
+                source = sqlite3.connect(assembled_path)
+                try:
+                    source.backup(target_conn)
+                finally:
+                    source.close()
+            finally:
+                os.remove(assembled_path)
+        finally:
+            os.remove(snapshot_path)
+
+        synced_version = remote_manifest['data_version']
+        if on_restored is not None:
+            synced_version = on_restored(target_conn, synced_version)
+
+        # Downloaded chunks are only kept until the pull has completed
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
+        self._save_state({'manifest_id': remote_id, 'data_version': synced_version,
+                          'synced_at': datetime.utcnow().isoformat()})
+        return {'direction': 'pull', 'status': 'downloaded', 'chunks_total': len(remote_manifest['chunks']),
+                'chunks_transferred': downloaded, 'bytes_total': remote_manifest['size'],
+                'bytes_transferred': transferred, 'seconds': round(time.perf_counter() - started, 3)}
+
+    def _fetch_chunk(self, digest: str):
+        """(chunk bytes, bytes downloaded); chunks fetched by an interrupted pull come from the cache"""
+        cache_path = os.path.join(self.cache_dir, digest)
+        fetched = 0
+        try:
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = self.transport.get(CHUNK_PREFIX + digest)
+            if data is None:
+                raise SyncError(f'Remote chunk {digest} is missing')
+            fetched = len(data)
+        chunk = zlib.decompress(data)
+        if _sha256(chunk) != digest:
+            if not fetched:
+                os.remove(cache_path)
+                return self._fetch_chunk(digest)
+            raise SyncError(f'Remote chunk {digest} is corrupt')
+        if fetched:
+            temp_path = cache_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, cache_path)
+        return chunk, fetched
+
+    # Remote housekeeping
+
+    def prune(self) -> int:
+        """Delete remote chunks the current manifest no longer uses; returns how many.
+
+        Raises SyncError if the transport cannot list the remote's chunks.
+        """
+        if not self.transport.supports_listing:
+            raise SyncError(f'{type(self.transport).__name__} cannot list remote chunks, so it cannot prune; '
+                            'prune through a directory transport (--remote-dir) instead')
+        remote_manifest, _ = self.remote_manifest()
+        if remote_manifest is None:
+            return 0
+        in_use = {CHUNK_PREFIX + digest for digest in remote_manifest['chunks']}
+        # Chunks an unfinished push has already uploaded are kept for its resume
+        in_use |= {CHUNK_PREFIX + digest for digest in self._read_journal()}
+        stale = [name for name in self.transport.list(CHUNK_PREFIX) if name not in in_use]
+        for name in stale:
+            self.transport.delete(name)
+        return len(stale)
@@ -0,0 +1,196 @@
+"""
+SQL Tracing
+Opt-in instrumentation for the adapter's SQLite connections: per-request
+statement counts and SQL time, and a slow-query log with EXPLAIN QUERY PLAN
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Dict, Optional
+
+# Statements worth explaining; BEGIN/COMMIT/PRAGMA/DDL have no useful plan
+EXPLAINABLE_PREFIXES = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+# Long placeholder lists (chunked IN (...) queries) are shortened in the log
+_PLACEHOLDER_RUN = re.compile(r'\?(?:, \?){4,}')
+
+
+def _compact_sql(sql: str) -> str:
+    sql = ' '.join(sql.split())
+    return _PLACEHOLDER_RUN.sub(lambda m: f'?, ... ({m.group(0).count("?")} placeholders)', sql)
+
+
+class TracingCursor(sqlite3.Cursor):
+    """Cursor that times execution and fetching of each statement.
+
+    A SELECT does most of its work while rows are fetched, so the time of a
+    statement is everything spent in execute() and the fetch calls until the
+    result is exhausted, the cursor is reused or closed, or its connection is
+    returned to the pool. Statements without a result (INSERT, UPDATE, DDL)
+    are finished as soon as execute() returns.
+    """
+
+    _sql = None
+    _params = None
+    _elapsed = 0.0
+
+    def _timed(self, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._elapsed += elapsed
+            self.connection.tracer.add_time(elapsed)
+
+    def _begin(self, sql, params):
+        self._finish()
+        self._sql, self._params, self._elapsed = sql, params, 0.0
+        self.connection.tracer.cursor_started(self.connection, self)
+
+    def _finish(self):
+        if self._sql is not None:
+            sql, params, elapsed = self._sql, self._params, self._elapsed
+            self._sql = self._params = None
+            self.connection.tracer.statement_finished(self.connection, sql, params, elapsed)
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        result = self._timed(super().execute, sql, parameters)
+        if self.description is None:
+            # No rows to fetch: the statement has already done all its work
+            self._finish()
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters)
+        self._begin(sql, seq_of_parameters[0] if seq_of_parameters else None)
+        result = self._timed(super().executemany, sql, seq_of_parameters)
+        self._finish()
+        return result
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class SQLTracer:
+    """Collects SQL statement counts and time for the request running on each thread.
+
+    instrument() is applied to every connection the pool opens; begin() and
+    end() bracket a request. Statements run outside begin()/end() are not
+    counted, but slow ones are still logged.
+    """
+
+    def __init__(self, slow_query_ms: float = 100.0, explain: bool = True):
+        self.slow_query_ms = slow_query_ms
+        self.explain = explain
+        self._local = threading.local()
+
+    def instrument(self, conn):
+        """Attach this tracer to a connection"""
+        conn.tracer = self
+        conn.traced_cursors = weakref.WeakSet()
+        # sqlite3 cannot report the installed callback; keep it so others can chain to it and restore it
+        conn.trace_callback = self._on_statement
+        conn.set_trace_callback(self._on_statement)
+
+    def cursor_started(self, conn, cursor):
+        conn.traced_cursors.add(cursor)
+
+    def finish_cursors(self, conn):
+        """Finish statements whose rows were not read to the end (the connection is being released)"""
+        for cursor in list(conn.traced_cursors):
+            cursor._finish()
+        conn.traced_cursors.clear()
+
+    def timed(self, conn, label: str, func):
+        """Run a connection-level call such as commit() and account for it like a statement"""
+        started = time.perf_counter()
+        try:
+            return func()
+        finally:
+            elapsed = time.perf_counter() - started
+            self.add_time(elapsed)
+            self.statement_finished(conn, label, None, elapsed)
+
+    def _on_statement(self, statement):
+        # Called by SQLite for every statement run, including BEGIN/COMMIT and each executemany row
+        stats = getattr(self._local, 'stats', None)
+        if stats is not None:
+            stats['statements'] += 1
+
+    def begin(self):
+        """Start collecting for the current request"""
+        self._local.stats = {'statements': 0, 'seconds': 0.0, 'slow_statements': 0}
+
+    def end(self) -> Optional[Dict]:
+        """Stop collecting and return {'statements', 'seconds', 'slow_statements'} for the request"""
+        stats = getattr(self._local, 'stats', None)
+        self._local.stats = None
+        return stats
+
+    def add_time(self, seconds: float):
+        stats = getattr(self._local, 'stats', None)
+        if stats is not None:
+            stats['seconds'] += seconds
+
+    def statement_finished(self, conn, sql: str, params, seconds: float):
+        """Log the statement if it exceeded the slow-query threshold"""
+        elapsed_ms = seconds * 1000
+        if elapsed_ms < self.slow_query_ms:
+            return
+        stats = getattr(self._local, 'stats', None)
+        if stats is not None:
+            stats['slow_statements'] += 1
+
+        print(f"Slow query ({elapsed_ms:.1f} ms): {_compact_sql(sql)}")
+        if self.explain and sql.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+            for line in self.explain_query_plan(conn, sql, params):
+                print(f"    {line}")
+
+    def explain_query_plan(self, conn, sql: str, params) -> list:
+        """EXPLAIN QUERY PLAN output for a statement, one indented line per plan step"""
+        try:
+            cursor = conn.cursor(sqlite3.Cursor)  # plain cursor, so explaining is not timed or logged
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params if params is not None else ())
+            rows = cursor.fetchall()
+            cursor.close()
+        except sqlite3.Error as e:
+            return [f"(no plan: {e})"]
+
+        depth = {0: -1}
+        lines = []
+        for node_id, parent_id, _, detail in rows:
+            depth[node_id] = depth.get(parent_id, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return lines
@@ -3,6 +3,10 @@ let isAuthenticated = false;
 let currentEntryId = null;
 let charts = {};
 
+// Entries are fetched in pages so the first rows render before the full history arrives
+const ENTRIES_PAGE_SIZE = 500;
+let entriesLoadToken = 0;
+
 // Register Chart.js plugins
 Chart.register(ChartDataLabels);
 
@@ -1171,23 +1175,52 @@ async function handleLogout() {
 
 // Data loading functions
 async function loadData() {
+    const loadToken = ++entriesLoadToken;
     try {
         showLoading();
         
-        // Load entries only
-        const entriesResponse = await fetch('/api/entries?' + buildQueryString());
-        const entries = await entriesResponse.json();
+        // Load entries page by page using the cursor returned by the server.
+        // Every page is fetched: the PRB/HIIM counts and weekly groups cover the whole filtered set
+        const queryString = buildQueryString();
+        let entries = [];
+        let cursor = null;
+        let pageCount = 0;
+        
+        do {
+            const params = new URLSearchParams(queryString);
+            params.append('limit', ENTRIES_PAGE_SIZE);
+            if (cursor) params.append('cursor', cursor);
+            
+            const entriesResponse = await fetch('/api/entries?' + params.toString());
+            const page = await entriesResponse.json();
+            if (!entriesResponse.ok) {
+                throw new Error('Failed to load data');
+            }
+            
+            // A newer loadData call (e.g. filters changed) supersedes this one
+            if (loadToken !== entriesLoadToken) return;
+            
+            entries = entries.concat(page.entries);
+            cursor = page.next_cursor;
+            pageCount++;
+            
+            // Paint the first page immediately; the rest is rendered once complete
+            if (pageCount === 1) {
+                displayEntries(entries);
+                hideLoading();
+            }
+        } while (cursor);
         
-        if (entriesResponse.ok) {
+        if (pageCount > 1) {
             displayEntries(entries);
-        } else {
-            throw new Error('Failed to load data');
         }
     } catch (error) {
         console.error('Error loading data:', error);
         alert('Failed to load data. Please try again.');
     } finally {
-        hideLoading();
+        if (loadToken === entriesLoadToken) {
+            hideLoading();
+        }
     }
 }
 
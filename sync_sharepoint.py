@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+SharePoint Sync Script for ProdVision
+Pushes the local database to SharePoint or pulls the SharePoint copy, moving
+only the chunks that changed. An interrupted push or pull resumes when rerun.
+
+Usage:
+    python3 sync_sharepoint.py status
+    python3 sync_sharepoint.py push [--force]
+    python3 sync_sharepoint.py pull [--force]
+    python3 sync_sharepoint.py prune
+    python3 sync_sharepoint.py push --remote-dir /mnt/sharepoint/ProdVision
+"""
+
+import sys
+import argparse
+from sharepoint_sqlite_adapter import ProductionEntryManagerWorking
+from sharepoint_sync import LocalDirectoryTransport, HTTPTransport, SyncError
+from config import SHAREPOINT_URL, SYNC_REMOTE_DIR, SYNC_CHUNK_SIZE
+
+def print_stats(stats):
+    if stats['status'] == 'unchanged':
+        print("✅ Already in sync, nothing transferred")
+        return
+    print(f"✅ {stats['direction'].capitalize()} complete: {stats['chunks_transferred']} of {stats['chunks_total']} chunks "
+          f"({stats['bytes_transferred'] / 1024:.1f} KiB transferred for a {stats['bytes_total'] / 1024 / 1024:.1f} MiB "
+          f"database) in {stats['seconds']:.2f}s")
+
+def show_status(entry_manager):
+    engine = entry_manager.adapter.sync_engine()
+    state = engine.load_state()
+    if not state:
+        print("This database has not been synced yet")
+    else:
+        print(f"Last sync: {state['synced_at']} (data version {state['data_version']})")
+        local_version = entry_manager.get_data_version()
+        if local_version != state['data_version']:
+            print(f"   Local changes since then (data version {local_version}); run 'push' to upload them")
+    manifest, manifest_id = engine.remote_manifest()
+    if manifest is None:
+        print("Remote: empty")
+    elif manifest_id != state.get('manifest_id'):
+        print(f"Remote: changed since the last sync (pushed {manifest['created_at']}); run 'pull' to download it")
+    else:
+        print("Remote: unchanged since the last sync")
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Delta sync of the ProdVision database with SharePoint')
+    parser.add_argument('command', choices=['status', 'push', 'pull', 'prune'],
+                        help='show sync state, upload, download, or delete unused remote chunks')
+    parser.add_argument('--force', action='store_true', help='overwrite even if the other side changed too')
+    parser.add_argument('--remote-dir', default=SYNC_REMOTE_DIR,
+                        help='sync with this directory instead of SHAREPOINT_URL over HTTP')
+    args = parser.parse_args(argv)
+
+    transport = LocalDirectoryTransport(args.remote_dir) if args.remote_dir else HTTPTransport(SHAREPOINT_URL)
+    entry_manager = ProductionEntryManagerWorking(SHAREPOINT_URL, sync_transport=transport,
+                                                  sync_chunk_size=SYNC_CHUNK_SIZE)
+    try:
+        if args.command == 'status':
+            return show_status(entry_manager)
+        if args.command == 'prune':
+            try:
+                removed = entry_manager.adapter.sync_engine().prune()
+            except SyncError as e:
+                print(f"❌ Prune failed: {e}")
+                return False
+            print(f"✅ Removed {removed} unused remote chunks")
+            return True
+
+        if args.command == 'push':
+            result = entry_manager.sync_to_sharepoint(force=args.force)
+        else:
+            result = entry_manager.sync_from_sharepoint(force=args.force)
+        if result:
+            print_stats(entry_manager.adapter.last_sync_stats)
+        return result
+    finally:
+        entry_manager.close()
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
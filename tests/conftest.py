@@ -0,0 +1,59 @@
+"""
+Shared fixtures: every test gets its own data directory, so databases,
+session stores and sync state never leak between tests.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the repository root to Python path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sharepoint_sqlite_adapter import ProductionEntryManagerWorking
+
+
+def make_entry(date, application_name='CVAR ALL', **fields):
+    """Minimal entry payload for create_entry/create_entries"""
+    entry = {'date': date, 'day': '', 'application_name': application_name,
+             'quality_status': 'Green', 'issues': [], 'prbs': [], 'hiims': []}
+    entry.update(fields)
+    return entry
+
+
+@pytest.fixture
+def manager(tmp_path):
+    entry_manager = ProductionEntryManagerWorking(data_dir=str(tmp_path / 'data'))
+    yield entry_manager
+    entry_manager.close()
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """The Flask app module, imported fresh with ./data and sessions under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    sys.modules.pop('app', None)
+    import app as module
+    yield module
+    sys.modules.pop('app', None)
+    module.entry_manager.close()
+    if module.session_store is not None:
+        module.session_store.close()
+    module.password_verifier.shutdown()
+    module.login_throttle.close()
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def logged_in(client, app_module):
+    """Test client holding an admin session (default password)"""
+    with app_module.app.app_context():
+        app_module.initialize_database()
+    response = client.post('/api/auth/login', json={'password': 'admin123'})
+    assert response.status_code == 200
+    return client
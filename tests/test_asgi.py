@@ -0,0 +1,109 @@
+"""ASGI mode: the long-poll notifier and the bridge into the Flask app"""
+
+import asyncio
+import json
+import sys
+import time
+
+import pytest
+
+
+class FakeVersions:
+    """Stands in for AsyncEntryManager.get_data_version"""
+
+    def __init__(self, version):
+        self.version = version
+
+    async def get_data_version(self):
+        return self.version
+
+
+@pytest.fixture
+def asgi(tmp_path, monkeypatch):
+    """asgi.py, imported fresh (with SQL tracing on) under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('config.SQL_TRACE_ENABLED', True)
+    sys.modules.pop('app', None)
+    sys.modules.pop('asgi', None)
+    import asgi as module
+    app_module = sys.modules['app']
+    yield module
+    sys.modules.pop('asgi', None)
+    sys.modules.pop('app', None)
+    module.db.shutdown()
+    module.app_pool.shutdown(wait=True)
+    app_module.close_resources()
+
+
+async def request(application, method, path, query=b'', body=b''):
+    """One ASGI HTTP request; returns (status, headers, body)"""
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+             'headers': [(b'content-type', b'application/json')] if body else [],
+             'client': ('127.0.0.1', 50000), 'server': ('testserver', 80)}
+    incoming = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    start = sent[0]
+    assert start['type'] == 'http.response.start'
+    return start['status'], dict(start['headers']), b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def test_new_waiter_does_not_swallow_a_change(asgi):
+    async def scenario():
+        versions = FakeVersions(1)
+        notifier = asgi.ChangeNotifier(versions, interval=0.05)
+        started = time.monotonic()
+        waiting = asyncio.ensure_future(notifier.wait_for_change(1, 5))
+        await asyncio.sleep(0.01)
+
+        versions.version = 2
+        # A poll arriving between the change and the next check sees it at once...
+        assert await notifier.wait_for_change(1, 5) == 2
+        # ...and the poll already waiting still wakes at that check
+        assert await asyncio.wait_for(waiting, 1) == 2
+        assert time.monotonic() - started < 1
+        notifier.stop()
+
+    asyncio.run(scenario())
+
+
+def test_waiter_times_out_without_a_change(asgi):
+    async def scenario():
+        notifier = asgi.ChangeNotifier(FakeVersions(7), interval=0.01)
+        assert await notifier.wait_for_change(7, 0.05) == 7
+        assert notifier.waiting == 0
+        notifier.stop()
+
+    asyncio.run(scenario())
+
+
+def test_bridge_serves_async_views_and_wsgi_routes(asgi):
+    async def scenario():
+        status, _, body = await request(asgi.application, 'POST', '/api/auth/login',
+                                        body=json.dumps({'password': 'admin123'}).encode())
+        assert status == 200, body
+
+        status, headers, body = await request(asgi.application, 'GET', '/api/entries')
+        assert status == 200
+        assert json.loads(body) == []
+        assert b'etag' in headers
+
+        status, _, body = await request(asgi.application, 'GET', '/api/changes', b'since=-1&timeout=0')
+        assert status == 200
+        assert json.loads(body)['changed'] is True
+
+        status, _, _ = await request(asgi.application, 'GET', '/api/no-such-route')
+        assert status == 404
+
+        # The async views' SQL trace was begun and ended on this (the loop) thread
+        assert asgi.sql_tracer.end() is None
+        await asgi.shutdown()
+
+    asyncio.run(scenario())
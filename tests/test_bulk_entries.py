@@ -0,0 +1,67 @@
+"""POST /api/entries/bulk"""
+
+from conftest import make_entry
+
+
+def xva(date):
+    return make_entry(date, 'XVA')
+
+
+def test_all_created_returns_201(logged_in, app_module):
+    response = logged_in.post('/api/entries/bulk', json=[xva('2024-01-01'), xva('2024-01-02')])
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['created'] == 2 and body['failed'] == 0
+    assert [result['status'] for result in body['results']] == ['created', 'created']
+    assert len(app_module.entry_manager.get_all_entries()) == 2
+
+
+def test_partial_success_returns_207_with_per_item_results(logged_in, app_module):
+    app_module.entry_manager.create_entry(xva('2024-01-01'))
+
+    response = logged_in.post('/api/entries/bulk', json={'entries': [
+        xva('2024-01-01'),                      # already stored
+        xva('2024-01-02'),
+        xva('2024-01-02'),                      # repeats the previous item
+        make_entry('2024-01-03', 'CVAR ALL'),   # CVAR needs PRC mail fields or child rows
+        xva('2024-13-01'),
+        'not an entry',
+    ]})
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == [
+        'duplicate', 'created', 'duplicate', 'invalid', 'invalid', 'invalid'
+    ]
+    assert [result['index'] for result in body['results']] == list(range(6))
+    assert body['created'] == 1 and body['failed'] == 5
+    assert len(app_module.entry_manager.get_all_entries()) == 2
+
+
+def test_nothing_created_returns_400(logged_in, app_module):
+    version = app_module.entry_manager.get_data_version()
+
+    response = logged_in.post('/api/entries/bulk', json=[xva('bad date')])
+
+    assert response.status_code == 400
+    assert response.get_json()['results'][0]['status'] == 'invalid'
+    assert app_module.entry_manager.get_data_version() == version
+
+
+def test_rejects_empty_and_oversized_batches(logged_in, app_module):
+    assert logged_in.post('/api/entries/bulk', json=[]).status_code == 400
+    assert logged_in.post('/api/entries/bulk', json={'entries': 'x'}).status_code == 400
+
+    too_many = [xva('2024-01-01')] * (app_module.BULK_ENTRIES_MAX_ITEMS + 1)
+    assert logged_in.post('/api/entries/bulk', json=too_many).status_code == 400
+
+
+def test_requires_login(client):
+    assert client.post('/api/entries/bulk', json=[xva('2024-01-01')]).status_code == 401
+
+
+def test_created_entries_update_rollups(logged_in, app_module):
+    logged_in.post('/api/entries/bulk', json=[xva(f'2024-02-{day:02d}') for day in range(1, 11)])
+
+    assert app_module.entry_manager.check_rollups() == []
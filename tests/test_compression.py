@@ -0,0 +1,80 @@
+"""Negotiated response compression"""
+
+import gzip
+import json
+
+import pytest
+
+from conftest import make_entry
+
+
+@pytest.fixture
+def entries(app_module):
+    app_module.entry_manager.create_entries([make_entry(f'2024-01-{day:02d}', remarks='r' * 100)
+                                             for day in range(1, 29)])
+
+
+def test_large_json_is_gzipped(client, entries):
+    plain = client.get('/api/entries')
+    response = client.get('/api/entries', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(response.data) < len(plain.data)
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get('/api/entries', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.get_json() == []
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_no_compression_without_accept_encoding(client, entries):
+    assert 'Content-Encoding' not in client.get('/api/entries').headers
+
+
+def test_refused_encoding_is_not_used(client, app_module, entries):
+    response = client.get('/api/entries', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert 'Content-Encoding' not in response.headers
+
+    if app_module.brotli is None:
+        response = client.get('/api/entries', headers={'Accept-Encoding': 'br'})
+        assert 'Content-Encoding' not in response.headers
+
+
+def test_streamed_response_is_compressed_incrementally(client, entries):
+    plain = client.get('/api/entries')
+    response = client.get('/api/entries?stream=true', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
+
+def test_brotli_preferred_when_available(client, entries):
+    brotli = pytest.importorskip('brotli')
+
+    response = client.get('/api/entries', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(response.data)) == client.get('/api/entries').get_json()
+
+
+@pytest.mark.parametrize('extra, status', [([], 201), (['not an entry'], 207)])
+def test_bulk_results_are_compressed(logged_in, extra, status):
+    batch = [make_entry(f'2024-02-{day:02d}', 'XVA', remarks='r' * 100) for day in range(1, 29)] + extra
+
+    response = logged_in.post('/api/entries/bulk', json=batch, headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == status
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.data))['created'] == 28
+
+
+def test_error_responses_are_not_compressed(client):
+    response = client.get('/api/entries/999999', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 404
+    assert 'Content-Encoding' not in response.headers
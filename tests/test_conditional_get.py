@@ -0,0 +1,84 @@
+"""ETag / 304 handling of the dashboard GET endpoints"""
+
+import pytest
+
+from conftest import make_entry
+
+
+@pytest.mark.parametrize('path', ['/api/entries', '/api/stats', '/api/xva/stats'])
+def test_unchanged_data_revalidates_with_304(client, app_module, path):
+    app_module.entry_manager.create_entry(make_entry('2024-02-01', 'XVA'))
+
+    first = client.get(path)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    etag = first.headers['ETag']
+
+    revalidated = client.get(path, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+
+
+@pytest.mark.parametrize('path', ['/api/entries', '/api/stats', '/api/xva/stats'])
+def test_write_changes_the_etag(client, app_module, path):
+    etag = client.get(path).headers['ETag']
+
+    app_module.entry_manager.create_entry(make_entry('2024-02-01', 'XVA'))
+
+    response = client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_etag_depends_on_normalized_query(client):
+    etag = client.get('/api/entries?application=cvar&quality_status=Red').headers['ETag']
+
+    assert client.get('/api/entries?quality_status=Red&application=cvar').headers['ETag'] == etag
+    assert client.get('/api/entries?application=xva&quality_status=Red').headers['ETag'] != etag
+
+
+def test_304_does_not_read_entries(client, app_module, monkeypatch):
+    etag = client.get('/api/entries').headers['ETag']
+
+    def fail(**kwargs):
+        raise AssertionError('entries were loaded for a 304')
+
+    monkeypatch.setattr(app_module.entry_manager, 'get_entries_filtered', fail)
+    assert client.get('/api/entries', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_single_entry_etag_follows_updated_at(client, app_module):
+    entry = app_module.entry_manager.create_entry(make_entry('2024-02-01'))
+    path = f"/api/entries/{entry['id']}"
+    etag = client.get(path).headers['ETag']
+
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+
+    # Another entry's write leaves this entry's version alone
+    app_module.entry_manager.create_entry(make_entry('2024-02-02'))
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+
+    app_module.entry_manager.update_entry(entry['id'], {'remarks': 'edited'})
+    response = client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_missing_entry_has_no_etag(client):
+    response = client.get('/api/entries/999')
+
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+
+
+def test_compressed_response_revalidates_with_weak_etag(client, app_module):
+    app_module.entry_manager.create_entries([make_entry(f'2024-01-{day:02d}') for day in range(1, 29)])
+
+    response = client.get('/api/entries', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'].startswith('W/')
+
+    revalidated = client.get('/api/entries', headers={'Accept-Encoding': 'gzip',
+                                                      'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
@@ -0,0 +1,102 @@
+"""SQLiteConnectionPool: connection reuse, overflow and shutdown"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from sharepoint_sqlite_adapter import SQLiteConnectionPool
+from conftest import make_entry
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / 'pool.db'), size=2)
+    yield pool
+    pool.close_all()
+
+
+def test_released_connection_is_reused(pool):
+    conn = pool.acquire()
+    conn.close()
+
+    assert pool.acquire() is conn
+
+
+def test_connections_use_wal(pool):
+    conn = pool.acquire()
+
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    conn.close()
+
+
+def test_release_rolls_back_an_open_transaction(pool):
+    conn = pool.acquire()
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.commit()
+    conn.execute('INSERT INTO t VALUES (1)')
+    conn.close()
+
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+    conn.close()
+
+
+def test_idle_connections_are_capped_at_size(pool):
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        conn.close()
+
+    assert len(pool._idle) == 2
+    # The connection over the cap was really closed
+    with pytest.raises(sqlite3.ProgrammingError):
+        conns[2].execute('SELECT 1')
+
+
+def test_double_close_does_not_pool_a_connection_twice(pool):
+    conn = pool.acquire()
+    conn.close()
+    conn.close()
+
+    assert pool._idle == [conn]
+
+
+def test_close_all_stops_pooling(pool):
+    conn = pool.acquire()
+    pool.close_all()
+    conn.close()
+
+    assert pool._idle == []
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute('SELECT 1')
+
+
+def test_threads_never_share_a_checked_out_connection(pool):
+    pool.acquire().close()
+    held, barrier = [], threading.Barrier(4)
+
+    def worker():
+        conn = pool.acquire()
+        held.append(conn)
+        barrier.wait()
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(conn) for conn in held}) == 4
+
+
+def test_manager_calls_return_their_connection(manager):
+    manager.create_entry(make_entry('2024-05-01'))
+    manager.get_entries_filtered()
+    manager.get_entry_by_id(1)
+    manager.find_entry_id('2024-05-01', 'CVAR ALL')
+
+    pool = manager.adapter.pool
+    assert not any(conn.checked_out for conn in pool._idle)
+    assert len(pool._idle) == 1
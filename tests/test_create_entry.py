@@ -0,0 +1,49 @@
+"""create_entry: single entry inserts and their failure handling"""
+
+import sqlite3
+
+from conftest import make_entry
+
+
+def test_create_entry_returns_entry_with_children(manager):
+    created = manager.create_entry(make_entry('2024-03-01', issues=[{'description': 'late feed', 'remarks': 'r'}]))
+
+    stored = manager.get_entry_by_id(created['id'])
+    assert stored['application_name'] == 'CVAR ALL'
+    assert [issue['description'] for issue in stored['issues']] == ['late feed']
+
+
+def test_create_entry_returns_none_when_no_connection(manager, monkeypatch):
+    def unavailable():
+        raise sqlite3.OperationalError('unable to open database file')
+
+    monkeypatch.setattr(manager.adapter, 'get_connection', unavailable)
+
+    assert manager.adapter.create_entry(make_entry('2024-03-01')) is None
+
+
+def test_create_entry_stores_children_in_order(manager):
+    created = manager.create_entry(make_entry(
+        '2024-03-02',
+        prbs=[{'prb_id_number': 101, 'prb_id_status': 'open'}, {'prb_id_number': None, 'prb_id_status': 'closed'}],
+        hiims=[{'hiim_id_number': '7', 'hiim_link': 'http://h/7'}],
+    ))
+
+    stored = manager.get_entry_by_id(created['id'])
+    assert [(prb['prb_id_number'], prb['position']) for prb in stored['prbs']] == [('101', 0), ('', 1)]
+    assert [hiim['hiim_link'] for hiim in stored['hiims']] == ['http://h/7']
+    assert stored['prb_id_number'] == '101'
+
+
+def test_get_entry_by_id_returns_connection_on_error(manager, monkeypatch):
+    created = manager.create_entry(make_entry('2024-03-03'))
+    pool = manager.adapter.pool
+    idle_before = len(pool._idle)
+
+    def broken(cursor, entries):
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(manager.adapter, '_attach_child_rows', broken)
+
+    assert manager.adapter.get_entry_by_id(created['id']) is None
+    assert len(pool._idle) == idle_before
@@ -0,0 +1,63 @@
+"""Duplicate (date, application_name) checks go through the unique index"""
+
+import sqlite3
+
+import pytest
+
+from conftest import make_entry
+
+
+def query_plan(manager, sql, params):
+    conn = manager.adapter.get_connection()
+    try:
+        return ' '.join(row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall())
+    finally:
+        conn.close()
+
+
+def test_find_entry_id_uses_the_unique_index(manager):
+    created = manager.create_entry(make_entry('2024-04-01', 'XVA'))
+
+    assert manager.find_entry_id('2024-04-01', 'XVA') == created['id']
+    assert manager.find_entry_id('2024-04-01', 'XVA', exclude_id=created['id']) is None
+    assert manager.find_entry_id('2024-04-02', 'XVA') is None
+    plan = query_plan(manager, 'SELECT id FROM entries WHERE date = ? AND application_name = ? LIMIT 1',
+                      ('2024-04-01', 'XVA'))
+    assert 'idx_entries_date_application' in plan
+
+
+def test_unique_index_rejects_duplicates_written_directly(manager):
+    manager.create_entry(make_entry('2024-04-01', 'XVA'))
+
+    conn = manager.adapter.get_connection()
+    try:
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO entries (date, application_name) VALUES ('2024-04-01', 'XVA')")
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def test_api_rejects_a_duplicate_entry(logged_in):
+    payload = make_entry('2024-04-01', 'XVA')
+    assert logged_in.post('/api/entries', json=payload).status_code == 201
+
+    response = logged_in.post('/api/entries', json=payload)
+
+    assert response.status_code == 400
+    assert 'already exists' in response.get_json()['error']
+
+
+def test_admin_duplicates_lists_pairs_blocking_the_unique_index(logged_in, app_module):
+    assert logged_in.get('/api/admin/duplicates').get_json() == {'unique_index': True, 'duplicates': []}
+
+    app_module.entry_manager.adapter.duplicate_entries = [
+        {'date': '2024-01-01', 'application_name': 'XVA', 'count': 2, 'ids': [1, 2]}]
+
+    body = logged_in.get('/api/admin/duplicates').get_json()
+    assert body['unique_index'] is False
+    assert body['duplicates'][0]['ids'] == [1, 2]
+
+
+def test_admin_duplicates_requires_login(client):
+    assert client.get('/api/admin/duplicates').status_code == 401
@@ -0,0 +1,77 @@
+"""get_entries_filtered: the /api/entries filters run as SQL"""
+
+from conftest import make_entry
+
+
+def seed(manager):
+    manager.create_entries([
+        make_entry('2024-01-05', 'CVAR ALL', quality_status='Green'),
+        make_entry('2024-01-10', 'CVAR ALL', quality_status='Red', prbs=[{'prb_id_number': 11, 'prb_id_status': 'open'}]),
+        make_entry('2024-02-01', 'XVA Batch', quality_status='Amber', hiims=[{'hiim_id_number': 7}]),
+        make_entry('2024-02-15', 'xva batch eod', quality_status='Red', prb_id_number='42'),
+        make_entry('2024-03-01', 'Other', quality_status='Green', hiim_id_number='99'),
+    ])
+
+
+def names(entries):
+    return [(entry['date'], entry['application_name']) for entry in entries]
+
+
+def test_no_filters_returns_everything_newest_first(manager):
+    seed(manager)
+
+    entries = manager.get_entries_filtered()
+
+    assert [entry['date'] for entry in entries] == ['2024-03-01', '2024-02-15', '2024-02-01', '2024-01-10', '2024-01-05']
+
+
+def test_date_range_is_inclusive(manager):
+    seed(manager)
+
+    entries = manager.get_entries_filtered(start_date='2024-01-10', end_date='2024-02-15')
+
+    assert names(entries) == [('2024-02-15', 'xva batch eod'), ('2024-02-01', 'XVA Batch'), ('2024-01-10', 'CVAR ALL')]
+
+
+def test_application_is_a_case_insensitive_substring(manager):
+    seed(manager)
+
+    entries = manager.get_entries_filtered(application='XVA')
+
+    assert names(entries) == [('2024-02-15', 'xva batch eod'), ('2024-02-01', 'XVA Batch')]
+
+
+def test_quality_status_matches_exactly(manager):
+    seed(manager)
+
+    entries = manager.get_entries_filtered(quality_status='Red')
+
+    assert names(entries) == [('2024-02-15', 'xva batch eod'), ('2024-01-10', 'CVAR ALL')]
+
+
+def test_prb_and_hiim_only_accept_child_rows_and_legacy_columns(manager):
+    seed(manager)
+
+    assert names(manager.get_entries_filtered(prb_only=True)) == [
+        ('2024-02-15', 'xva batch eod'), ('2024-01-10', 'CVAR ALL')]
+    assert names(manager.get_entries_filtered(hiim_only=True)) == [
+        ('2024-03-01', 'Other'), ('2024-02-01', 'XVA Batch')]
+
+
+def test_filters_combine_and_attach_child_rows(manager):
+    seed(manager)
+
+    entries = manager.get_entries_filtered(application='cvar', prb_only=True, start_date='2024-01-01')
+
+    assert names(entries) == [('2024-01-10', 'CVAR ALL')]
+    assert [prb['prb_id_number'] for prb in entries[0]['prbs']] == ['11']
+
+
+def test_api_entries_passes_filters_through(client, app_module):
+    seed(app_module.entry_manager)
+
+    response = client.get('/api/entries?application=xva&quality_status=Amber')
+
+    assert response.status_code == 200
+    assert names(response.get_json()) == [('2024-02-01', 'XVA Batch')]
+
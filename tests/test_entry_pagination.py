@@ -0,0 +1,96 @@
+"""Keyset pagination of get_entries_filtered (limit/after)"""
+
+from conftest import make_entry
+
+
+def page_through(manager, page_size, **filters):
+    """Collect every entry by following (date, created_at, id) cursors"""
+    entries, after = [], None
+    while True:
+        page = manager.get_entries_filtered(limit=page_size, after=after, **filters)
+        entries.extend(page)
+        if len(page) < page_size:
+            return entries
+        last = page[-1]
+        after = (last['date'], last['created_at'], last['id'])
+
+
+def seed(manager, count=30):
+    applications = ['CVAR ALL', 'CVAR NYQ', 'XVA']
+    manager.create_entries([
+        make_entry(f'2024-01-{day % 10 + 1:02d}', applications[day // 10],
+                   issues=[{'description': f'issue {day}', 'remarks': ''}])
+        for day in range(count)
+    ])
+
+
+def test_pages_match_unpaginated_order(manager):
+    seed(manager)
+    expected = [entry['id'] for entry in manager.get_entries_filtered()]
+
+    for page_size in (1, 4, 7, 30):
+        assert [entry['id'] for entry in page_through(manager, page_size)] == expected
+
+
+def test_filtered_pages_match_unpaginated_order(manager):
+    seed(manager)
+    expected = [entry['id'] for entry in manager.get_entries_filtered(application='cvar')]
+
+    assert len(expected) == 20
+    assert [entry['id'] for entry in page_through(manager, 3, application='cvar')] == expected
+
+
+def test_rows_without_created_at_are_not_lost_between_pages(manager):
+    seed(manager)
+    conn = manager.adapter.get_connection()
+    conn.execute("UPDATE entries SET created_at = NULL WHERE id % 3 = 0")
+    conn.commit()
+    conn.close()
+    manager.cache.bump()
+
+    expected = [entry['id'] for entry in manager.get_entries_filtered()]
+    assert len(expected) == 30
+    for page_size in (1, 2, 5):
+        assert [entry['id'] for entry in page_through(manager, page_size)] == expected
+
+
+def test_page_loads_only_its_own_child_rows(manager, monkeypatch):
+    seed(manager)
+    calls = []
+    attach = manager.adapter._attach_child_rows
+
+    def spy(cursor, entries, all_rows=False):
+        calls.append(all_rows)
+        return attach(cursor, entries, all_rows=all_rows)
+
+    monkeypatch.setattr(manager.adapter, '_attach_child_rows', spy)
+    page = manager.adapter.get_entries_filtered(limit=5)
+
+    assert calls == [False]
+    assert [len(entry['issues']) for entry in page] == [1] * 5
+
+
+def test_page_order_is_served_by_index(manager):
+    conn = manager.adapter.get_connection()
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM entries WHERE (date, COALESCE(created_at, ''), id) < (?, COALESCE(?, ''), ?) "
+        "ORDER BY date DESC, COALESCE(created_at, '') DESC, id DESC LIMIT 10", ('2024-01-05', None, 3)
+    ).fetchall()
+    conn.close()
+
+    assert 'idx_entries_date_created_key' in ' '.join(row[-1] for row in plan)
+    assert 'TEMP B-TREE' not in ' '.join(row[-1] for row in plan)
+
+
+def test_every_listing_uses_the_page_order(manager):
+    seed(manager)
+    conn = manager.adapter.get_connection()
+    conn.execute("UPDATE entries SET created_at = NULL WHERE id % 4 = 0")
+    conn.commit()
+    conn.close()
+    manager.cache.bump()
+
+    expected = [entry['id'] for entry in manager.get_entries_filtered()]
+    assert [entry['id'] for entry in manager.get_all_entries()] == expected
+    assert [entry['id'] for entry in manager.adapter.get_entries_by_application('XVA')] == [
+        entry['id'] for entry in manager.get_entries_filtered(application='XVA')]
@@ -0,0 +1,63 @@
+"""/api/entries?stream=true: chunked JSON straight from the SQL cursor"""
+
+import json
+
+from conftest import make_entry
+
+
+def seed(manager, count):
+    manager.create_entries([
+        make_entry(f'2024-{1 + i // 28:02d}-{1 + i % 28:02d}', issues=[{'description': f'issue {i}'}])
+        for i in range(count)
+    ])
+
+
+def test_stream_matches_the_buffered_response(client, app_module):
+    seed(app_module.entry_manager, 30)
+
+    streamed = client.get('/api/entries?stream=true')
+    buffered = client.get('/api/entries')
+
+    assert streamed.status_code == 200
+    assert streamed.mimetype == 'application/json'
+    assert json.loads(streamed.get_data(as_text=True)) == buffered.get_json()
+
+
+def test_stream_applies_filters(client, app_module):
+    seed(app_module.entry_manager, 30)
+
+    entries = json.loads(client.get('/api/entries?stream=true&start_date=2024-02-01').get_data(as_text=True))
+
+    assert [entry['date'] for entry in entries] == [f'2024-02-{day:02d}' for day in range(2, 0, -1)]
+
+
+def test_empty_stream_is_an_empty_array(client):
+    response = client.get('/api/entries?stream=true')
+
+    assert json.loads(response.get_data(as_text=True)) == []
+
+
+def test_stream_yields_one_piece_per_chunk(manager, app_module, monkeypatch):
+    seed(manager, 7)
+    monkeypatch.setattr(app_module, 'entry_manager', manager)
+    monkeypatch.setattr(manager, 'iter_entries_filtered',
+                        lambda **filters: manager.adapter.iter_entries_filtered(chunk_size=3, **filters))
+
+    pieces = list(app_module.stream_entries_json({}))
+
+    assert len(pieces) == 4  # three chunks of up to 3 entries, then the closing bracket
+    entries = json.loads(''.join(pieces))
+    assert len(entries) == 7
+    assert entries[0]['issues'][0]['description'] == 'issue 6'
+
+
+def test_abandoned_stream_returns_its_connection(manager):
+    seed(manager, 5)
+    pool = manager.adapter.pool
+
+    chunks = manager.adapter.iter_entries_filtered(chunk_size=2)
+    next(chunks)
+    assert pool._idle == []
+    chunks.close()
+
+    assert len(pool._idle) == 1
@@ -0,0 +1,66 @@
+"""generate_dummy_data: bounded, ISO-dated load-test data"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from generate_dummy_data import (DEFAULT_APPLICATIONS, MAX_SPAN_DAYS, SCALE_PRESETS, get_dates, iter_entries,
+                                 main, plan_for_count)
+
+END = date(2024, 12, 31)
+
+
+@pytest.mark.parametrize('preset', sorted(SCALE_PRESETS))
+@pytest.mark.parametrize('weekends', [False, True])
+def test_every_preset_stays_in_a_bounded_window(preset, weekends):
+    count = SCALE_PRESETS[preset]
+
+    applications, dates = plan_for_count(count, DEFAULT_APPLICATIONS, END, weekends)
+
+    assert dates == sorted(dates)
+    assert all(len(d) == 10 and date.fromisoformat(d).isoformat() == d for d in dates)
+    assert dates[0] >= (END - timedelta(days=MAX_SPAN_DAYS - 1)).isoformat()
+    assert dates[-1] == END.isoformat()  # a Tuesday
+    assert applications[:3] == DEFAULT_APPLICATIONS
+    assert len(set(applications)) == len(applications)
+    assert len(applications) * len(dates) >= count
+
+
+def test_small_counts_use_only_the_given_applications():
+    applications, dates = plan_for_count(1000, DEFAULT_APPLICATIONS, END, include_weekends=True)
+
+    assert applications == DEFAULT_APPLICATIONS
+    assert len(dates) == 334
+    assert dates[-1] == '2024-12-31'
+
+
+def test_get_dates_skips_weekends_and_uses_iso_dates():
+    assert get_dates(date(2024, 3, 1), date(2024, 3, 5)) == ['2024-03-01', '2024-03-04', '2024-03-05']
+
+
+def test_iter_entries_stops_at_the_limit():
+    applications, dates = plan_for_count(10, ['XVA', 'CVAR ALL'], END)
+
+    entries = list(iter_entries(applications, dates, random.Random(1), 10))
+
+    assert len(entries) == 10
+    assert len({(entry['date'], entry['application_name']) for entry in entries}) == 10
+
+
+def test_count_run_writes_the_requested_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr('generate_dummy_data.MAX_SPAN_DAYS', 5)
+    data_dir = str(tmp_path / 'data')
+
+    assert main(['--count', '40', '--end', '2024-06-30', '--weekends', '--seed', '3', '--data-dir', data_dir])
+
+    from sharepoint_sqlite_adapter import ProductionEntryManagerWorking
+    manager = ProductionEntryManagerWorking(data_dir=data_dir)
+    try:
+        entries = manager.get_all_entries()
+        assert len(entries) == 40
+        assert min(entry['date'] for entry in entries) == '2024-06-26'
+        stats = manager.get_monthly_stats()
+        assert sum(row['total'] for row in stats) == 40
+    finally:
+        manager.close()
@@ -0,0 +1,137 @@
+"""Login guard: the bounded bcrypt pool and the shared login throttle"""
+
+import threading
+
+import bcrypt
+import pytest
+
+from login_guard import LoginBusyError, LoginThrottle, PasswordVerifier
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('login_guard.time.time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def throttle(tmp_path, clock):
+    throttle = LoginThrottle(str(tmp_path / 'sessions.db'), max_attempts=2, window_seconds=60)
+    yield throttle
+    throttle.close()
+
+
+def test_verifier_rejects_checks_beyond_the_queue(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_checkpw(password, hashed):
+        started.set()
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(bcrypt, 'checkpw', slow_checkpw)
+    verifier = PasswordVerifier(max_workers=1, max_pending=0)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(verifier.check(b'pw', b'hash')))
+    worker.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(LoginBusyError) as busy:
+            verifier.check(b'pw', b'hash')
+        assert busy.value.retry_after >= 1
+        assert verifier.stats()['rejected'] == 1
+    finally:
+        release.set()
+        worker.join(5)
+        verifier.shutdown()
+    assert results == [True]
+    assert verifier.stats()['in_progress'] == 0
+
+
+def test_login_returns_429_when_the_verifier_is_busy(client, app_module, monkeypatch):
+    with app_module.app.app_context():
+        app_module.initialize_database()
+
+    def busy(password, hashed):
+        raise LoginBusyError(3)
+
+    monkeypatch.setattr(app_module.password_verifier, 'check', busy)
+
+    response = client.post('/api/auth/login', json={'password': 'admin123'})
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '3'
+    assert response.get_json()['retry_after'] == 3
+
+
+def test_throttle_window_slides(throttle, clock):
+    assert throttle.hit('10.0.0.1') == 0
+    clock[0] += 20
+    assert throttle.hit('10.0.0.1') == 0
+    clock[0] += 10
+    # The first attempt leaves the window 30 s from now
+    assert throttle.hit('10.0.0.1') == 30
+    assert throttle.hit('10.0.0.2') == 0
+
+    clock[0] += 30
+    assert throttle.hit('10.0.0.1') == 0
+    assert throttle.hit('10.0.0.1') == 20
+
+
+def test_reset_forgets_a_client(throttle):
+    throttle.hit('10.0.0.1')
+    throttle.hit('10.0.0.1')
+
+    throttle.reset('10.0.0.1')
+
+    assert throttle.hit('10.0.0.1') == 0
+
+
+def test_throttles_on_the_same_database_share_attempts(tmp_path, throttle, clock):
+    other = LoginThrottle(str(tmp_path / 'sessions.db'), max_attempts=2, window_seconds=60)
+    try:
+        assert throttle.hit('10.0.0.1') == 0
+        assert other.hit('10.0.0.1') == 0
+        assert throttle.hit('10.0.0.1') == 60
+        assert other.hit('10.0.0.1') == 60
+    finally:
+        other.close()
+
+
+def test_sweep_removes_attempts_outside_the_window(throttle, clock):
+    throttle.hit('10.0.0.1')
+    clock[0] += 30
+    throttle.hit('10.0.0.2')
+    clock[0] += 31
+
+    assert throttle.sweep() == 1
+
+
+def test_forwarded_client_address_is_used_behind_a_trusted_proxy(tmp_path, monkeypatch):
+    import sys
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('config.LOGIN_TRUSTED_PROXIES', 1)
+    monkeypatch.setattr('config.LOGIN_RATE_LIMIT_ATTEMPTS', 1)
+    sys.modules.pop('app', None)
+    import app as module
+    try:
+        client = module.app.test_client()
+        with module.app.app_context():
+            module.initialize_database()
+
+        def login(forwarded_for):
+            return client.post('/api/auth/login', json={'password': 'wrong'},
+                               headers={'X-Forwarded-For': forwarded_for}).status_code
+
+        assert login('203.0.113.1') == 401
+        assert login('203.0.113.1') == 429
+        # Same proxy, different user: a separate bucket
+        assert login('203.0.113.2') == 401
+    finally:
+        sys.modules.pop('app', None)
+        module.entry_manager.close()
+        if module.session_store is not None:
+            module.session_store.close()
+        module.password_verifier.shutdown()
+        module.login_throttle.close()
@@ -0,0 +1,134 @@
+"""Versioned schema migrations (PRAGMA user_version) and the settings cache"""
+
+import sqlite3
+
+import pytest
+
+from sharepoint_sqlite_adapter import SCHEMA_MIGRATIONS, SharePointSQLiteAdapter, ProductionEntryManagerWorking
+
+LATEST_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+# entries as created before the child tables and later columns existed
+LEGACY_ENTRIES = '''
+    CREATE TABLE entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT, day TEXT, application_name TEXT,
+        prc_mail_text TEXT, prc_mail_status TEXT, cp_alerts_text TEXT, cp_alerts_status TEXT,
+        quality_status TEXT, quality_legacy TEXT, quality_target TEXT,
+        prb_id_number TEXT, prb_id_status TEXT, hiim_id_number TEXT, hiim_id_status TEXT,
+        valo_status TEXT, sensi_status TEXT, cf_ra_status TEXT,
+        root_cause_application TEXT, root_cause_type TEXT, issue_description TEXT, remarks TEXT,
+        created_at TEXT, updated_at TEXT
+    )
+'''
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return tmp_path / 'data'
+
+
+def legacy_database(data_dir, rows):
+    data_dir.mkdir()
+    conn = sqlite3.connect(str(data_dir / 'prodvision.db'))
+    conn.execute(LEGACY_ENTRIES)
+    conn.executemany(
+        'INSERT INTO entries (date, application_name, quality_status, issue_description, prb_id_number, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?)', rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def open_adapter(data_dir):
+    return SharePointSQLiteAdapter('https://example.invalid', data_dir=str(data_dir))
+
+
+def test_new_database_is_created_at_latest_version(data_dir):
+    adapter = open_adapter(data_dir)
+
+    assert adapter.schema_version == LATEST_VERSION
+    assert adapter.migrate_database() == []
+    adapter.close()
+
+
+def test_legacy_database_is_migrated_once(data_dir):
+    legacy_database(data_dir, [
+        ('2024-01-01', 'XVA', 'Red', 'feed late', '123', '2024-01-01T08:00:00'),
+        ('2024-01-02', 'XVA', 'Green', '', '', None),
+    ])
+
+    adapter = open_adapter(data_dir)
+    assert adapter.schema_version == LATEST_VERSION
+    phases = [phase for phase, _ in adapter.startup_timings]
+    assert [phase for phase in phases if phase.startswith('migration')] == [
+        f'migration {version}: {description}' for version, description, _ in SCHEMA_MIGRATIONS
+    ]
+
+    entry = adapter.get_entry_by_id(1)
+    assert [issue['description'] for issue in entry['issues']] == ['feed late']
+    assert [prb['prb_id_number'] for prb in entry['prbs']] == ['123']
+    assert adapter.get_entry_by_id(2)['issues'] == []
+    assert adapter.check_rollups() == []
+    adapter.close()
+
+    reopened = open_adapter(data_dir)
+    assert not any(phase.startswith('migration') for phase, _ in reopened.startup_timings)
+    assert len(reopened.get_entry_by_id(1)['issues']) == 1
+    reopened.close()
+
+
+def test_unique_index_waits_for_duplicates_to_be_removed(data_dir):
+    legacy_database(data_dir, [
+        ('2024-01-01', 'XVA', 'Red', '', '', '2024-01-01T08:00:00'),
+        ('2024-01-01', 'XVA', 'Green', '', '', '2024-01-01T09:00:00'),
+    ])
+
+    adapter = open_adapter(data_dir)
+    assert adapter.schema_version == LATEST_VERSION
+    assert [duplicate['ids'] for duplicate in adapter.duplicate_entries] == [[1, 2]]
+    assert 'XVA on 2024-01-01: entry ids [1, 2]' in adapter.startup_report()
+    adapter.delete_entry(2)
+    adapter.close()
+
+    reopened = open_adapter(data_dir)
+    conn = reopened.get_connection()
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_entries_date_application'").fetchone()
+    conn.close()
+    assert reopened.duplicate_entries == []
+    assert 'duplicate' not in reopened.startup_report()
+    reopened.close()
+
+
+def test_superseded_date_created_at_index_is_dropped(data_dir):
+    adapter = open_adapter(data_dir)
+    conn = adapter.get_connection()
+    conn.execute('CREATE INDEX idx_entries_date_created_at ON entries(date, created_at)')
+    conn.execute('PRAGMA user_version = 4')
+    conn.commit()
+    conn.close()
+    adapter.close()
+
+    reopened = open_adapter(data_dir)
+    assert reopened.schema_version == LATEST_VERSION
+    conn = reopened.get_connection()
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    assert 'idx_entries_date_created_at' not in indexes
+    assert 'idx_entries_date_created_key' in indexes
+    reopened.close()
+
+
+def test_settings_are_cached_until_the_data_changes(data_dir):
+    manager = ProductionEntryManagerWorking(data_dir=str(data_dir))
+    manager.set_setting('theme', 'dark')
+    assert manager.get_setting('theme') == 'dark'
+
+    # A write from another process moves the version the cache is keyed on
+    other = open_adapter(data_dir)
+    other.set_setting('theme', 'light')
+    other.close()
+
+    assert manager.get_setting('theme') == 'light'
+    assert manager.get_setting('missing') is None
+    manager.close()
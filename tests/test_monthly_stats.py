@@ -0,0 +1,118 @@
+"""get_monthly_stats: SQL aggregation against the original per-entry Python loop"""
+
+import pytest
+
+from conftest import make_entry
+
+PUNCTUALITY = {'Red': 'red', 'red': 'red', 'late': 'red', 'Green': 'green', 'green': 'green', 'on-time': 'green'}
+COUNTERS = ('total', 'quality_red', 'quality_yellow', 'quality_green', 'punctuality_red', 'punctuality_yellow',
+            'punctuality_green', 'prb_active', 'prb_closed', 'hiim_active', 'hiim_closed')
+
+
+def baseline_monthly_stats(entries, start_date=None, end_date=None, application=None, quality_status=None,
+                           prb_only=False, hiim_only=False, years=(), months=()):
+    """The /api/stats loop before it moved to SQL, grouped per (month, application).
+
+    prb_only/hiim_only accept a child row as well as the legacy column, as the
+    SQL filters (and /api/entries) do.
+    """
+    groups = {}
+    for entry in entries:
+        date = entry['date']
+        if start_date and date < start_date or end_date and date > end_date:
+            continue
+        if years and date[:4] not in years or months and str(int(date[5:7])) not in months:
+            continue
+        if application and application.lower() not in (entry['application_name'] or '').lower():
+            continue
+        if quality_status and entry['quality_status'] != quality_status:
+            continue
+        if prb_only and not (entry['prb_id_number'] or entry['prbs']):
+            continue
+        if hiim_only and not (entry['hiim_id_number'] or entry['hiims']):
+            continue
+        counts = groups.setdefault((date[:7], entry['application_name'] or 'Unknown'), dict.fromkeys(COUNTERS, 0))
+        counts['total'] += 1
+        if entry['quality_status'] in ('Red', 'Yellow', 'Green'):
+            counts['quality_' + entry['quality_status'].lower()] += 1
+        if entry['prc_mail_status']:
+            counts['punctuality_' + PUNCTUALITY.get(entry['prc_mail_status'], 'yellow')] += 1
+        for kind in ('prb', 'hiim'):
+            status = entry[f'{kind}_id_status']
+            if status in ('active', 'closed'):
+                counts[f'{kind}_{status}'] += 1
+    return groups
+
+
+def as_groups(rows):
+    return {(row['month'], row['application_name']): {name: row[name] for name in COUNTERS} for row in rows}
+
+
+@pytest.fixture
+def seeded(manager):
+    statuses = ['Red', 'Yellow', 'Green', '']
+    mails = ['late', 'on-time', 'warning', 'Red', '', 'green']
+    applications = ['XVA', 'CVAR ALL', 'CVAR NYQ']
+    entries = []
+    for i in range(36):
+        fields = {'quality_status': statuses[i % 4], 'prc_mail_status': mails[i % 6]}
+        if i % 5 == 0:
+            fields.update(prb_id_number=str(1000 + i), prb_id_status='active' if i % 2 else 'closed')
+        elif i % 7 == 0:
+            fields['prbs'] = [{'prb_id_number': i, 'prb_id_status': 'active'}]
+        if i % 4 == 1:
+            fields['hiims'] = [{'hiim_id_number': i, 'hiim_id_status': 'closed'}]
+        entries.append(make_entry(f'2024-{1 + i % 3:02d}-{1 + i // 3:02d}', applications[i % 3] if i < 33 else f'APP {i}',
+                                  **fields))
+    manager.create_entries(entries)
+
+    # Legacy rows without an application name
+    conn = manager.adapter.get_connection()
+    conn.execute("UPDATE entries SET application_name = NULL WHERE application_name = 'APP 33'")
+    conn.execute("UPDATE entries SET application_name = '' WHERE application_name = 'APP 34'")
+    conn.commit()
+    conn.close()
+    manager.rebuild_rollups()
+    manager.cache.bump()
+    return manager
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'years': ['2024']},
+    {'months': ['2']},
+    {'application': 'cvar'},
+    {'start_date': '2024-01-05', 'end_date': '2024-02-20'},
+    {'quality_status': 'Red'},
+    {'prb_only': True},
+    {'hiim_only': True},
+    {'prb_only': True, 'hiim_only': True, 'years': ['2024']},
+])
+def test_sql_aggregation_matches_the_python_loop(seeded, filters):
+    expected = baseline_monthly_stats(seeded.get_all_entries(), **filters)
+
+    assert as_groups(seeded.get_monthly_stats(**filters)) == expected
+
+
+def test_missing_application_names_read_the_same_on_both_paths(seeded):
+    from_rollups = seeded.get_monthly_stats(years=['2024'])
+    from_entries = seeded.get_monthly_stats(years=['2024'], start_date='2024-01-01')
+
+    assert from_rollups == from_entries
+    unknown = [row for row in from_rollups if row['application_name'] == 'Unknown']
+    assert sum(row['total'] for row in unknown) == 2
+    assert not any(row['application_name'] in ('', None) for row in from_rollups)
+
+
+def test_api_stats_counts_missing_application_names_as_unknown(client, app_module):
+    app_module.entry_manager.create_entries([make_entry('2024-01-01', 'XVA'), make_entry('2024-01-02', 'XVA')])
+    conn = app_module.entry_manager.adapter.get_connection()
+    conn.execute("UPDATE entries SET application_name = NULL WHERE date = '2024-01-02'")
+    conn.commit()
+    conn.close()
+    app_module.entry_manager.rebuild_rollups()
+    app_module.entry_manager.cache.bump()
+
+    for query in ('', '?start_date=2024-01-01'):
+        body = client.get('/api/stats' + query).get_json()
+        assert body['application_distribution'] == {'XVA': 1, 'Unknown': 1}
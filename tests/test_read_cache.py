@@ -0,0 +1,113 @@
+"""ReadCache: copies per caller, invalidation and the memory bound"""
+
+import sqlite3
+
+import pytest
+
+from read_cache import ReadCache, estimate_size
+from conftest import make_entry
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def cache(db_path):
+    cache = ReadCache(db_path)
+    yield cache
+    cache.close()
+
+
+def write_from_another_connection(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute('INSERT INTO t VALUES (1)')
+    conn.commit()
+    conn.close()
+
+
+def test_callers_get_their_own_copy(cache):
+    loaded = cache.get_or_load('k', lambda: [{'id': 1, 'issues': [{'description': 'a'}]}])
+    loaded[0]['issues'].append({'description': 'added by the first caller'})
+
+    first = cache.get_or_load('k', lambda: pytest.fail('should be cached'))
+    first[0]['id'] = 99
+    first.clear()
+
+    assert cache.get_or_load('k', lambda: None) == [{'id': 1, 'issues': [{'description': 'a'}]}]
+    assert cache.stats()['hits'] == 2
+
+
+def test_write_from_another_connection_invalidates(cache, db_path):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {'count': len(calls)}
+
+    assert cache.get_or_load('k', loader) == {'count': 1}
+    assert cache.get_or_load('k', loader) == {'count': 1}
+
+    write_from_another_connection(db_path)
+
+    assert cache.get_or_load('k', loader) == {'count': 2}
+
+
+def test_probe_interval_defers_noticing_other_writers(db_path, monkeypatch):
+    cache = ReadCache(db_path, probe_interval=60)
+    clock = [1000.0]
+    monkeypatch.setattr('read_cache.time.monotonic', lambda: clock[0])
+    version = cache.current_version()
+
+    write_from_another_connection(db_path)
+    assert cache.current_version() == version
+    # This process's own writes still invalidate at once
+    assert cache.bump() == version + 1
+
+    clock[0] += 61
+    assert cache.current_version() == version + 2
+    cache.close()
+
+
+def test_byte_budget_evicts_least_recently_used(db_path):
+    value = {'payload': 'x' * 1000}
+    size = estimate_size(value)
+    cache = ReadCache(db_path, max_bytes=int(size * 2.5))
+
+    cache.get_or_load('a', lambda: dict(value))
+    cache.get_or_load('b', lambda: dict(value))
+    cache.get_or_load('a', lambda: pytest.fail('a should be cached'))
+    cache.get_or_load('c', lambda: dict(value))
+
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['evictions'] == 1
+    assert stats['bytes'] == 2 * size <= stats['max_bytes']
+    assert cache.get_or_load('b', lambda: 'reloaded') == 'reloaded'
+    cache.close()
+
+
+def test_value_larger_than_the_budget_is_not_stored(db_path):
+    cache = ReadCache(db_path, max_bytes=100)
+
+    assert cache.get_or_load('big', lambda: ['x' * 1000]) == ['x' * 1000]
+    assert cache.stats()['entries'] == 0
+    cache.close()
+
+
+def test_manager_results_can_be_modified_safely(manager):
+    manager.create_entry(make_entry('2024-06-01', issues=[{'description': 'late feed'}]))
+
+    entries = manager.get_entries_filtered()
+    entries[0]['issues'].clear()
+    entries[0]['application_name'] = 'changed'
+
+    again = manager.get_entries_filtered()
+    assert again[0]['application_name'] == 'CVAR ALL'
+    assert [issue['description'] for issue in again[0]['issues']] == ['late feed']
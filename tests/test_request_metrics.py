@@ -0,0 +1,161 @@
+"""Request metrics: percentile estimates, Prometheus text and merging across workers"""
+
+import os
+import time
+
+import pytest
+
+from request_metrics import RequestMetrics, SharedMetricsStore, _estimate_percentile
+
+BUCKETS = (0.01, 0.1, 1.0)
+
+
+def test_percentile_interpolates_inside_the_bucket():
+    # 10 requests <= 10 ms, 10 in (10 ms, 100 ms]
+    counts = [10, 10, 0, 0]
+
+    assert _estimate_percentile(counts, BUCKETS, 20, 0.25) == pytest.approx(0.005)
+    assert _estimate_percentile(counts, BUCKETS, 20, 0.50) == pytest.approx(0.01)
+    assert _estimate_percentile(counts, BUCKETS, 20, 0.75) == pytest.approx(0.055)
+    assert _estimate_percentile(counts, BUCKETS, 20, 1.0) == pytest.approx(0.1)
+
+
+def test_percentile_skips_empty_buckets_and_caps_at_the_largest_bound():
+    assert _estimate_percentile([0, 0, 4, 0], BUCKETS, 4, 0.5) == pytest.approx(0.55)
+    assert _estimate_percentile([0, 0, 0, 3], BUCKETS, 3, 0.99) == 1.0
+    assert _estimate_percentile([0, 0, 0, 0], BUCKETS, 0, 0.5) == 0.0
+
+
+def test_snapshot_never_reports_more_than_the_observed_max():
+    metrics = RequestMetrics(BUCKETS)
+    for seconds in (0.2, 0.3):
+        metrics.record_response('GET', '/api/stats', 200, seconds)
+
+    latency = metrics.snapshot()['routes'][0]['latency_ms']
+    assert latency['max'] == 300.0
+    assert latency['p99'] == 300.0
+    # Interpolation alone would put p50 at 550 ms, inside the (100 ms, 1 s] bucket
+    assert latency['p50'] == 300.0
+    assert latency['mean'] == 250.0
+
+
+def test_prometheus_text_format():
+    metrics = RequestMetrics(BUCKETS)
+    metrics.record_response('GET', '/api/entries', 200, 0.005, 100)
+    metrics.record_response('GET', '/api/entries', 304, 0.05)
+    metrics.record_response('POST', '/say "hi"\\now', 500, 5.0)
+
+    lines = metrics.prometheus().splitlines()
+
+    assert '# TYPE prodvision_http_requests_total counter' in lines
+    assert 'prodvision_http_requests_total{method="GET",route="/api/entries",status="200"} 1' in lines
+    assert 'prodvision_http_requests_total{method="GET",route="/api/entries",status="304"} 1' in lines
+    buckets = [line for line in lines if line.startswith('prodvision_http_request_duration_seconds_bucket{method="GET"')]
+    assert [line.rsplit(' ', 1)[1] for line in buckets] == ['1', '2', '2', '2']
+    assert buckets[-1].endswith('le="+Inf"} 2')
+    assert 'prodvision_http_request_duration_seconds_count{method="GET",route="/api/entries"} 2' in lines
+    assert 'prodvision_http_response_bytes_total{method="GET",route="/api/entries"} 100' in lines
+    assert 'prodvision_http_requests_total{method="POST",route="/say \\"hi\\"\\\\now",status="500"} 1' in lines
+    # SQL series only appear once SQL tracing has recorded something
+    assert not any('sql_statements_total' in line for line in lines)
+
+
+def test_prometheus_includes_sql_when_traced():
+    metrics = RequestMetrics(BUCKETS)
+    metrics.record_response('GET', '/api/entries', 200, 0.005)
+    metrics.record_sql('GET', '/api/entries', 3, 0.002)
+
+    text = metrics.prometheus()
+
+    assert 'prodvision_http_sql_statements_total{method="GET",route="/api/entries"} 3' in text
+    assert 'prodvision_http_sql_seconds_total{method="GET",route="/api/entries"} 0.002000' in text
+
+
+def worker_metrics(started_at, count, in_flight=0):
+    metrics = RequestMetrics(BUCKETS)
+    metrics.started_at = started_at
+    for _ in range(count):
+        metrics.record_response('GET', '/api/entries', 200, 0.005, 10)
+    for _ in range(in_flight):
+        metrics.request_started('GET', '/api/entries')
+    return metrics
+
+
+def test_store_sums_every_published_worker(tmp_path):
+    store = SharedMetricsStore(str(tmp_path / 'metrics.db'))
+    first, second = worker_metrics(1000.0, 3, in_flight=1), worker_metrics(2000.0, 2, in_flight=2)
+    store.publish(first)
+    store.publish(second)
+    first.record_response('GET', '/api/entries', 500, 2.0)
+    store.publish(first)  # replaces the first worker's earlier row
+
+    merged = store.aggregate(BUCKETS)
+    snapshot = merged.snapshot()
+
+    assert snapshot['workers'] == 2
+    route = snapshot['routes'][0]
+    assert route['count'] == 6
+    assert route['status_codes'] == {'200': 5, '500': 1}
+    assert route['in_flight'] == 3
+    assert route['response_bytes'] == 50
+    assert route['latency_ms']['max'] == 2000.0
+    assert merged.started_at == 1000.0
+
+
+def test_stale_workers_keep_their_counters_but_not_in_flight(tmp_path):
+    store = SharedMetricsStore(str(tmp_path / 'metrics.db'), stale_after=0.0)
+    store.publish(worker_metrics(1000.0, 4, in_flight=2))
+    time.sleep(0.01)
+
+    route = store.aggregate(BUCKETS).snapshot()['routes'][0]
+
+    assert route['count'] == 4
+    assert route['in_flight'] == 0
+
+
+def test_clear_forgets_the_previous_run(tmp_path):
+    store = SharedMetricsStore(str(tmp_path / 'metrics.db'))
+    store.publish(worker_metrics(1000.0, 4))
+
+    store.clear()
+
+    assert store.aggregate(BUCKETS).snapshot()['routes'] == []
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork()')
+def test_forked_workers_are_merged(tmp_path):
+    store = SharedMetricsStore(str(tmp_path / 'metrics.db'))
+    for count in (1, 2):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                store.publish(worker_metrics(time.time(), count))
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+    assert store.aggregate(BUCKETS).snapshot()['routes'][0]['count'] == 3
+
+
+def test_endpoint_reports_all_workers_when_shared(logged_in, app_module, tmp_path):
+    app_module.share_request_metrics(str(tmp_path / 'metrics.db'))
+    other = RequestMetrics(app_module.request_metrics.buckets)
+    other.started_at = 1.0
+    other.record_response('GET', '/api/entries', 200, 0.01)
+    app_module.request_metrics_store.publish(other)
+
+    body = logged_in.get('/api/admin/metrics').get_json()
+
+    assert body['workers'] == 2
+    routes = {(route['method'], route['route']): route for route in body['routes']}
+    assert routes[('GET', '/api/entries')]['count'] == 1
+    assert routes[('POST', '/api/auth/login')]['count'] == 1
+    text = logged_in.get('/api/admin/metrics?format=prometheus').get_data(as_text=True)
+    assert 'prodvision_http_requests_total{method="GET",route="/api/entries",status="200"} 1' in text
+
+
+def test_endpoint_reports_this_process_by_default(logged_in):
+    body = logged_in.get('/api/admin/metrics').get_json()
+
+    assert body['workers'] == 1
+    assert any(route['route'] == '/api/auth/login' for route in body['routes'])
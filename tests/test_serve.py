@@ -0,0 +1,54 @@
+"""serve.py: worker request draining on shutdown"""
+
+import threading
+import time
+import urllib.request
+
+from serve import DrainingWSGIServer, bind_socket
+
+
+def slow_app(environ, start_response):
+    time.sleep(0.5)
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'done']
+
+
+def test_shutdown_lets_in_flight_requests_finish():
+    sock = bind_socket('127.0.0.1', 0)
+    server = DrainingWSGIServer('127.0.0.1', sock.getsockname()[1], slow_app, fd=sock.fileno())
+    serving = threading.Thread(target=server.serve_forever)
+    serving.start()
+
+    result = {}
+
+    def request():
+        url = f'http://127.0.0.1:{sock.getsockname()[1]}/'
+        result['body'] = urllib.request.urlopen(url, timeout=5).read()
+
+    client = threading.Thread(target=request)
+    client.start()
+    while not server.request_threads:
+        time.sleep(0.01)
+
+    server.shutdown()
+    serving.join()
+    assert server.drain(timeout=5) == 0
+    server.server_close()
+    sock.close()
+    client.join()
+
+    assert result['body'] == b'done'
+
+
+def test_drain_gives_up_at_the_deadline():
+    sock = bind_socket('127.0.0.1', 0)
+    server = DrainingWSGIServer('127.0.0.1', sock.getsockname()[1], slow_app, fd=sock.fileno())
+    stuck = threading.Thread(target=time.sleep, args=(1,), daemon=True)
+    stuck.start()
+    server.request_threads.add(stuck)
+
+    started = time.monotonic()
+    assert server.drain(timeout=0.1) == 1
+    assert time.monotonic() - started < 0.5
+    server.server_close()
+    sock.close()
@@ -0,0 +1,116 @@
+"""Session expiry indexes: cleanup only touches sessions that have expired"""
+
+import os
+import time
+
+import pytest
+
+from session_store import SessionFileExpiryIndex
+
+LIFETIME = 100
+
+
+def write_session(directory, name, mtime):
+    path = directory / name
+    path.write_bytes(b'x' * 10)
+    os.utime(str(path), (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def session_dir(tmp_path):
+    directory = tmp_path / 'sessions'
+    directory.mkdir()
+    return directory
+
+
+def test_build_indexes_existing_files(session_dir):
+    now = time.time()
+    write_session(session_dir, 'old', now - 2 * LIFETIME)
+    write_session(session_dir, 'fresh', now)
+    write_session(session_dir, '__wz_cache_count', now - 2 * LIFETIME)
+
+    index = SessionFileExpiryIndex(str(session_dir), LIFETIME, ignore_names={'__wz_cache_count'})
+    index.build()
+
+    assert index.stats() == {'total_files': 2, 'total_size': 20}
+    assert index.pop_expired(now) == ['old']
+    assert sorted(os.listdir(str(session_dir))) == ['__wz_cache_count', 'fresh']
+
+
+def test_pop_expired_does_not_scan_the_directory(session_dir, monkeypatch):
+    now = time.time()
+    write_session(session_dir, 'old', now - 2 * LIFETIME)
+    index = SessionFileExpiryIndex(str(session_dir), LIFETIME)
+    index.build()
+
+    def no_scan(path):
+        raise AssertionError('cleanup listed the session directory')
+
+    monkeypatch.setattr(os, 'scandir', no_scan)
+    monkeypatch.setattr(os, 'listdir', no_scan)
+
+    assert index.pop_expired(now) == ['old']
+    assert index.pop_expired(now) == []
+
+
+def test_touch_moves_a_session_back_in_the_queue(session_dir):
+    now = time.time()
+    path = write_session(session_dir, 'sid', now - 2 * LIFETIME)
+    index = SessionFileExpiryIndex(str(session_dir), LIFETIME)
+    index.build()
+
+    os.utime(str(path), (now, now))
+    index.touch(str(path))
+
+    assert index.pop_expired(now) == []
+    assert path.exists()
+
+
+def test_file_rewritten_by_another_process_is_kept(session_dir):
+    now = time.time()
+    path = write_session(session_dir, 'sid', now - 2 * LIFETIME)
+    index = SessionFileExpiryIndex(str(session_dir), LIFETIME)
+    index.build()
+
+    os.utime(str(path), (now, now))  # no touch(): this process did not see the write
+
+    assert index.pop_expired(now) == []
+    assert path.exists()
+    assert index.pop_expired(now + 2 * LIFETIME) == ['sid']
+
+
+def test_removed_files_are_forgotten(session_dir):
+    now = time.time()
+    path = write_session(session_dir, 'sid', now - 2 * LIFETIME)
+    index = SessionFileExpiryIndex(str(session_dir), LIFETIME)
+    index.build()
+
+    os.remove(str(path))
+    index.remove(str(path))
+
+    assert index.pop_expired(now) == []
+    assert index.stats() == {'total_files': 0, 'total_size': 0}
+
+
+def test_shared_index_picks_up_files_from_other_processes(session_dir):
+    now = time.time()
+    index = SessionFileExpiryIndex(str(session_dir), LIFETIME, shared=True)
+    index.build()
+
+    write_session(session_dir, 'other', now - 2 * LIFETIME)
+    # Make sure the directory mtime moves even on coarse-grained filesystems
+    os.utime(str(session_dir), ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+    assert index.pop_expired(now) == ['other']
+
+
+def test_sqlite_sweep_uses_the_expiry_index(app_module):
+    conn = app_module.session_store.pool.acquire()
+    try:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT id FROM sessions WHERE expires_at <= ? LIMIT ?', (time.time(), 500)))
+    finally:
+        conn.close()
+
+    assert 'idx_sessions_expires_at' in plan
@@ -0,0 +1,37 @@
+"""Server-side SQLite sessions (SESSION_BACKEND = 'sqlite')"""
+
+import time
+
+
+def test_app_uses_the_sqlite_session_store(app_module):
+    assert app_module.app.session_interface is app_module.session_store
+    assert 'SESSION_TYPE' not in app_module.app.config
+
+
+def test_login_session_is_stored_server_side(logged_in, app_module):
+    assert logged_in.get('/api/auth/status').get_json() == {'authenticated': True}
+    assert app_module.session_store.stats()['active_sessions'] == 1
+
+    logged_in.post('/api/auth/logout')
+    assert logged_in.get('/api/auth/status').get_json() == {'authenticated': False}
+    assert app_module.session_store.stats()['active_sessions'] == 0
+
+
+def expire_all_sessions(app_module):
+    conn = app_module.session_store.pool.acquire()
+    conn.execute('UPDATE sessions SET expires_at = ?', (time.time() - 1,))
+    conn.commit()
+    conn.close()
+
+
+def test_expired_session_is_rejected_when_read(logged_in, app_module):
+    expire_all_sessions(app_module)
+
+    assert logged_in.get('/api/auth/status').get_json() == {'authenticated': False}
+
+
+def test_sweep_deletes_expired_sessions(logged_in, app_module):
+    expire_all_sessions(app_module)
+
+    assert app_module.session_store.sweep_expired() == 1
+    assert app_module.session_store.stats() == {'active_sessions': 0, 'expired_sessions': 0}
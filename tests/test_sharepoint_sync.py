@@ -0,0 +1,251 @@
+"""Delta sync of the database through a LocalDirectoryTransport"""
+
+import os
+
+import pytest
+
+from conftest import make_entry
+from sharepoint_sqlite_adapter import ProductionEntryManagerWorking
+from sharepoint_sync import LocalDirectoryTransport, HTTPTransport, SyncEngine, SyncError, SyncTransport, CHUNK_PREFIX
+
+# Small chunks so a test database spans many of them
+CHUNK_SIZE = 16 * 1024
+
+
+class FlakyTransport(LocalDirectoryTransport):
+    """Fails every chunk put/get after the first `budget` ones (None = never fails)"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.put_budget = self.get_budget = None
+        self.chunk_puts = self.chunk_gets = 0
+
+    def put(self, name, data):
+        if name.startswith(CHUNK_PREFIX):
+            if self.put_budget is not None and self.chunk_puts >= self.put_budget:
+                raise IOError('connection lost')
+            self.chunk_puts += 1
+        super().put(name, data)
+
+    def get(self, name):
+        if name.startswith(CHUNK_PREFIX):
+            if self.get_budget is not None and self.chunk_gets >= self.get_budget:
+                raise IOError('connection lost')
+            self.chunk_gets += 1
+        return super().get(name)
+
+
+@pytest.fixture
+def transport(tmp_path):
+    return FlakyTransport(str(tmp_path / 'remote'))
+
+
+@pytest.fixture
+def make_host(tmp_path, transport):
+    hosts = []
+
+    def make(name):
+        host = ProductionEntryManagerWorking(data_dir=str(tmp_path / name), sync_transport=transport,
+                                             sync_chunk_size=CHUNK_SIZE)
+        hosts.append(host)
+        return host
+
+    yield make
+    for host in hosts:
+        host.close()
+
+
+def seed(host, month, count=60):
+    host.create_entries([
+        make_entry(f'2024-{month:02d}-{day % 28 + 1:02d}', ['CVAR ALL', 'CVAR NYQ', 'XVA'][day // 28],
+                   remarks='x' * 200, issues=[{'description': f'issue {day}', 'remarks': 'r' * 100}])
+        for day in range(count)
+    ])
+
+
+def stats(host):
+    return host.adapter.last_sync_stats
+
+
+def remarks(host):
+    return sorted((entry['date'], entry['application_name'], entry['remarks']) for entry in host.get_all_entries())
+
+
+def test_push_then_pull_copies_the_database(make_host):
+    a, b = make_host('a'), make_host('b')
+    seed(a, 1)
+
+    assert a.sync_to_sharepoint()
+    assert stats(a)['chunks_transferred'] == stats(a)['chunks_total'] > 1
+    assert b.sync_from_sharepoint()
+
+    assert remarks(b) == remarks(a)
+    assert b.get_monthly_stats() == a.get_monthly_stats()
+
+
+def test_unchanged_database_is_not_uploaded(make_host, transport):
+    a = make_host('a')
+    seed(a, 1)
+    a.sync_to_sharepoint()
+    puts = transport.chunk_puts
+
+    assert a.sync_to_sharepoint()
+    assert stats(a)['status'] == 'unchanged'
+    assert transport.chunk_puts == puts
+
+
+def test_small_change_uploads_only_changed_chunks(make_host):
+    a, b = make_host('a'), make_host('b')
+    seed(a, 1)
+    a.sync_to_sharepoint()
+    b.sync_from_sharepoint()
+
+    entry = a.get_all_entries()[0]
+    a.update_entry(entry['id'], {'remarks': 'edited'})
+    assert a.sync_to_sharepoint()
+    assert 0 < stats(a)['chunks_transferred'] < stats(a)['chunks_total'] / 2
+
+    assert b.sync_from_sharepoint()
+    assert 0 < stats(b)['chunks_transferred'] < stats(b)['chunks_total'] / 2
+    assert b.get_entry_by_id(entry['id'])['remarks'] == 'edited'
+
+
+def test_pull_moves_data_version_past_both_sides(make_host):
+    a, b = make_host('a'), make_host('b')
+    seed(a, 1)
+    a.sync_to_sharepoint()
+    seed(b, 2)
+    for entry in b.get_all_entries()[:5]:
+        b.update_entry(entry['id'], {'remarks': 'b'})
+    before = max(a.get_data_version(), b.get_data_version())
+
+    assert b.sync_from_sharepoint(force=True)
+
+    # Same contents as A, but a version neither host has served before
+    assert remarks(b) == remarks(a)
+    assert b.get_data_version() > before
+    assert b.adapter.sync_engine().load_state()['data_version'] == b.get_data_version()
+
+
+def test_no_false_conflict_after_pull(make_host):
+    a, b = make_host('a'), make_host('b')
+    seed(a, 1)
+    a.sync_to_sharepoint()
+    b.sync_from_sharepoint()
+
+    assert b.sync_to_sharepoint()
+    assert stats(b)['status'] == 'unchanged'
+
+    b.create_entry(make_entry('2024-03-01'))
+    assert b.sync_to_sharepoint()
+    assert a.sync_from_sharepoint()
+    assert len(a.get_all_entries()) == len(b.get_all_entries())
+
+
+def test_conflicting_changes_are_refused_unless_forced(make_host):
+    a, b = make_host('a'), make_host('b')
+    seed(a, 1)
+    a.sync_to_sharepoint()
+    b.sync_from_sharepoint()
+    a.create_entry(make_entry('2024-04-01'))
+    b.create_entry(make_entry('2024-04-02'))
+    assert a.sync_to_sharepoint()
+
+    assert not b.sync_to_sharepoint()
+    assert not b.sync_from_sharepoint()
+    assert stats(b)['status'] == 'failed'
+
+    assert b.sync_from_sharepoint(force=True)
+    assert remarks(b) == remarks(a)
+
+
+def test_pull_into_populated_unsynced_database_needs_force(make_host):
+    a, b = make_host('a'), make_host('b')
+    seed(a, 1)
+    a.sync_to_sharepoint()
+    seed(b, 2)
+
+    assert not b.sync_from_sharepoint()
+    assert b.sync_from_sharepoint(force=True)
+
+
+def test_interrupted_push_resumes(make_host, transport):
+    a, b = make_host('a'), make_host('b')
+    seed(a, 1)
+    transport.put_budget = 3
+
+    assert not a.sync_to_sharepoint()
+    assert transport.get('manifest.json') is None
+
+    transport.put_budget = None
+    assert a.sync_to_sharepoint()
+    # Chunks uploaded before the failure are not sent again
+    assert stats(a)['chunks_transferred'] == len(set(transport.list(CHUNK_PREFIX))) - 3
+    assert b.sync_from_sharepoint()
+    assert remarks(b) == remarks(a)
+
+
+def test_interrupted_pull_resumes_from_cache(make_host, transport):
+    a, b = make_host('a'), make_host('b')
+    seed(a, 1)
+    a.sync_to_sharepoint()
+    transport.get_budget = 2
+
+    assert not b.sync_from_sharepoint()
+    assert b.get_all_entries() == []
+
+    transport.get_budget = None
+    assert b.sync_from_sharepoint()
+    assert stats(b)['chunks_transferred'] == stats(b)['chunks_total'] - 2
+    assert remarks(b) == remarks(a)
+    assert os.listdir(b.adapter.sync_engine().cache_dir) == []
+
+
+def test_corrupt_chunk_is_rejected(make_host, transport):
+    a, b = make_host('a'), make_host('b')
+    seed(a, 1)
+    a.sync_to_sharepoint()
+    name = sorted(transport.list(CHUNK_PREFIX))[0]
+    transport.put(name, b'not a chunk')
+
+    assert not b.sync_from_sharepoint()
+    assert b.get_all_entries() == []
+
+
+def test_prune_removes_unreferenced_chunks(make_host, transport):
+    a = make_host('a')
+    seed(a, 1)
+    a.sync_to_sharepoint()
+    for entry in a.get_all_entries()[:10]:
+        a.update_entry(entry['id'], {'remarks': 'changed'})
+    a.sync_to_sharepoint()
+    manifest, _ = a.adapter.sync_engine().remote_manifest()
+
+    removed = a.adapter.sync_engine().prune()
+
+    assert removed > 0
+    assert set(transport.list(CHUNK_PREFIX)) == {CHUNK_PREFIX + digest for digest in manifest['chunks']}
+
+
+def test_transports_must_implement_the_blob_methods():
+    class Incomplete(SyncTransport):
+        def get(self, name):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_prune_needs_a_transport_that_can_list(tmp_path):
+    engine = SyncEngine(str(tmp_path / 'prodvision.db'), HTTPTransport('http://sharepoint.invalid/ProdVision'))
+
+    with pytest.raises(SyncError, match='cannot prune'):
+        engine.prune()
+
+
+def test_prune_command_fails_cleanly_over_http(tmp_path, monkeypatch, capsys):
+    from sync_sharepoint import main
+    monkeypatch.chdir(tmp_path)
+
+    assert main(['prune']) is False
+    assert 'Prune failed: HTTPTransport cannot list remote chunks' in capsys.readouterr().out
@@ -0,0 +1,92 @@
+"""SQLTracer: per-request statement accounting and the slow-query log"""
+
+import os
+import sys
+
+import pytest
+
+from conftest import make_entry
+from sharepoint_sqlite_adapter import ProductionEntryManagerWorking
+from sql_tracing import SQLTracer
+
+
+class RecordingTracer(SQLTracer):
+    """Tracer that keeps every finished statement instead of only logging slow ones"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.finished = []
+
+    def statement_finished(self, conn, sql, params, seconds):
+        self.finished.append(' '.join(sql.split()))
+        super().statement_finished(conn, sql, params, seconds)
+
+
+@pytest.fixture
+def traced(tmp_path):
+    tracer = RecordingTracer(slow_query_ms=10000)
+    entry_manager = ProductionEntryManagerWorking(data_dir=str(tmp_path / 'data'), sql_tracer=tracer)
+    yield entry_manager, tracer
+    entry_manager.close()
+
+
+def test_write_transaction_is_fully_accounted(traced):
+    entry_manager, tracer = traced
+    tracer.finished.clear()
+
+    tracer.begin()
+    entry_manager.create_entry(make_entry('2024-05-01', issues=[{'description': 'x', 'remarks': ''}]))
+    stats = tracer.end()
+
+    # The last write before the commit and the commit itself are timed
+    assert tracer.finished[-1] == 'COMMIT'
+    assert tracer.finished[-2].startswith(('INSERT', 'UPDATE'))
+    assert stats['seconds'] > 0
+    assert stats['statements'] >= len(tracer.finished)
+
+
+def test_partially_fetched_select_finishes_on_release(traced):
+    entry_manager, tracer = traced
+    entry = entry_manager.create_entry(make_entry('2024-05-01'))
+    tracer.finished.clear()
+
+    # One fetchone() returns the row without exhausting the cursor
+    assert entry_manager.adapter.get_entry_updated_at(entry['id']) is not None
+
+    assert tracer.finished == ['SELECT updated_at FROM entries WHERE id = ?']
+
+
+def test_slow_statements_are_counted_and_explained(traced, capsys):
+    entry_manager, tracer = traced
+    tracer.slow_query_ms = 0
+
+    tracer.begin()
+    entry_manager.adapter.get_entry_updated_at(1)
+    stats = tracer.end()
+
+    assert stats['slow_statements'] == 1
+    output = capsys.readouterr().out
+    assert 'Slow query' in output
+    assert 'USING INTEGER PRIMARY KEY' in output
+
+
+def test_benchmark_query_counter_keeps_the_tracer(traced):
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+    from bench_child_rows import count_queries
+
+    entry_manager, tracer = traced
+    entry_manager.create_entry(make_entry('2024-05-01'))
+    counter = count_queries(entry_manager.adapter)
+
+    tracer.begin()
+    entry_manager.adapter.get_all_entries()
+    stats = tracer.end()
+    assert stats['statements'] == counter['queries'] > 0
+
+    # Once released, the connection reports to the tracer only
+    tracer.begin()
+    conn = entry_manager.adapter.pool.acquire()
+    conn.execute('SELECT 1').fetchall()
+    conn.close()
+    assert tracer.end()['statements'] == 1
+    assert counter['queries'] == stats['statements']
@@ -0,0 +1,136 @@
+"""update_entry: child rows are reconciled instead of replaced"""
+
+import pytest
+
+from conftest import make_entry
+from sharepoint_sqlite_adapter import ProductionEntryManagerWorking
+from sql_tracing import SQLTracer
+
+
+class StatementLog(SQLTracer):
+    """Tracer that records every statement SQLite runs (one per executemany row)"""
+
+    def __init__(self):
+        super().__init__(slow_query_ms=10000)
+        self.statements = []
+
+    def _on_statement(self, statement):
+        self.statements.append(' '.join(statement.split()))
+
+    def writes_to(self, table):
+        return [s for s in self.statements if s.startswith((f'INSERT INTO {table}', f'UPDATE {table}', f'DELETE FROM {table}'))]
+
+
+@pytest.fixture
+def traced(tmp_path):
+    log = StatementLog()
+    entry_manager = ProductionEntryManagerWorking(data_dir=str(tmp_path / 'data'), sql_tracer=log)
+    yield entry_manager, log
+    entry_manager.close()
+
+
+def issues(*descriptions):
+    return [{'description': description, 'remarks': ''} for description in descriptions]
+
+
+def create(entry_manager, **fields):
+    created = entry_manager.create_entry(make_entry('2024-06-03', issues=issues('a', 'b', 'c'), **fields))
+    return entry_manager.get_entry_by_id(created['id'])
+
+
+def test_editing_one_child_updates_only_that_row(traced):
+    entry_manager, log = traced
+    entry = create(entry_manager)
+    edited = [dict(issue) for issue in entry['issues']]
+    edited[1]['remarks'] = 'now with remarks'
+    log.statements.clear()
+
+    updated = entry_manager.update_entry(entry['id'], {'issues': edited})
+
+    assert log.writes_to('issues') == [s for s in log.writes_to('issues') if s.startswith('UPDATE issues')]
+    assert len(log.writes_to('issues')) == 1
+    assert log.writes_to('prbs') == log.writes_to('hiims') == []
+    assert [issue['id'] for issue in updated['issues']] == [issue['id'] for issue in entry['issues']]
+    assert [issue['created_at'] for issue in updated['issues']] == [issue['created_at'] for issue in entry['issues']]
+    assert updated['issues'][1]['remarks'] == 'now with remarks'
+
+
+def test_unchanged_children_are_not_written(traced):
+    entry_manager, log = traced
+    entry = create(entry_manager)
+    log.statements.clear()
+
+    entry_manager.update_entry(entry['id'], {'remarks': 'entry only', 'issues': entry['issues']})
+
+    assert log.writes_to('issues') == []
+
+
+def test_reorder_keeps_rows_matched_by_id(manager):
+    entry = create(manager)
+    a, b, c = entry['issues']
+
+    updated = manager.update_entry(entry['id'], {'issues': [c, a, {'description': 'd', 'remarks': ''}]})
+
+    assert [issue['description'] for issue in updated['issues']] == ['c', 'a', 'd']
+    assert [issue['position'] for issue in updated['issues']] == [0, 1, 2]
+    assert [issue['id'] for issue in updated['issues'][:2]] == [c['id'], a['id']]
+    # The new item takes over the row no item claimed
+    assert updated['issues'][2]['id'] == b['id']
+
+
+def test_add_and_remove_rows(manager):
+    entry = create(manager)
+    a, b, c = entry['issues']
+
+    shrunk = manager.update_entry(entry['id'], {'issues': [a, c]})
+    assert [issue['id'] for issue in shrunk['issues']] == [a['id'], c['id']]
+
+    grown = manager.update_entry(entry['id'], {'issues': shrunk['issues'] + issues('e')})
+    assert [issue['description'] for issue in grown['issues']] == ['a', 'c', 'e']
+    assert grown['issues'][2]['id'] not in {a['id'], b['id'], c['id']}
+
+
+def test_items_without_ids_reuse_rows_by_position(manager):
+    entry = create(manager)
+
+    updated = manager.update_entry(entry['id'], {'issues': issues('x', 'y')})
+
+    assert [issue['id'] for issue in updated['issues']] == [issue['id'] for issue in entry['issues'][:2]]
+    assert [issue['description'] for issue in updated['issues']] == ['x', 'y']
+
+
+def test_ids_of_another_entrys_rows_are_not_claimed(manager):
+    entry = create(manager)
+    other = manager.get_entry_by_id(manager.create_entry(make_entry('2024-06-04', issues=issues('o')))['id'])
+    foreign = dict(other['issues'][0], description='stolen')
+
+    manager.update_entry(entry['id'], {'issues': [foreign]})
+
+    assert manager.get_entry_by_id(other['id'])['issues'][0]['description'] == 'o'
+    assert [issue['description'] for issue in manager.get_entry_by_id(entry['id'])['issues']] == ['stolen']
+
+
+def test_omitted_child_tables_are_left_alone(manager):
+    entry = create(manager, prbs=[{'prb_id_number': '42', 'prb_id_status': 'active', 'prb_link': ''}])
+
+    updated = manager.update_entry(entry['id'], {'quality_status': 'Red'})
+
+    assert updated['issues'] == entry['issues']
+    assert updated['prbs'] == entry['prbs']
+
+
+def test_missing_entry_returns_none_and_writes_nothing(manager):
+    version = manager.get_data_version()
+
+    assert manager.update_entry(999, {'issues': issues('x')}) is None
+    assert manager.get_data_version() == version
+
+
+def test_rollups_follow_updates(manager):
+    entry = create(manager)
+    manager.update_entry(entry['id'], {'quality_status': 'Red', 'date': '2024-07-01'})
+
+    assert manager.check_rollups() == []
+    stats = {(row['month'], row['application_name']): row for row in manager.get_monthly_stats()}
+    assert ('2024-06', 'CVAR ALL') not in stats
+    assert stats[('2024-07', 'CVAR ALL')]['quality_red'] == 1
@@ -0,0 +1,85 @@
+"""/api/xva/stats: red card counts and root causes aggregated in SQL"""
+
+import pytest
+
+from conftest import make_entry
+
+XVA_ENTRIES = [
+    make_entry('2024-01-03', 'XVA', valo_status='Red', root_cause_application='Murex', root_cause_type='Data'),
+    make_entry('2024-01-04', 'XVA', valo_status='Red', sensi_status='Red', root_cause_application='Murex',
+               root_cause_type='Data'),
+    make_entry('2024-01-05', 'XVA', quality_legacy='Red', root_cause_type='Infra'),
+    make_entry('2024-01-06', 'XVA', valo_status='Green', sensi_status='Green'),
+    make_entry('2024-02-01', 'XVA', cf_ra_status='Red', quality_target='Red', root_cause_application=''),
+    make_entry('2024-02-02', 'XVA', sensi_status='Red', root_cause_application='Calypso', root_cause_type='Code'),
+    make_entry('2025-02-03', 'XVA', valo_status='Red'),
+    # Other applications never count, even when red
+    make_entry('2024-01-03', 'XVA Batch', valo_status='Red'),
+    make_entry('2024-01-03', 'CVAR ALL', sensi_status='Red'),
+]
+
+
+def baseline_xva_stats(entries, start_date=None, end_date=None, years=(), months=()):
+    """The route's original per-entry Python aggregation, kept as the reference"""
+    monthly, causes = {}, {}
+    for entry in entries:
+        if entry['application_name'] != 'XVA':
+            continue
+        if start_date and entry['date'] < start_date:
+            continue
+        if end_date and entry['date'] > end_date:
+            continue
+        if years and entry['date'][:4] not in years:
+            continue
+        if months and str(int(entry['date'][5:7])) not in months:
+            continue
+        counts = monthly.setdefault(entry['date'][:7], {'valo_red': 0, 'sensi_red': 0, 'cf_ra_red': 0, 'total_red': 0})
+        statuses = [entry.get(field) for field in ('valo_status', 'sensi_status', 'cf_ra_status',
+                                                   'quality_legacy', 'quality_target')]
+        if 'Red' not in statuses:
+            continue
+        for field, counter in (('valo_status', 'valo_red'), ('sensi_status', 'sensi_red'), ('cf_ra_status', 'cf_ra_red')):
+            if entry.get(field) == 'Red':
+                counts[counter] += 1
+        counts['total_red'] += 1
+        key = (entry.get('root_cause_application') or 'Unknown', entry.get('root_cause_type') or 'Unknown')
+        causes[key] = causes.get(key, 0) + 1
+    return monthly, causes
+
+
+@pytest.fixture
+def seeded(client, app_module):
+    app_module.entry_manager.create_entries([dict(entry) for entry in XVA_ENTRIES])
+    return client
+
+
+@pytest.mark.parametrize('query, filters', [
+    ('', {}),
+    ('?start_date=2024-01-04&end_date=2024-02-01', {'start_date': '2024-01-04', 'end_date': '2024-02-01'}),
+    ('?year=2024', {'years': ('2024',)}),
+    ('?month=2', {'months': ('2',)}),
+])
+def test_sql_aggregation_matches_the_python_baseline(seeded, query, filters):
+    body = seeded.get('/api/xva/stats' + query).get_json()
+    expected_monthly, expected_causes = baseline_xva_stats(XVA_ENTRIES, **filters)
+
+    actual_monthly = {month: {name: counts[name] for name in ('valo_red', 'sensi_red', 'cf_ra_red', 'total_red')}
+                      for month, counts in body['monthly_red_counts'] if counts['total_red'] or month in expected_monthly}
+    assert actual_monthly == expected_monthly
+    assert {(item['root_cause_application'], item['root_cause_type']): item['count']
+            for item in body['root_cause_analysis']} == expected_causes
+    assert body['grand_total'] == sum(expected_causes.values())
+
+
+def test_selected_year_lists_every_month(seeded):
+    body = seeded.get('/api/xva/stats?year=2025').get_json()
+
+    assert [month for month, _ in body['monthly_red_counts']] == [f'2025-{month:02d}' for month in range(1, 13)]
+    assert dict(body['monthly_red_counts'])['2025-02']['month_name'] == 'February 2025'
+    assert dict(body['monthly_red_counts'])['2025-02']['valo_red'] == 1
+
+
+def test_month_only_filter_uses_years_present_in_the_data(seeded):
+    body = seeded.get('/api/xva/stats?month=1').get_json()
+
+    assert [month for month, _ in body['monthly_red_counts']] == ['2024-01']